@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.profiling import profile_store, render_collapsed_stacks, render_stats_text
+
+
+def require_admin_token(x_admin_token: str | None = Header(default=None)) -> None:
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set ADMIN_TOKEN to enable them")
+    if x_admin_token != settings.admin_token:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin_token)])
+
+
+@router.get("/profiles")
+def list_profiles():
+    return {"enabled": settings.profiling_enabled, "routes": profile_store.routes()}
+
+
+@router.get("/profiles/{route_key}", response_class=PlainTextResponse)
+def get_profile(route_key: str, format: str = "text", limit: int = 40):
+    stats = profile_store.aggregate(route_key)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"No profiles captured for {route_key}")
+    if format == "collapsed":
+        return PlainTextResponse(render_collapsed_stacks(stats))
+    if format == "text":
+        return PlainTextResponse(render_stats_text(stats, limit))
+    raise HTTPException(status_code=400, detail="format must be 'text' or 'collapsed'")
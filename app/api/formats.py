@@ -0,0 +1,161 @@
+"""Content negotiation and streaming encoders for row-oriented (batch) responses.
+
+Rows are produced in column chunks (``{name: list}`` of plain Python values) and encoded chunk
+by chunk, so a response never holds more than one encoded chunk in memory. Supported media types:
+
+- ``application/json``: one JSON document; header fields, the row list, then footer fields
+- ``application/x-ndjson``: a header object line, then one JSON object per row
+- ``application/msgpack``: the same records as consecutive msgpack maps (needs ``msgpack``)
+- ``application/vnd.apache.arrow.stream``: Arrow IPC stream; header and footer fields are
+  JSON-encoded schema metadata
+"""
+
+from __future__ import annotations
+
+import io
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from datetime import datetime
+
+import orjson
+import pandas as pd
+import pyarrow as pa
+from fastapi import HTTPException
+
+try:
+    import msgpack
+except ImportError:  # optional: pip install msgpack
+    msgpack = None
+
+JSON = "application/json"
+NDJSON = "application/x-ndjson"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+MEDIA_ALIASES = {
+    "application/jsonl": NDJSON,
+    "application/x-jsonlines": NDJSON,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+STREAM_CHUNK_ROWS = 5000
+ROW_FORMAT_RESPONSES = {200: {"content": {NDJSON: {}, MSGPACK: {}, ARROW: {}}}}
+
+
+def supported_media_types() -> tuple[str, ...]:
+    return (JSON, NDJSON, ARROW) if msgpack is None else (JSON, NDJSON, MSGPACK, ARROW)
+
+
+def _canonical(media_type: str) -> str:
+    media_type = media_type.split(";", 1)[0].strip().lower()
+    return MEDIA_ALIASES.get(media_type, media_type)
+
+
+def negotiate(accept: str | None) -> str:
+    """Pick the response media type from an ``Accept`` header (JSON when absent or ``*/*``)."""
+    if not accept:
+        return JSON
+    candidates: list[tuple[float, int, str]] = []
+    for position, part in enumerate(accept.split(",")):
+        media_type, *params = (piece.strip() for piece in part.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            candidates.append((-quality, position, _canonical(media_type)))
+    supported = supported_media_types()
+    for _, _, media_type in sorted(candidates):
+        if media_type in ("*/*", "application/*"):
+            return JSON
+        if media_type in supported:
+            return media_type
+    raise HTTPException(status_code=406, detail=f"Supported response types: {', '.join(supported)}")
+
+
+def _rows(chunk: Mapping[str, Sequence], names: list[str]) -> list[dict]:
+    return [dict(zip(names, values, strict=True)) for values in zip(*(chunk[name] for name in names), strict=True)]
+
+
+def _msgpack_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def encode_stream(
+    media_type: str,
+    schema: pa.Schema,
+    chunks: Iterable[Mapping[str, Sequence]],
+    *,
+    list_key: str,
+    header: Mapping | None = None,
+    footer: Mapping | None = None,
+) -> Iterator[bytes]:
+    """Encode column chunks as ``media_type``; ``footer`` is emitted after the rows only in JSON."""
+    header = dict(header or {})
+    footer = dict(footer or {})
+    names = schema.names
+    if media_type == JSON:
+        opening = orjson.dumps(header)[:-1]
+        yield (opening + b"," if header else opening) + orjson.dumps(list_key) + b":["
+        first = True
+        for chunk in chunks:
+            rows = _rows(chunk, names)
+            if not rows:
+                continue
+            encoded = b",".join(orjson.dumps(row) for row in rows)
+            yield encoded if first else b"," + encoded
+            first = False
+        closing = orjson.dumps(footer)[1:]
+        yield b"]" + (b"," + closing if footer else closing)
+    elif media_type == NDJSON:
+        metadata = {**header, **footer}
+        if metadata:
+            yield orjson.dumps(metadata, option=orjson.OPT_APPEND_NEWLINE)
+        for chunk in chunks:
+            yield b"".join(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE) for row in _rows(chunk, names))
+    elif media_type == MSGPACK:
+        packer = msgpack.Packer(default=_msgpack_value, datetime=False)
+        metadata = {**header, **footer}
+        if metadata:
+            yield packer.pack(metadata)
+        for chunk in chunks:
+            yield b"".join(packer.pack(row) for row in _rows(chunk, names))
+    elif media_type == ARROW:
+        metadata = {key: orjson.dumps(value) for key, value in {**header, **footer}.items()}
+        sink = io.BytesIO()
+        writer = pa.ipc.new_stream(sink, schema.with_metadata(metadata) if metadata else schema)
+        for chunk in chunks:
+            writer.write_batch(pa.RecordBatch.from_pydict({name: chunk[name] for name in names}, schema=schema))
+            yield _drain(sink)
+        writer.close()
+        yield _drain(sink)
+    else:
+        raise ValueError(f"Unsupported media type {media_type!r}")
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
+
+
+def decode_records(body: bytes, content_type: str) -> pd.DataFrame:
+    """Parse an NDJSON, msgpack or Arrow IPC upload into a frame; raises ValueError on bad input."""
+    media_type = _canonical(content_type)
+    if media_type == NDJSON:
+        return pd.DataFrame.from_records([orjson.loads(line) for line in body.splitlines() if line.strip()])
+    if media_type == MSGPACK:
+        if msgpack is None:
+            raise HTTPException(status_code=415, detail="msgpack uploads need the optional msgpack package")
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(body)
+        records: list = []
+        for item in unpacker:
+            records.extend(item if isinstance(item, list) else [item])
+        return pd.DataFrame.from_records(records)
+    if media_type == ARROW:
+        return pa.ipc.open_stream(body).read_all().to_pandas()
+    raise HTTPException(status_code=415, detail=f"Unsupported upload type {content_type!r}")
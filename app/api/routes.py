@@ -1,31 +1,144 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import FileResponse
-from sqlalchemy import func
+import io
+import json
+from collections.abc import Iterator
+from datetime import datetime
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.routing import APIRoute
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.api.formats import ROW_FORMAT_RESPONSES, STREAM_CHUNK_ROWS, decode_records, encode_stream, negotiate
+from app.core.config import settings
+from app.core.metrics import time_stage
+from app.core.profiling import ProfiledRoute
+from app.db.session import SessionLocal, get_db, get_read_db, read_session
 from app.models.loan import LoanScenario
 from app.models.prediction import PredictionResult
-from app.schemas.loan import LoanRequest
-from app.schemas.optimization import CapacityOptimizationRequest, CapacityOptimizationResponse
+from app.schemas.loan import (
+    ComparablesBatchRequest,
+    LoanBatchRequest,
+    LoanRequest,
+    OutcomeBatchRequest,
+    OutcomeIngestResponse,
+    SensitivityRequest,
+)
+from app.schemas.optimization import (
+    CapacityOptimizationRequest,
+    CapacityOptimizationResponse,
+    CapacityPlanRequest,
+    CapacityPlanResponse,
+    CapacitySimulationRequest,
+    CapacitySimulationResponse,
+)
 from app.schemas.prediction import (
+    BatchScoreResponse,
+    ComparablesBatchResponse,
+    ComparablesResponse,
+    ModelDriftResponse,
     ModelExplainabilityResponse,
     ModelPerformanceResponse,
     PortfolioSummary,
+    PortfolioTimeseriesResponse,
+    PortfolioValuationResponse,
+    PredictionListResponse,
     ScoreResponse,
+    SensitivityResponse,
 )
+from app.services.archive_service import PredictionArchiveService
+from app.services.batching_service import MicroBatcher
+from app.services.comparables_service import COMPARABLE_FEATURES, ComparablesIndex
+from app.services.drift_service import DriftMonitor
+from app.services.event_service import PortfolioEventBroker, ScoredLoanEvent
 from app.services.model_service import ModelService
+from app.services.optimization_cache import OptimizationResultCache
 from app.services.optimization_service import UnderwriterCapacityOptimizationService
+from app.services.performance_service import ModelPerformanceTracker
 from app.services.report_service import ReportService
+from app.services.rollup_service import PortfolioRollupService
+from app.services.scheduling_service import UnderwriterSchedulingService
+from app.services.sensitivity_service import SensitivityService
+from app.services.validation_service import ColumnarLoanValidator, ColumnarValidationResult
+from app.services.valuation_service import PortfolioValuationService
 
-router = APIRouter(prefix="/api/v1", tags=["mortgage-analytics"])
+router = APIRouter(
+    prefix="/api/v1",
+    tags=["mortgage-analytics"],
+    route_class=ProfiledRoute if settings.profiling_enabled else APIRoute,
+)
 model_service = ModelService()
-report_service = ReportService()
+comparables_index = ComparablesIndex(read_session, *model_service.feature_scaling(COMPARABLE_FEATURES))
+archive_service = PredictionArchiveService()
+rollup_service = PortfolioRollupService(archive_service=archive_service)
+report_service = ReportService(rollup_service)
 optimization_service = UnderwriterCapacityOptimizationService()
+scheduling_service = UnderwriterSchedulingService()
+sensitivity_service = SensitivityService(model_service)
+optimization_cache = OptimizationResultCache()
+valuation_service = PortfolioValuationService(archive_service=archive_service)
+loan_validator = ColumnarLoanValidator()
+event_broker = PortfolioEventBroker()
+performance_tracker = ModelPerformanceTracker(archive_service=archive_service)
+drift_monitor = DriftMonitor(
+    model_service.bundle.get("reference_profile"),
+    model_version=model_service.bundle.get("version", "v1"),
+)
+
+LOAN_SCENARIO_COLUMNS = {
+    "credit_score": int,
+    "ltv": float,
+    "dti": float,
+    "income": float,
+    "loan_amount": float,
+    "interest_rate": float,
+    "tenure_years": int,
+}
+BATCH_RESULT_SCHEMA = pa.schema(
+    [
+        ("row", pa.int64()),
+        ("loan_id", pa.int64()),
+        ("prediction_id", pa.int64()),
+        ("risk_score", pa.float64()),
+        ("retention_score", pa.float64()),
+        ("recommendation", pa.string()),
+    ]
+)
+PREDICTION_LIST_SCHEMA = pa.schema(
+    [
+        ("prediction_id", pa.int64()),
+        ("loan_id", pa.int64()),
+        ("created_at", pa.timestamp("us")),
+        ("model_version", pa.string()),
+        ("risk_score", pa.float64()),
+        ("retention_score", pa.float64()),
+        ("recommendation", pa.string()),
+    ]
+)
+
+
+def _scored_event(pred_row: PredictionResult) -> ScoredLoanEvent:
+    return ScoredLoanEvent(
+        loan_id=pred_row.loan_id,
+        prediction_id=pred_row.id,
+        risk_score=pred_row.risk_score,
+        retention_score=pred_row.retention_score,
+        recommendation=pred_row.recommendation,
+        model_version=pred_row.model_version,
+    )
 
 
 @router.post("/score", response_model=ScoreResponse)
 def score_loan(loan: LoanRequest, db: Session = Depends(get_db)):
+    # The batched path writes through the batcher's own session; ``db`` is lazy and never connects.
+    if score_batcher is not None:
+        return score_batcher.submit(loan).result()
+
     payload = loan.model_dump()
     db_payload = {
         "credit_score": payload["credit_score"],
@@ -38,9 +151,11 @@ def score_loan(loan: LoanRequest, db: Session = Depends(get_db)):
     }
     loan_row = LoanScenario(**db_payload)
     db.add(loan_row)
-    db.flush()
+    with time_stage("db_flush"):
+        db.flush()
 
     scored = model_service.score(loan)
+    drift_monitor.observe(payload, scored.risk_score, scored.retention_score)
 
     pred_row = PredictionResult(
         loan_id=loan_row.id,
@@ -50,8 +165,14 @@ def score_loan(loan: LoanRequest, db: Session = Depends(get_db)):
         model_version=scored.model_version,
     )
     db.add(pred_row)
-    db.commit()
-    db.refresh(pred_row)
+    with time_stage("db_flush"):
+        db.flush()
+    with time_stage("rollup_update"):
+        rollup_service.record_predictions(db, [(loan_row, pred_row)])
+    with time_stage("db_commit"):
+        db.commit()
+        db.refresh(pred_row)
+    event_broker.publish([_scored_event(pred_row)])
 
     return ScoreResponse(
         loan_id=loan_row.id,
@@ -64,35 +185,324 @@ def score_loan(loan: LoanRequest, db: Session = Depends(get_db)):
     )
 
 
+def _score_and_stage_columns(columns: dict[str, np.ndarray], db: Session) -> list[PredictionResult]:
+    """Score column-oriented loans and flush loan, prediction and rollup rows; the caller commits."""
+    scored = model_service.score_columns(columns)
+    drift_monitor.observe_columns(
+        columns,
+        np.fromiter((result.risk_score for result in scored), dtype=float, count=len(scored)),
+        np.fromiter((result.retention_score for result in scored), dtype=float, count=len(scored)),
+    )
+
+    loan_rows = [
+        LoanScenario(**{name: caster(columns[name][position]) for name, caster in LOAN_SCENARIO_COLUMNS.items()})
+        for position in range(len(scored))
+    ]
+    db.add_all(loan_rows)
+    with time_stage("db_flush"):
+        db.flush()
+
+    pred_rows = [
+        PredictionResult(
+            loan_id=loan_row.id,
+            risk_score=result.risk_score,
+            retention_score=result.retention_score,
+            recommendation=result.recommendation,
+            model_version=result.model_version,
+        )
+        for loan_row, result in zip(loan_rows, scored, strict=True)
+    ]
+    db.add_all(pred_rows)
+    with time_stage("db_flush"):
+        db.flush()
+    with time_stage("rollup_update"):
+        rollup_service.record_predictions(db, zip(loan_rows, pred_rows, strict=True))
+    return pred_rows
+
+
+def _column_chunks(columns: dict[str, list], size: int = STREAM_CHUNK_ROWS):
+    total = len(next(iter(columns.values())))
+    for start in range(0, total, size):
+        yield {name: values[start : start + size] for name, values in columns.items()}
+
+
+def _score_validated_batch(validation: ColumnarValidationResult, db: Session, media_type: str) -> StreamingResponse:
+    valid_rows = validation.valid_rows
+    valid_columns = {name: values[valid_rows] for name, values in validation.columns.items()}
+    pred_rows = _score_and_stage_columns(valid_columns, db)
+    # Read everything the response needs before commit expires the instances.
+    results = {
+        "row": valid_rows.tolist(),
+        "loan_id": [pred_row.loan_id for pred_row in pred_rows],
+        "prediction_id": [pred_row.id for pred_row in pred_rows],
+        "risk_score": [pred_row.risk_score for pred_row in pred_rows],
+        "retention_score": [pred_row.retention_score for pred_row in pred_rows],
+        "recommendation": [pred_row.recommendation for pred_row in pred_rows],
+    }
+    events = [_scored_event(pred_row) for pred_row in pred_rows]
+    with time_stage("db_commit"):
+        db.commit()
+    event_broker.publish(events)
+
+    header = {
+        "model_version": model_service.bundle.get("version", "v1"),
+        "scored_count": len(pred_rows),
+        "rejected_count": validation.row_count - len(pred_rows),
+    }
+    return StreamingResponse(
+        encode_stream(
+            media_type,
+            BATCH_RESULT_SCHEMA,
+            _column_chunks(results),
+            list_key="results",
+            header=header,
+            footer={"errors": validation.errors},
+        ),
+        media_type=media_type,
+    )
+
+
+def _score_coalesced(loans: list[LoanRequest]) -> list[ScoreResponse]:
+    """Micro-batch handler: one vectorized score and one transaction for many /score callers."""
+    payloads = [loan.model_dump() for loan in loans]
+    columns = {name: np.asarray([payload[name] for payload in payloads]) for name in payloads[0]}
+    with SessionLocal() as db:
+        pred_rows = _score_and_stage_columns(columns, db)
+        # Read everything the responses need before commit expires the instances.
+        responses = [
+            ScoreResponse(
+                loan_id=pred_row.loan_id,
+                prediction_id=pred_row.id,
+                risk_score=pred_row.risk_score,
+                retention_score=pred_row.retention_score,
+                recommendation=pred_row.recommendation,
+                model_version=pred_row.model_version,
+                created_at=pred_row.created_at,
+            )
+            for pred_row in pred_rows
+        ]
+        events = [_scored_event(pred_row) for pred_row in pred_rows]
+        with time_stage("db_commit"):
+            db.commit()
+    event_broker.publish(events)
+    return responses
+
+
+score_batcher = MicroBatcher(_score_coalesced) if settings.score_batching_enabled else None
+
+
+@router.post("/score/batch", response_model=BatchScoreResponse, responses=ROW_FORMAT_RESPONSES)
+def score_loan_batch(
+    batch: LoanBatchRequest,
+    accept: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    media_type = negotiate(accept)
+    with time_stage("validation"):
+        validation = loan_validator.validate_records(batch.loans)
+    return _score_validated_batch(validation, db, media_type)
+
+
+@router.post("/score/file", response_model=BatchScoreResponse, responses=ROW_FORMAT_RESPONSES)
+def score_loan_file(
+    body: bytes = Body(..., media_type="text/csv"),
+    content_type: str | None = Header(default=None),
+    accept: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    media_type = negotiate(accept)
+    try:
+        if content_type is None or content_type.split(";", 1)[0].strip() in ("text/csv", "application/csv"):
+            frame = pd.read_csv(io.BytesIO(body))
+        else:
+            frame = decode_records(body, content_type)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=f"Could not parse upload: {exc}") from exc
+    with time_stage("validation"):
+        validation = loan_validator.validate_frame(frame)
+    return _score_validated_batch(validation, db, media_type)
+
+
+@router.post("/score/sensitivity", response_model=SensitivityResponse)
+def score_sensitivity(request: SensitivityRequest):
+    return SensitivityResponse(**sensitivity_service.sweep(request))
+
+
+def _prediction_chunks(query) -> Iterator[dict[str, list]]:
+    db = read_session()
+    try:
+        for rows in db.execute(query.execution_options(yield_per=STREAM_CHUNK_ROWS)).partitions():
+            yield dict(zip(PREDICTION_LIST_SCHEMA.names, (list(values) for values in zip(*rows)), strict=True))
+    finally:
+        db.close()
+
+
+@router.get("/predictions", response_model=PredictionListResponse, responses=ROW_FORMAT_RESPONSES)
+def list_predictions(
+    model_version: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(10_000, ge=1, le=1_000_000),
+    accept: str | None = Header(default=None),
+):
+    """Stored predictions in id order; page by passing the last ``prediction_id`` as ``after_id``."""
+    media_type = negotiate(accept)
+    query = (
+        select(
+            PredictionResult.id,
+            PredictionResult.loan_id,
+            PredictionResult.created_at,
+            PredictionResult.model_version,
+            PredictionResult.risk_score,
+            PredictionResult.retention_score,
+            PredictionResult.recommendation,
+        )
+        .where(PredictionResult.id > after_id)
+        .order_by(PredictionResult.id)
+        .limit(limit)
+    )
+    if model_version is not None:
+        query = query.where(PredictionResult.model_version == model_version)
+    if start is not None:
+        query = query.where(PredictionResult.created_at >= start)
+    if end is not None:
+        query = query.where(PredictionResult.created_at <= end)
+    # The generator opens its own read session: dependency-managed sessions close before streaming.
+    return StreamingResponse(
+        encode_stream(media_type, PREDICTION_LIST_SCHEMA, _prediction_chunks(query), list_key="predictions"),
+        media_type=media_type,
+    )
+
+
+# How long a comparables request waits for the first background build before answering 503.
+COMPARABLES_READY_TIMEOUT_SECONDS = 5.0
+
+
+def _comparables(db: Session, loan_ids: list[int], k: int) -> tuple[list[ComparablesResponse], list[int]]:
+    comparables_index.start()
+    if not comparables_index.wait_ready(COMPARABLES_READY_TIMEOUT_SECONDS):
+        raise HTTPException(status_code=503, detail="Comparables index is still building", headers={"Retry-After": "5"})
+    features = comparables_index.features_for(db, loan_ids)
+    found = [loan_id for loan_id in loan_ids if loan_id in features]
+    missing = [loan_id for loan_id in loan_ids if loan_id not in features]
+    described = (
+        comparables_index.nearest(db, np.array([features[loan_id] for loan_id in found]), k, exclude_ids=found)
+        if found
+        else []
+    )
+    index_size = comparables_index.size
+    results = [
+        ComparablesResponse(loan_id=loan_id, index_size=index_size, comparables=items)
+        for loan_id, items in zip(found, described, strict=True)
+    ]
+    return results, missing
+
+
+@router.get("/loans/{loan_id}/comparables", response_model=ComparablesResponse)
+def loan_comparables(loan_id: int, k: int = Query(10, ge=1, le=100), db: Session = Depends(get_read_db)):
+    """The ``k`` stored loans closest to ``loan_id`` in the model's standardized feature space."""
+    results, missing = _comparables(db, [loan_id], k)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Loan {loan_id} not found")
+    return results[0]
+
+
+@router.post("/loans/comparables", response_model=ComparablesBatchResponse)
+def batch_loan_comparables(request: ComparablesBatchRequest, db: Session = Depends(get_read_db)):
+    results, missing = _comparables(db, request.loan_ids, request.k)
+    return ComparablesBatchResponse(index_size=comparables_index.size, results=results, missing_loan_ids=missing)
+
+
 @router.get("/portfolio/summary", response_model=PortfolioSummary)
-def portfolio_summary(db: Session = Depends(get_db)):
-    total_scored = db.query(func.count(PredictionResult.id)).scalar() or 0
-    avg_risk = db.query(func.avg(PredictionResult.risk_score)).scalar() or 0.0
-    avg_retention = db.query(func.avg(PredictionResult.retention_score)).scalar() or 0.0
-    high_risk = (
-        db.query(func.count(PredictionResult.id))
-        .filter(PredictionResult.risk_score >= 0.65)
-        .scalar()
-        or 0
+def portfolio_summary(db: Session = Depends(get_read_db)):
+    return PortfolioSummary(**archive_service.portfolio_summary(db))
+
+
+@router.get("/portfolio/valuation", response_model=PortfolioValuationResponse)
+def portfolio_valuation(
+    loss_given_default: float | None = Query(None, gt=0, le=1),
+    horizon_years: int = Query(5, ge=1, le=40),
+    model_version: str | None = None,
+    db: Session = Depends(get_read_db),
+):
+    """Exposure, expected loss and income at risk over every stored prediction, archived ones included."""
+    result = valuation_service.value_portfolio(
+        db, loss_given_default=loss_given_default, horizon_years=horizon_years, model_version=model_version
     )
-    low_retention = (
-        db.query(func.count(PredictionResult.id))
-        .filter(PredictionResult.retention_score < 0.45)
-        .scalar()
-        or 0
+    return PortfolioValuationResponse(**result)
+
+
+@router.get("/portfolio/timeseries", response_model=PortfolioTimeseriesResponse)
+def portfolio_timeseries(
+    granularity: Literal["hour", "day", "week"] = "day",
+    segment: Literal["all", "model_version", "credit_score", "ltv"] = "all",
+    start: datetime | None = None,
+    end: datetime | None = None,
+    model_version: str | None = None,
+    high_risk_threshold: float | None = Query(default=None, ge=0, le=1),
+    low_retention_threshold: float | None = Query(default=None, ge=0, le=1),
+    db: Session = Depends(get_read_db),
+):
+    return rollup_service.timeseries(
+        db,
+        granularity=granularity,
+        segment=segment,
+        start=start,
+        end=end,
+        model_version=model_version,
+        high_risk_threshold=high_risk_threshold,
+        low_retention_threshold=low_retention_threshold,
     )
 
-    return PortfolioSummary(
-        total_scored=int(total_scored),
-        avg_risk_score=float(avg_risk),
-        avg_retention_score=float(avg_retention),
-        high_risk_count=int(high_risk),
-        low_retention_count=int(low_retention),
+
+def _portfolio_snapshot() -> tuple[PortfolioSummary, int]:
+    # Stays on the primary: deltas only cover commits after the snapshot, so it must not lag.
+    with SessionLocal() as db:
+        summary, last_prediction_id = archive_service.portfolio_snapshot(db)
+    return PortfolioSummary(**summary), last_prediction_id
+
+
+def _sse_message(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.get("/portfolio/stream")
+async def portfolio_stream(
+    request: Request,
+    heartbeat_seconds: float = Query(default=15.0, gt=0, le=60),
+    limit: int | None = Query(default=None, ge=1),
+):
+    async def events():
+        # Subscribe before the snapshot so no commit between the two is missed, and hold events
+        # until the snapshot's last prediction id is known so none is counted twice.
+        subscription = event_broker.subscribe(hold=True)
+        try:
+            snapshot, last_prediction_id = await run_in_threadpool(_portfolio_snapshot)
+            event_broker.start_after(subscription, last_prediction_id)
+            yield _sse_message("snapshot", {**snapshot.model_dump(), "last_prediction_id": last_prediction_id})
+            sent = 1
+            while limit is None or sent < limit:
+                if await request.is_disconnected():
+                    break
+                delta = await event_broker.next_delta(subscription, heartbeat_seconds)
+                if delta is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse_message("kpi_delta", delta)
+                sent += 1
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 @router.get("/report/executive-summary")
-def executive_summary_report(db: Session = Depends(get_db)):
+def executive_summary_report(db: Session = Depends(get_read_db)):
     pdf_path = report_service.generate_executive_summary(db)
     return FileResponse(
         path=pdf_path,
@@ -102,8 +512,21 @@ def executive_summary_report(db: Session = Depends(get_db)):
 
 
 @router.get("/model/performance", response_model=ModelPerformanceResponse)
-def model_performance():
-    return ModelPerformanceResponse(**model_service.get_performance_summary())
+def model_performance(
+    model_version: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    db: Session = Depends(get_read_db),
+):
+    live = performance_tracker.live_performance(db, model_version=model_version, start=start, end=end)
+    return ModelPerformanceResponse(**model_service.get_performance_summary(), live=live)
+
+
+@router.post("/outcomes", response_model=OutcomeIngestResponse)
+def ingest_outcomes(request: OutcomeBatchRequest, db: Session = Depends(get_db)):
+    return OutcomeIngestResponse(
+        **performance_tracker.ingest(db, (outcome.model_dump() for outcome in request.outcomes))
+    )
 
 
 @router.get("/model/explainability", response_model=ModelExplainabilityResponse)
@@ -111,17 +534,61 @@ def model_explainability():
     return ModelExplainabilityResponse(**model_service.get_explainability_summary())
 
 
+@router.get("/model/drift", response_model=ModelDriftResponse)
+def model_drift():
+    return ModelDriftResponse(**drift_monitor.report())
+
+
+def _recent_risk_scores(db: Session, limit: int = 5000) -> list[float]:
+    with time_stage("optimizer_query"):
+        return [
+            row[0]
+            for row in db.query(PredictionResult.risk_score)
+            .order_by(PredictionResult.created_at.desc())
+            .limit(limit)
+            .all()
+        ]
+
+
+def _cached_optimization(kind: str, request, db: Session, compute) -> dict:
+    portfolio_version = db.query(func.max(PredictionResult.id)).scalar()
+    return optimization_cache.get_or_compute(
+        kind, request, portfolio_version, lambda: compute(request, _recent_risk_scores(db))
+    )
+
+
 @router.post("/optimization/underwriter-capacity", response_model=CapacityOptimizationResponse)
 def optimize_underwriter_capacity(
     request: CapacityOptimizationRequest,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    risk_scores = [
-        row[0]
-        for row in db.query(PredictionResult.risk_score)
-        .order_by(PredictionResult.created_at.desc())
-        .limit(5000)
-        .all()
-    ]
-    result = optimization_service.optimize(request, risk_scores)
+    result = _cached_optimization("sweep", request, db, optimization_service.optimize)
     return CapacityOptimizationResponse(**result)
+
+
+@router.post("/optimization/underwriter-capacity/simulate", response_model=CapacitySimulationResponse)
+def simulate_underwriter_capacity(
+    request: CapacitySimulationRequest,
+    db: Session = Depends(get_read_db),
+):
+    if request.seed is None:
+        # Unseeded runs are meant to differ; only reproducible simulations are cached.
+        result = optimization_service.simulate(request, _recent_risk_scores(db))
+    else:
+        result = _cached_optimization("simulation", request, db, optimization_service.simulate)
+    return CapacitySimulationResponse(**result)
+
+
+@router.post("/optimization/underwriter-capacity/plan", response_model=CapacityPlanResponse)
+def plan_underwriter_capacity(
+    request: CapacityPlanRequest,
+    db: Session = Depends(get_read_db),
+):
+    risk_shift = request.backlog_risk_shift_per_day
+    if risk_shift is None:
+        # Waiting cannot make a loan safer; ignore a negative learned effect.
+        risk_shift = max(0.0, model_service.processing_day_risk_shift())
+    result = _cached_optimization(
+        "plan", request, db, lambda plan_request, risk_scores: scheduling_service.plan(plan_request, risk_scores, risk_shift)
+    )
+    return CapacityPlanResponse(**result)
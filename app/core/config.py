@@ -33,13 +33,70 @@ def _default_model_path() -> str:
     return "./data/model_bundle.joblib"
 
 
+def _default_profiles_dir() -> str:
+    configured = os.getenv("PROFILES_DIR")
+    if configured:
+        return configured
+    if os.getenv("SPACE_ID"):
+        return "/tmp/reports/profiles"
+    return "./reports/profiles"
+
+
+def _default_comparables_index_path() -> str:
+    configured = os.getenv("COMPARABLES_INDEX_PATH")
+    if configured:
+        return configured
+    if os.getenv("SPACE_ID"):
+        return "/tmp/comparables_index.npz"
+    return "./data/comparables_index.npz"
+
+
+def _default_archive_dir() -> str:
+    configured = os.getenv("ARCHIVE_DIR")
+    if configured:
+        return configured
+    if os.getenv("SPACE_ID"):
+        return "/tmp/archive"
+    return "./data/archive"
+
+
 @dataclass(frozen=True)
 class Settings:
     database_url: str = _default_database_url()
+    read_database_url: str = os.getenv("READ_DATABASE_URL", "")
+    read_replica_max_lag_seconds: float = float(os.getenv("READ_REPLICA_MAX_LAG_SECONDS", "30"))
+    read_replica_check_seconds: float = float(os.getenv("READ_REPLICA_CHECK_SECONDS", "1"))
     model_path: str = _default_model_path()
     reports_dir: str = _default_reports_dir()
+    report_chart_workers: int = int(os.getenv("REPORT_CHART_WORKERS", "0"))
     api_host: str = os.getenv("API_HOST", "127.0.0.1")
     api_port: int = int(os.getenv("API_PORT", "8000"))
+    high_risk_threshold: float = float(os.getenv("HIGH_RISK_THRESHOLD", "0.65"))
+    low_retention_threshold: float = float(os.getenv("LOW_RETENTION_THRESHOLD", "0.45"))
+    admin_token: str = os.getenv("ADMIN_TOKEN", "")
+    profiling_enabled: bool = os.getenv("PROFILING_ENABLED", "0") == "1"
+    profiling_sample_rate: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0.01"))
+    profiling_slow_ms: float = float(os.getenv("PROFILING_SLOW_MS", "500"))
+    profiling_slow_captures: int = int(os.getenv("PROFILING_SLOW_CAPTURES", "3"))
+    profiling_max_files: int = int(os.getenv("PROFILING_MAX_FILES", "20"))
+    profiles_dir: str = _default_profiles_dir()
+    model_warmup: bool = os.getenv("MODEL_WARMUP", "1") == "1"
+    prefork_workers: int = int(os.getenv("PREFORK_WORKERS", "0"))
+    score_batching_enabled: bool = os.getenv("SCORE_BATCHING_ENABLED", "0") == "1"
+    score_batch_window_ms: float = float(os.getenv("SCORE_BATCH_WINDOW_MS", "2"))
+    score_batch_max_size: int = int(os.getenv("SCORE_BATCH_MAX_SIZE", "64"))
+    archive_dir: str = _default_archive_dir()
+    archive_after_days: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+    archive_chunk_size: int = int(os.getenv("ARCHIVE_CHUNK_SIZE", "20000"))
+    comparables_index_path: str = _default_comparables_index_path()
+    comparables_refresh_seconds: float = float(os.getenv("COMPARABLES_REFRESH_SECONDS", "5"))
+    comparables_rebuild_seconds: float = float(os.getenv("COMPARABLES_REBUILD_SECONDS", "3600"))
+    comparables_delta_limit: int = int(os.getenv("COMPARABLES_DELTA_LIMIT", "50000"))
+    loss_given_default: float = float(os.getenv("LOSS_GIVEN_DEFAULT", "0.35"))
+    valuation_chunk_size: int = int(os.getenv("VALUATION_CHUNK_SIZE", "100000"))
+    optimization_cache_size: int = int(os.getenv("OPTIMIZATION_CACHE_SIZE", "128"))
+    simulation_workers: int = int(os.getenv("SIMULATION_WORKERS", "0"))
+    simulation_pool_min_simulations: int = int(os.getenv("SIMULATION_POOL_MIN_SIMULATIONS", "200000"))
 
 
 settings = Settings()
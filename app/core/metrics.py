@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        callback: Callable[[], dict[tuple[str, ...], float]] | None = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        self._values[labelvalues] = float(value)
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0.0)
+
+    def render(self) -> list[str]:
+        values = dict(self._values)
+        if self.callback is not None:
+            values.update(self.callback())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], running sum.
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def time(self, *labelvalues: str) -> StageTimer:
+        return StageTimer(self, labelvalues)
+
+    def count(self, *labelvalues: str) -> int:
+        series = self._series.get(labelvalues)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> list[str]:
+        with self._lock:
+            snapshot = sorted((key, list(counts), total[0]) for key, (counts, total) in self._series.items())
+
+        lines: list[str] = []
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts, strict=True):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class StageTimer:
+    __slots__ = ("_histogram", "_labelvalues", "_start")
+
+    def __init__(self, histogram: Histogram, labelvalues: tuple[str, ...]):
+        self._histogram = histogram
+        self._labelvalues = labelvalues
+        self._start = 0.0
+
+    def __enter__(self) -> StageTimer:
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._histogram.observe(time.perf_counter() - self._start, *self._labelvalues)
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+
+    def _register(self, metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        callback: Callable[[], dict[tuple[str, ...], float]] | None = None,
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+STAGE_LATENCY = registry.histogram(
+    "stage_duration_seconds",
+    "Latency of individually timed hot-path stages.",
+    ("stage",),
+)
+MODEL_LOAD_SECONDS = registry.gauge(
+    "model_load_seconds",
+    "Time spent loading (or training) the model bundle at startup.",
+    ("source",),
+)
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total",
+    "Cache lookups by cache name and result (hit or miss).",
+    ("cache", "result"),
+)
+SCORE_BATCH_SIZE = registry.histogram(
+    "score_batch_size",
+    "Single-loan score requests coalesced into each micro-batch.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+SCORE_BATCH_FLUSHES = registry.counter(
+    "score_batch_flushes_total",
+    "Micro-batch flushes by trigger (window elapsed or batch full).",
+    ("reason",),
+)
+READ_SESSIONS = registry.counter(
+    "db_read_sessions_total",
+    "Analytical read sessions by target (replica, primary_stale, primary_unavailable).",
+    ("target",),
+)
+READ_REPLICA_LAG_SECONDS = registry.gauge(
+    "db_read_replica_lag_seconds",
+    "Age of the oldest prediction committed on the primary but not yet visible on the replica.",
+)
+CACHE_EVICTIONS = registry.counter(
+    "cache_evictions_total",
+    "Entries evicted from bounded in-process caches.",
+    ("cache",),
+)
+COMPARABLES_INDEX_LOANS = registry.gauge(
+    "comparables_index_loans",
+    "Loans in the comparables index by part (main tree or incremental delta).",
+    ("part",),
+)
+COMPARABLES_INDEX_UPDATES = registry.counter(
+    "comparables_index_updates_total",
+    "Comparables index updates by kind (disk, rebuild, delta, error).",
+    ("kind",),
+)
+
+
+def process_memory(pid: int | str = "self") -> dict[str, int]:
+    """RSS, PSS, USS and shared bytes for a process from /proc/<pid>/smaps_rollup (Linux only).
+
+    USS is the private (unshared) part, i.e. what the kernel would free if the process exited;
+    it is the number that shows whether forked workers really share the parent's pages.
+    """
+    fields: dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as handle:
+            for line in handle:
+                name, _, rest = line.partition(":")
+                parts = rest.split()
+                if len(parts) == 2 and parts[1] == "kB":
+                    fields[name] = int(parts[0]) * 1024
+    except OSError:
+        return {}
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    }
+
+
+PROCESS_MEMORY = registry.gauge(
+    "process_memory_bytes",
+    "Memory of this worker process by kind (rss, pss, uss, shared).",
+    ("kind",),
+    callback=lambda: {(kind,): float(value) for kind, value in process_memory().items()},
+)
+
+
+def time_stage(stage: str) -> StageTimer:
+    return StageTimer(STAGE_LATENCY, (stage,))
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request latency keyed by the matched route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_holder = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start,
+                scope.get("method", ""),
+                route_path,
+                str(status_holder[0]),
+            )
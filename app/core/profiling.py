@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import cProfile
+import functools
+import inspect
+import io
+import pstats
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+
+_current_profile: ContextVar[ProfileContext | None] = ContextVar("current_profile", default=None)
+# Python 3.12+ allows one active profiler per process (sys.monitoring), so sampled requests that
+# overlap run unprofiled instead of failing.
+_profiler_lock = threading.Lock()
+
+
+def route_key(route_path: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", route_path).strip("_") or "root"
+
+
+class ProfileSampler:
+    """Decides which requests get profiled: a random fraction, plus the next few after a slow one."""
+
+    def __init__(self, sample_rate: float, slow_captures: int):
+        self.sample_rate = sample_rate
+        self.slow_captures = slow_captures
+        self._armed: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def should_profile(self, route_path: str) -> bool:
+        if self._armed:
+            with self._lock:
+                remaining = self._armed.get(route_path, 0)
+                if remaining > 0:
+                    self._armed[route_path] = remaining - 1
+                    return True
+        return random.random() < self.sample_rate
+
+    def arm(self, route_path: str) -> None:
+        with self._lock:
+            self._armed[route_path] = self.slow_captures
+
+
+@dataclass
+class ProfileContext:
+    sampler: ProfileSampler
+    profiler: cProfile.Profile | None = None
+
+
+class ProfileStore:
+    """Per-route directory of ``.prof`` captures, rotated to the newest ``max_files``."""
+
+    def __init__(self, root: str | Path, max_files: int):
+        self.root = Path(root)
+        self.max_files = max_files
+
+    def save(self, route_path: str, profiler: cProfile.Profile, elapsed_ms: float) -> Path:
+        route_dir = self.root / route_key(route_path)
+        route_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S_%f")
+        out_path = route_dir / f"{timestamp}_{elapsed_ms:.0f}ms.prof"
+        profiler.create_stats()
+        pstats.Stats(profiler).dump_stats(str(out_path))
+        self._rotate(route_dir)
+        return out_path
+
+    def _rotate(self, route_dir: Path) -> None:
+        captures = sorted(route_dir.glob("*.prof"))
+        for stale in captures[: max(0, len(captures) - self.max_files)]:
+            stale.unlink(missing_ok=True)
+
+    def routes(self) -> dict[str, int]:
+        if not self.root.exists():
+            return {}
+        return {
+            route_dir.name: len(list(route_dir.glob("*.prof")))
+            for route_dir in sorted(self.root.iterdir())
+            if route_dir.is_dir()
+        }
+
+    def aggregate(self, key: str) -> pstats.Stats | None:
+        route_dir = self.root / route_key(key)
+        captures = sorted(route_dir.glob("*.prof")) if route_dir.is_dir() else []
+        if not captures:
+            return None
+        stats = pstats.Stats(str(captures[0]), stream=io.StringIO())
+        for capture in captures[1:]:
+            stats.add(str(capture))
+        return stats
+
+
+def render_stats_text(stats: pstats.Stats, limit: int = 40) -> str:
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.sort_stats("cumulative").print_stats(limit)
+    return stream.getvalue()
+
+
+def _frame_label(func: tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{Path(filename).name}:{name}:{line}"
+
+
+def render_collapsed_stacks(stats: pstats.Stats, max_depth: int = 64, min_fraction: float = 0.001) -> str:
+    """Folded-stack lines (``a;b;c <microseconds>``) for flamegraph.pl or speedscope.
+
+    cProfile keeps caller/callee edges rather than full stacks, so each edge's cumulative
+    time is split across callees in proportion; the result is an approximation. Branches
+    below ``min_fraction`` of total time are folded into their parent to bound the output.
+    """
+    raw = stats.stats  # type: ignore[attr-defined]
+    callees: dict[tuple, list[tuple[tuple, float]]] = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    lines: dict[str, float] = {}
+    roots = [func for func, (_, _, _, _, callers) in raw.items() if not callers]
+    min_budget = sum(raw[root][3] for root in roots) * min_fraction
+
+    def walk(func: tuple, budget: float, stack: list[str], seen: set) -> None:
+        stack = [*stack, _frame_label(func)]
+        children = [(child, ct) for child, ct in callees.get(func, []) if child not in seen]
+        total_child = sum(ct for _, ct in children)
+        node_ct = raw[func][3] or budget
+        scale = budget / node_ct if node_ct else 0.0
+        child_time = min(total_child * scale, budget)
+        if len(stack) >= max_depth:
+            total_child = child_time = 0.0
+        self_time = budget - child_time
+        if self_time > 0:
+            key = ";".join(stack)
+            lines[key] = lines.get(key, 0.0) + self_time
+        if total_child == 0:
+            return
+        for child, ct in children:
+            child_budget = child_time * (ct / total_child)
+            if child_budget >= min_budget:
+                walk(child, child_budget, stack, seen | {func})
+            elif child_budget > 0:
+                key = ";".join(stack)
+                lines[key] = lines.get(key, 0.0) + child_budget
+
+    for root in roots:
+        walk(root, raw[root][3], [], set())
+
+    return "\n".join(f"{stack} {int(round(seconds * 1e6))}" for stack, seconds in sorted(lines.items()) if seconds > 0)
+
+
+sampler = ProfileSampler(settings.profiling_sample_rate, settings.profiling_slow_captures)
+profile_store = ProfileStore(settings.profiles_dir, settings.profiling_max_files)
+
+
+class ProfiledRoute(APIRoute):
+    """Runs sampled sync endpoints under cProfile inside the worker thread that executes them."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        # include_router re-creates routes with the same class; wrap only once.
+        if not inspect.iscoroutinefunction(endpoint) and not getattr(endpoint, "__profiled__", False):
+            endpoint = self._wrap(path, endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    @staticmethod
+    def _wrap(path: str, endpoint):
+        @functools.wraps(endpoint)
+        def profiled_endpoint(*args, **kwargs):
+            context = _current_profile.get()
+            if context is None or not _profiler_lock.acquire(blocking=False):
+                return endpoint(*args, **kwargs)
+            try:
+                if not context.sampler.should_profile(path):
+                    return endpoint(*args, **kwargs)
+                context.profiler = cProfile.Profile()
+                return context.profiler.runcall(endpoint, *args, **kwargs)
+            finally:
+                _profiler_lock.release()
+
+        profiled_endpoint.__profiled__ = True
+        return profiled_endpoint
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware that stores sampled profiles and arms routes after slow requests."""
+
+    def __init__(
+        self,
+        app,
+        store: ProfileStore = profile_store,
+        profile_sampler: ProfileSampler = sampler,
+        slow_ms: float = settings.profiling_slow_ms,
+    ):
+        self.app = app
+        self.store = store
+        self.sampler = profile_sampler
+        self.slow_seconds = slow_ms / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        context = ProfileContext(sampler=self.sampler)
+        token = _current_profile.set(context)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_profile.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                if context.profiler is not None:
+                    await run_in_threadpool(self.store.save, route.path, context.profiler, elapsed * 1000)
+                elif elapsed >= self.slow_seconds:
+                    self.sampler.arm(route.path)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.metrics import READ_REPLICA_LAG_SECONDS, READ_SESSIONS
+from app.models.prediction import PredictionResult
+
+
+class ReadReplicaRouter:
+    """Hands out read sessions on the replica while it is within ``max_lag_seconds`` of the primary.
+
+    Lag is measured from data rather than from database-specific replication views, so a
+    Postgres standby and a periodically copied SQLite file are judged the same way. It is the
+    age of the oldest prediction the primary has committed and the replica has not yet seen
+    (0 when the replica is caught up). The check costs two primary-key lookups and its verdict
+    is reused for ``check_interval_seconds``. A stale or unreachable replica sends reads to the
+    primary until the next check.
+    """
+
+    def __init__(
+        self,
+        primary: sessionmaker,
+        replica: sessionmaker | None,
+        max_lag_seconds: float,
+        check_interval_seconds: float = 1.0,
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._lock = threading.Lock()
+        self._checked_at = float("-inf")
+        self._target = "primary"
+
+    @property
+    def enabled(self) -> bool:
+        return self.replica is not None
+
+    def session(self) -> Session:
+        if self.replica is None:
+            return self.primary()
+        target = self._current_target()
+        READ_SESSIONS.inc(target)
+        return self.replica() if target == "replica" else self.primary()
+
+    def _current_target(self) -> str:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked_at >= self.check_interval_seconds:
+                self._target = self._evaluate()
+                self._checked_at = now
+            return self._target
+
+    def _evaluate(self) -> str:
+        try:
+            lag = self.lag_seconds()
+        except SQLAlchemyError:
+            return "primary_unavailable"
+        READ_REPLICA_LAG_SECONDS.set(lag)
+        return "replica" if lag <= self.max_lag_seconds else "primary_stale"
+
+    def lag_seconds(self) -> float:
+        with self.replica() as replica_db:
+            replica_newest = replica_db.execute(
+                select(PredictionResult.id).order_by(PredictionResult.id.desc()).limit(1)
+            ).scalar()
+        with self.primary() as primary_db:
+            query = select(PredictionResult.created_at).order_by(PredictionResult.id).limit(1)
+            if replica_newest is not None:
+                query = query.where(PredictionResult.id > replica_newest)
+            oldest_missing = primary_db.execute(query).scalar()
+        if oldest_missing is None:
+            return 0.0
+        return max(0.0, (datetime.utcnow() - oldest_missing).total_seconds())
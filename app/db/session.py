@@ -1,9 +1,11 @@
 from pathlib import Path
 
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.core.metrics import registry
+from app.db.replica import ReadReplicaRouter
 
 
 def _prepare_sqlite_path(database_url: str) -> None:
@@ -19,12 +21,42 @@ def _prepare_sqlite_path(database_url: str) -> None:
     Path(db_path).parent.mkdir(parents=True, exist_ok=True)
 
 
-_prepare_sqlite_path(settings.database_url)
+def _create_engine(database_url: str):
+    _prepare_sqlite_path(database_url)
+    connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+    return create_engine(database_url, connect_args=connect_args)
 
-connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
-engine = create_engine(settings.database_url, connect_args=connect_args)
+
+engine = _create_engine(settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional replica for analytical reads; without READ_DATABASE_URL every read uses the primary.
+read_engine = _create_engine(settings.read_database_url) if settings.read_database_url else None
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine) if read_engine is not None else None
+read_router = ReadReplicaRouter(
+    SessionLocal,
+    ReadSessionLocal,
+    max_lag_seconds=settings.read_replica_max_lag_seconds,
+    check_interval_seconds=settings.read_replica_check_seconds,
+)
+
+
+def _pool_stats() -> dict[tuple[str, ...], float]:
+    stats: dict[tuple[str, ...], float] = {}
+    for state, reader_name in (
+        ("size", "size"),
+        ("checked_out", "checkedout"),
+        ("checked_in", "checkedin"),
+        ("overflow", "overflow"),
+    ):
+        reader = getattr(engine.pool, reader_name, None)
+        if callable(reader):
+            stats[(state,)] = float(reader())
+    return stats
+
+
+registry.gauge("db_pool_connections", "Database connection pool utilization.", ("state",), callback=_pool_stats)
+
 
 def get_db():
     db = SessionLocal()
@@ -32,3 +64,16 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def read_session() -> Session:
+    """A session for analytical reads (the replica when it is configured and fresh enough)."""
+    return read_router.session()
+
+
+def get_read_db():
+    db = read_session()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from sqlalchemy.orm import Session
+
+# SQLite (3.32+) caps bound parameters per statement at 32,766 and PostgreSQL at 65,535; each
+# upsert statement stays under the lower of the two.
+MAX_BIND_PARAMETERS = 32_000
+
+
+def increment_counters(
+    db: Session,
+    model,
+    key_columns: tuple[str, ...],
+    counter_columns: tuple[str, ...],
+    values: list[dict],
+) -> None:
+    """Add ``values`` onto existing counter rows keyed by ``key_columns``, inserting missing rows.
+
+    Uses ``INSERT ... ON CONFLICT DO UPDATE`` on SQLite and PostgreSQL, one statement per
+    slice of rows that fits ``MAX_BIND_PARAMETERS``; other dialects fall back to a locked
+    read-modify-write per row.
+    """
+    if not values:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        _increment_portable(db, model, key_columns, counter_columns, values)
+        return
+
+    table = model.__table__
+    batch_size = max(1, MAX_BIND_PARAMETERS // len(values[0]))
+    for start in range(0, len(values), batch_size):
+        stmt = insert(table).values(values[start : start + batch_size])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={column: table.c[column] + stmt.excluded[column] for column in counter_columns},
+        )
+        db.execute(stmt)
+
+
+def _increment_portable(db: Session, model, key_columns, counter_columns, values: list[dict]) -> None:
+    for value in values:
+        existing = (
+            db.query(model)
+            .filter_by(**{column: value[column] for column in key_columns})
+            .with_for_update()
+            .one_or_none()
+        )
+        if existing is None:
+            db.add(model(**value))
+            continue
+        for column in counter_columns:
+            setattr(existing, column, getattr(existing, column) + value[column])
@@ -1,21 +1,59 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
-from app.api.routes import router as api_router
+from app.api.admin import router as admin_router
+from app.api.routes import comparables_index, model_service, rollup_service, router as api_router
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.profiling import ProfilingMiddleware
 from app.db.base import Base
-from app.db.session import engine
+from app.db.session import SessionLocal, engine
+from app.models.archive import PredictionArchiveStat
 from app.models.loan import LoanScenario
+from app.models.performance import ModelPerformanceBin
 from app.models.prediction import PredictionResult
+from app.models.rollup import PortfolioRollup, ScoreDistributionBin
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # Runs in each serving process (after any fork), so every worker gets its own updater thread.
+    comparables_index.start()
+    yield
+    comparables_index.stop()
+
 
-app = FastAPI(title="Mortgage Risk & Retention Analytics API", version="0.1.0")
+app = FastAPI(title="Mortgage Risk & Retention Analytics API", version="0.1.0", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
 
 LoanScenario
 PredictionResult
+PortfolioRollup
+ScoreDistributionBin
+ModelPerformanceBin
+PredictionArchiveStat
 Base.metadata.create_all(bind=engine)
 
+with SessionLocal() as startup_db:
+    rollup_service.backfill_if_empty(startup_db)
+
+if settings.model_warmup:
+    model_service.warm_up()
+
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 app.include_router(api_router)
+app.include_router(admin_router)
@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class PredictionArchiveStat(Base):
+    """Per-day, per-model aggregates of predictions moved out of the OLTP tables into Parquet."""
+
+    __tablename__ = "prediction_archive_stats"
+    __table_args__ = (UniqueConstraint("day", "model_version", name="uq_prediction_archive_stat"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[datetime] = mapped_column(DateTime)
+    model_version: Mapped[str] = mapped_column(String(50))
+
+    scored_count: Mapped[int] = mapped_column(Integer, default=0)
+    risk_score_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    retention_score_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    high_risk_count: Mapped[int] = mapped_column(Integer, default=0)
+    low_retention_count: Mapped[int] = mapped_column(Integer, default=0)
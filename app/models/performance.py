@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ModelPerformanceBin(Base):
+    __tablename__ = "model_performance_bins"
+    __table_args__ = (
+        UniqueConstraint("model_version", "window_start", "outcome", "score_bin", name="uq_model_performance_bin"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    model_version: Mapped[str] = mapped_column(String(50))
+    window_start: Mapped[datetime] = mapped_column(DateTime)
+    outcome: Mapped[str] = mapped_column(String(16))
+    score_bin: Mapped[int] = mapped_column(Integer)
+
+    positive_count: Mapped[int] = mapped_column(Integer, default=0)
+    negative_count: Mapped[int] = mapped_column(Integer, default=0)
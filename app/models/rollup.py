@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Index, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class PortfolioRollup(Base):
+    __tablename__ = "portfolio_rollups"
+    __table_args__ = (
+        UniqueConstraint("granularity", "bucket_start", "model_version", "segment", "band", name="uq_portfolio_rollup"),
+        Index("ix_portfolio_rollup_lookup", "granularity", "segment", "bucket_start"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    granularity: Mapped[str] = mapped_column(String(8))
+    bucket_start: Mapped[datetime] = mapped_column(DateTime)
+    model_version: Mapped[str] = mapped_column(String(50))
+    segment: Mapped[str] = mapped_column(String(32))
+    band: Mapped[str] = mapped_column(String(32))
+
+    scored_count: Mapped[int] = mapped_column(Integer, default=0)
+    risk_score_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    retention_score_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    high_risk_count: Mapped[int] = mapped_column(Integer, default=0)
+    low_retention_count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class ScoreDistributionBin(Base):
+    """Loans scored per day, model version and (risk, retention) score bin."""
+
+    __tablename__ = "score_distribution_bins"
+    __table_args__ = (
+        UniqueConstraint("day", "model_version", "risk_bin", "retention_bin", name="uq_score_distribution_bin"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[datetime] = mapped_column(DateTime)
+    model_version: Mapped[str] = mapped_column(String(50))
+    risk_bin: Mapped[int] = mapped_column(Integer)
+    retention_bin: Mapped[int] = mapped_column(Integer)
+
+    scored_count: Mapped[int] = mapped_column(Integer, default=0)
@@ -1,4 +1,6 @@
-from pydantic import BaseModel, Field
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field, ValidationError, model_validator
 
 
 class LoanRequest(BaseModel):
@@ -11,3 +13,55 @@ class LoanRequest(BaseModel):
     loan_amount: float = Field(gt=0)
     interest_rate: float = Field(gt=0, le=30)
     tenure_years: int = Field(gt=0, le=40)
+
+
+class LoanBatchRequest(BaseModel):
+    loans: list[dict[str, Any]] = Field(min_length=1, max_length=100_000)
+
+
+class SensitivityAxis(BaseModel):
+    feature: Literal["ltv", "dti", "credit_score", "interest_rate"]
+    start: float
+    stop: float
+    points: int = Field(default=25, ge=2, le=200)
+
+
+class SensitivityRequest(BaseModel):
+    loan: LoanRequest
+    axes: list[SensitivityAxis] = Field(min_length=1, max_length=2)
+
+    @model_validator(mode="after")
+    def _axes_within_loan_bounds(self):
+        features = [axis.feature for axis in self.axes]
+        if len(set(features)) != len(features):
+            raise ValueError("Each feature can appear on only one axis")
+        base = self.loan.model_dump()
+        for axis in self.axes:
+            for value in (axis.start, axis.stop):
+                try:
+                    LoanRequest(**{**base, axis.feature: round(value) if axis.feature == "credit_score" else value})
+                except ValidationError as exc:
+                    raise ValueError(f"{axis.feature}={value} is outside the allowed range for a loan") from exc
+        return self
+
+
+class LoanOutcome(BaseModel):
+    loan_id: int
+    defaulted: bool | None = None
+    retained: bool | None = None
+
+
+class OutcomeBatchRequest(BaseModel):
+    outcomes: list[LoanOutcome] = Field(min_length=1, max_length=100_000)
+
+
+class OutcomeIngestResponse(BaseModel):
+    received: int
+    updated: int
+    unchanged: int
+    unknown_loan_ids: list[int]
+
+
+class ComparablesBatchRequest(BaseModel):
+    loan_ids: list[int] = Field(min_length=1, max_length=1000)
+    k: int = Field(default=10, ge=1, le=100)
@@ -1,4 +1,9 @@
-from pydantic import BaseModel, Field
+from typing import Annotated
+
+from pydantic import BaseModel, Field, model_validator
+
+MAX_SIMULATION_CELLS = 10_000_000
+MAX_PLAN_ACTIONS = 20_000
 
 
 class CapacityOptimizationRequest(BaseModel):
@@ -10,6 +15,12 @@ class CapacityOptimizationRequest(BaseModel):
     max_threshold: float = Field(ge=0.4, le=0.95)
     step: float = Field(gt=0, le=0.1)
 
+    @model_validator(mode="after")
+    def _ordered_thresholds(self):
+        if self.min_threshold > self.max_threshold:
+            raise ValueError("min_threshold must be <= max_threshold")
+        return self
+
 
 class CapacityScenario(BaseModel):
     threshold: float
@@ -23,3 +34,84 @@ class CapacityOptimizationResponse(BaseModel):
     recommended_threshold: float
     recommended_underwriters: int
     scenarios: list[CapacityScenario]
+
+
+class CapacitySimulationRequest(CapacityOptimizationRequest):
+    simulations: int = Field(default=10_000, ge=100, le=1_000_000)
+    service_level: float = Field(default=0.95, gt=0.5, lt=1)
+    seed: int | None = None
+
+    @model_validator(mode="after")
+    def _bounded_grid(self):
+        thresholds = int((self.max_threshold - self.min_threshold) / self.step + 1e-9) + 1
+        if self.simulations * thresholds > MAX_SIMULATION_CELLS:
+            raise ValueError(
+                f"simulations x thresholds must be <= {MAX_SIMULATION_CELLS:,}; "
+                "use fewer simulations or a coarser step"
+            )
+        return self
+
+
+class SimulatedCapacityScenario(BaseModel):
+    threshold: float
+    mean_manual_reviews: float
+    p95_manual_reviews: int
+    required_underwriters_mean: float
+    required_underwriters_p50: int
+    required_underwriters_p90: int
+    required_underwriters_p95: int
+    required_underwriters_distribution: dict[int, float]
+    recommended_underwriters: int
+    shortfall_probability: float
+    captured_high_risk_rate_mean: float
+    captured_high_risk_rate_p05: float
+
+
+class CapacitySimulationResponse(BaseModel):
+    recommended_threshold: float
+    recommended_underwriters: int
+    simulations: int
+    service_level: float
+    scenarios: list[SimulatedCapacityScenario]
+
+
+class CapacityPlanRequest(BaseModel):
+    daily_applications: list[Annotated[int, Field(gt=0, le=20000)]] = Field(min_length=1, max_length=92)
+    review_capacity_per_underwriter: int = Field(gt=0, le=500)
+    max_underwriters: int = Field(gt=0, le=1000)
+    min_threshold: float = Field(ge=0.4, le=0.9)
+    max_threshold: float = Field(ge=0.4, le=0.95)
+    step: float = Field(gt=0, le=0.1)
+    initial_backlog: int = Field(default=0, ge=0, le=1_000_000)
+    staffing_weight: float = Field(default=0.01, ge=0, le=1)
+    backlog_weight: float = Field(default=1.0, ge=0, le=100)
+    backlog_risk_shift_per_day: float | None = Field(default=None, ge=0, le=0.1)
+
+    @model_validator(mode="after")
+    def _bounded_actions(self):
+        if self.min_threshold > self.max_threshold:
+            raise ValueError("min_threshold must be <= max_threshold")
+        thresholds = int((self.max_threshold - self.min_threshold) / self.step + 1e-9) + 1
+        if thresholds * self.max_underwriters > MAX_PLAN_ACTIONS:
+            raise ValueError(f"thresholds x max_underwriters must be <= {MAX_PLAN_ACTIONS:,}; use a coarser step")
+        return self
+
+
+class PlannedDay(BaseModel):
+    day: int
+    daily_applications: int
+    threshold: float
+    underwriters: int
+    starting_backlog: float
+    expected_manual_reviews: float
+    processed_reviews: float
+    ending_backlog: float
+    expected_wait_days: int
+    captured_high_risk_rate: float
+
+
+class CapacityPlanResponse(BaseModel):
+    horizon_days: int
+    objective: float
+    backlog_risk_shift_per_day: float
+    days: list[PlannedDay]
@@ -26,12 +26,25 @@ class TopFeature(BaseModel):
     importance: float
 
 
+class LiveModelPerformance(BaseModel):
+    model_version: str
+    labelled_default_count: int
+    observed_default_rate: float | None
+    roc_auc: float | None
+    precision_high_risk: float | None
+    recall_high_risk: float | None
+    labelled_retention_count: int
+    observed_retention_rate: float | None
+    retention_roc_auc: float | None
+
+
 class ModelPerformanceResponse(BaseModel):
     roc_auc: float
     precision_high_risk: float
     recall_high_risk: float
     cross_validated_accuracy: float
     top_predictive_features: list[TopFeature]
+    live: list[LiveModelPerformance] = []
 
 
 class ModelExplainabilityResponse(BaseModel):
@@ -40,3 +53,154 @@ class ModelExplainabilityResponse(BaseModel):
     feature_importance: dict[str, float]
     feature_importance_plot_path: str
     model_governance: dict[str, str | list[str]]
+
+
+class FieldError(BaseModel):
+    field: str
+    message: str
+
+
+class RowValidationReport(BaseModel):
+    row: int
+    errors: list[FieldError]
+
+
+class BatchScoreItem(BaseModel):
+    row: int
+    loan_id: int
+    prediction_id: int
+    risk_score: float
+    retention_score: float
+    recommendation: str
+
+
+class BatchScoreResponse(BaseModel):
+    model_version: str
+    scored_count: int
+    rejected_count: int
+    results: list[BatchScoreItem]
+    errors: list[RowValidationReport]
+
+
+class PredictionListItem(BaseModel):
+    prediction_id: int
+    loan_id: int
+    created_at: datetime
+    model_version: str
+    risk_score: float
+    retention_score: float
+    recommendation: str
+
+
+class PredictionListResponse(BaseModel):
+    predictions: list[PredictionListItem]
+
+
+class TimeseriesPoint(BaseModel):
+    bucket_start: datetime
+    segment_value: str
+    total_scored: int
+    avg_risk_score: float
+    avg_retention_score: float
+    high_risk_count: int
+    low_retention_count: int
+
+
+class PortfolioTimeseriesResponse(BaseModel):
+    granularity: str
+    segment: str
+    source: str
+    high_risk_threshold: float
+    low_retention_threshold: float
+    points: list[TimeseriesPoint]
+
+
+class DriftMetric(BaseModel):
+    name: str
+    observations: int
+    psi: float
+    ks_statistic: float
+    live_mean: float
+    reference_mean: float
+    live_std: float
+    reference_std: float
+    status: str
+
+
+class ModelDriftResponse(BaseModel):
+    model_version: str
+    reference_available: bool
+    observations: int
+    features: list[DriftMetric]
+    scores: list[DriftMetric]
+
+
+class ValuationBand(BaseModel):
+    band: str
+    loan_count: int
+    exposure: float
+    exposure_share: float
+    expected_loss: float
+    expected_loss_share: float
+    interest_income_at_risk: float
+
+
+class ValuationSegment(BaseModel):
+    segment: str
+    herfindahl_index: float
+    bands: list[ValuationBand]
+
+
+class PortfolioValuationResponse(BaseModel):
+    loss_given_default: float
+    horizon_years: int
+    loan_count: int
+    total_exposure: float
+    expected_loss: float
+    expected_loss_rate: float
+    annual_interest_income: float
+    interest_income_at_risk: float
+    segments: list[ValuationSegment]
+
+
+class SensitivityAxisValues(BaseModel):
+    feature: str
+    values: list[float]
+
+
+class SensitivityResponse(BaseModel):
+    model_version: str
+    base_risk_score: float
+    base_retention_score: float
+    axes: list[SensitivityAxisValues]
+    risk_scores: list[float] | list[list[float]]
+    retention_scores: list[float] | list[list[float]]
+
+
+class ComparableLoan(BaseModel):
+    loan_id: int
+    distance: float
+    credit_score: int
+    ltv: float
+    dti: float
+    income: float
+    loan_amount: float
+    interest_rate: float
+    tenure_years: int
+    defaulted: bool | None
+    retained: bool | None
+    risk_score: float | None
+    retention_score: float | None
+    model_version: str | None
+
+
+class ComparablesResponse(BaseModel):
+    loan_id: int
+    index_size: int
+    comparables: list[ComparableLoan]
+
+
+class ComparablesBatchResponse(BaseModel):
+    index_size: int
+    results: list[ComparablesResponse]
+    missing_loan_ids: list[int]
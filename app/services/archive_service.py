@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import os
+import uuid
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import case, delete, exists, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.upsert import increment_counters
+from app.models.archive import PredictionArchiveStat
+from app.models.loan import LoanScenario
+from app.models.prediction import PredictionResult
+
+ARCHIVE_KEY_COLUMNS = ("day", "model_version")
+ARCHIVE_COUNTER_COLUMNS = (
+    "scored_count",
+    "risk_score_sum",
+    "retention_score_sum",
+    "high_risk_count",
+    "low_retention_count",
+)
+ARCHIVE_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("loan_id", pa.int64()),
+        ("created_at", pa.timestamp("us")),
+        ("model_version", pa.string()),
+        ("risk_score", pa.float64()),
+        ("retention_score", pa.float64()),
+        ("recommendation", pa.string()),
+        ("credit_score", pa.int64()),
+        ("ltv", pa.float64()),
+        ("dti", pa.float64()),
+        ("income", pa.float64()),
+        ("loan_amount", pa.float64()),
+        ("interest_rate", pa.float64()),
+        ("tenure_years", pa.int64()),
+        ("defaulted", pa.bool_()),
+        ("retained", pa.bool_()),
+    ]
+)
+DAY_PARTITIONING = ds.partitioning(pa.schema([("day", pa.string())]), flavor="hive")
+DATASET_SCHEMA = ARCHIVE_SCHEMA.append(pa.field("day", pa.string()))
+# SQLite caps bound parameters per statement; deletes go out in slices of this many ids.
+DELETE_BATCH = 5000
+
+
+class PredictionArchiveService:
+    """Moves aged predictions (and their fully labelled loans) into day-partitioned Parquet files.
+
+    Layout is ``<archive_dir>/predictions/day=YYYY-MM-DD/part-<min id>-<max id>.parquet``. Each
+    archived chunk also adds its counts and score sums to ``prediction_archive_stats`` in the
+    same transaction that deletes the hot rows, so summaries stay exact without reading Parquet.
+    A crash between writing a file and committing can leave rows in both places; readers
+    de-duplicate on prediction id and the retry rewrites the same file name.
+    """
+
+    def __init__(
+        self,
+        archive_dir: str | Path | None = None,
+        archive_after_days: int = settings.archive_after_days,
+        chunk_size: int = settings.archive_chunk_size,
+        high_risk_threshold: float = settings.high_risk_threshold,
+        low_retention_threshold: float = settings.low_retention_threshold,
+    ):
+        self.root = Path(archive_dir or settings.archive_dir) / "predictions"
+        self.archive_after_days = archive_after_days
+        self.chunk_size = chunk_size
+        self.high_risk_threshold = high_risk_threshold
+        self.low_retention_threshold = low_retention_threshold
+
+    def cutoff(self, now: datetime | None = None) -> datetime:
+        """Start of the oldest day kept hot; only whole days are archived."""
+        now = now or datetime.utcnow()
+        return (now - timedelta(days=self.archive_after_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def archive(self, db: Session, now: datetime | None = None) -> dict:
+        cutoff = self.cutoff(now)
+        query = (
+            select(
+                PredictionResult.id,
+                PredictionResult.loan_id,
+                PredictionResult.created_at,
+                PredictionResult.model_version,
+                PredictionResult.risk_score,
+                PredictionResult.retention_score,
+                PredictionResult.recommendation,
+                LoanScenario.credit_score,
+                LoanScenario.ltv,
+                LoanScenario.dti,
+                LoanScenario.income,
+                LoanScenario.loan_amount,
+                LoanScenario.interest_rate,
+                LoanScenario.tenure_years,
+                LoanScenario.defaulted,
+                LoanScenario.retained,
+            )
+            .outerjoin(LoanScenario, PredictionResult.loan_id == LoanScenario.id)
+            .where(PredictionResult.created_at < cutoff)
+            .order_by(PredictionResult.id)
+            .limit(self.chunk_size)
+        )
+        summary = {"cutoff": cutoff, "predictions": 0, "loans": 0, "files": 0, "days": 0}
+        days_seen: set[datetime] = set()
+        while True:
+            rows = db.execute(query).all()
+            if not rows:
+                break
+            frame = pd.DataFrame(rows, columns=ARCHIVE_SCHEMA.names)
+            frame["created_at"] = pd.to_datetime(frame["created_at"])
+            days = frame["created_at"].dt.floor("D")
+            for day, part in frame.groupby(days, sort=True):
+                self._write(self.root / f"day={day:%Y-%m-%d}", pa.Table.from_pandas(part, schema=ARCHIVE_SCHEMA, preserve_index=False))
+                summary["files"] += 1
+                days_seen.add(day)
+            self._record_stats(db, frame, days)
+            summary["loans"] += self._delete(db, frame["id"].tolist(), frame["loan_id"].tolist())
+            db.commit()
+            summary["predictions"] += len(frame)
+        summary["days"] = len(days_seen)
+        return summary
+
+    def _write(self, directory: Path, table: pa.Table) -> Path:
+        directory.mkdir(parents=True, exist_ok=True)
+        ids = table.column("id")
+        path = directory / f"part-{pc.min(ids).as_py()}-{pc.max(ids).as_py()}.parquet"
+        # Dot-prefixed temp files are ignored by readers until the atomic rename.
+        temporary = directory / f".{path.name}.{uuid.uuid4().hex}.tmp"
+        pq.write_table(table, temporary)
+        os.replace(temporary, path)
+        return path
+
+    def _record_stats(self, db: Session, frame: pd.DataFrame, days: pd.Series) -> None:
+        grouped = (
+            frame.assign(
+                day=days,
+                high_risk=(frame["risk_score"] >= self.high_risk_threshold).astype(int),
+                low_retention=(frame["retention_score"] < self.low_retention_threshold).astype(int),
+            )
+            .groupby(["day", "model_version"], sort=True)
+            .agg(
+                scored_count=("id", "size"),
+                risk_score_sum=("risk_score", "sum"),
+                retention_score_sum=("retention_score", "sum"),
+                high_risk_count=("high_risk", "sum"),
+                low_retention_count=("low_retention", "sum"),
+            )
+        )
+        values = [
+            {
+                "day": day.to_pydatetime(),
+                "model_version": model_version,
+                "scored_count": int(row.scored_count),
+                "risk_score_sum": float(row.risk_score_sum),
+                "retention_score_sum": float(row.retention_score_sum),
+                "high_risk_count": int(row.high_risk_count),
+                "low_retention_count": int(row.low_retention_count),
+            }
+            for (day, model_version), row in grouped.iterrows()
+        ]
+        increment_counters(db, PredictionArchiveStat, ARCHIVE_KEY_COLUMNS, ARCHIVE_COUNTER_COLUMNS, values)
+
+    def _delete(self, db: Session, prediction_ids: list[int], loan_ids: list[int]) -> int:
+        for start in range(0, len(prediction_ids), DELETE_BATCH):
+            db.execute(
+                delete(PredictionResult)
+                .where(PredictionResult.id.in_(prediction_ids[start : start + DELETE_BATCH]))
+                .execution_options(synchronize_session=False)
+            )
+        # A loan re-scored after the cutoff keeps its row until its last prediction ages out, and
+        # a loan still waiting on an outcome keeps it so later outcomes have a row to land on.
+        still_scored = exists().where(PredictionResult.loan_id == LoanScenario.id)
+        outcomes_known = LoanScenario.defaulted.is_not(None) & LoanScenario.retained.is_not(None)
+        unique_loans = sorted(set(loan_ids))
+        deleted = 0
+        for start in range(0, len(unique_loans), DELETE_BATCH):
+            result = db.execute(
+                delete(LoanScenario)
+                .where(LoanScenario.id.in_(unique_loans[start : start + DELETE_BATCH]), ~still_scored, outcomes_known)
+                .execution_options(synchronize_session=False)
+            )
+            deleted += result.rowcount or 0
+        return deleted
+
+    def compact(self, min_files: int = 2) -> dict:
+        """Merge each day partition holding at least ``min_files`` parts into one id-sorted file."""
+        summary = {"partitions": 0, "files_before": 0, "files_after": 0}
+        if not self.root.exists():
+            return summary
+        for directory in sorted(self.root.glob("day=*")):
+            parts = sorted(directory.glob("part-*.parquet"))
+            summary["files_before"] += len(parts)
+            if len(parts) < min_files:
+                summary["files_after"] += len(parts)
+                continue
+            frame = (
+                pa.concat_tables([pq.read_table(part, schema=ARCHIVE_SCHEMA) for part in parts])
+                .to_pandas()
+                .drop_duplicates("id")
+                .sort_values("id")
+            )
+            merged = self._write(directory, pa.Table.from_pandas(frame, schema=ARCHIVE_SCHEMA, preserve_index=False))
+            for part in parts:
+                if part != merged:
+                    part.unlink()
+            summary["partitions"] += 1
+            summary["files_after"] += 1
+        return summary
+
+    def _dataset(self) -> ds.Dataset | None:
+        if not self.root.exists() or next(self.root.glob("day=*/part-*.parquet"), None) is None:
+            return None
+        return ds.dataset(self.root, schema=DATASET_SCHEMA, format="parquet", partitioning=DAY_PARTITIONING)
+
+    def read(
+        self,
+        columns: list[str],
+        start: datetime | None = None,
+        end: datetime | None = None,
+        model_version: str | None = None,
+    ) -> pd.DataFrame:
+        """Archived rows in ``[start, end]``; day partitions outside the range are never opened."""
+        dataset = self._dataset()
+        if dataset is None:
+            return pd.DataFrame(columns=columns)
+        conditions = []
+        if start is not None:
+            conditions.append(ds.field("day") >= f"{start:%Y-%m-%d}")
+            conditions.append(ds.field("created_at") >= pa.scalar(start, pa.timestamp("us")))
+        if end is not None:
+            conditions.append(ds.field("day") <= f"{end:%Y-%m-%d}")
+            conditions.append(ds.field("created_at") <= pa.scalar(end, pa.timestamp("us")))
+        if model_version is not None:
+            conditions.append(ds.field("model_version") == model_version)
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        table = dataset.to_table(columns=list(dict.fromkeys(["id", *columns])), filter=expression)
+        return table.to_pandas().drop_duplicates("id")[columns]
+
+    def read_loans(self, loan_ids: list[int], columns: list[str]) -> pd.DataFrame:
+        """Archived rows for the given loans, across every day partition."""
+        dataset = self._dataset()
+        if dataset is None or not loan_ids:
+            return pd.DataFrame(columns=columns)
+        table = dataset.to_table(columns=list(dict.fromkeys(["id", *columns])), filter=ds.field("loan_id").isin(loan_ids))
+        return table.to_pandas().drop_duplicates("id")[columns]
+
+    def iter_days(self, columns: list[str], db: Session | None = None) -> Iterator[pd.DataFrame]:
+        """Yield archived rows one day partition at a time (for rebuilds over the full history).
+
+        With ``db``, rows whose prediction is still in the hot table (a crash between writing the
+        file and committing the delete) are left out, so a rebuild that replays the archive and
+        then the hot rows counts each prediction once.
+        """
+        if self._dataset() is None:
+            return
+        for directory in sorted(self.root.glob("day=*")):
+            parts = sorted(directory.glob("part-*.parquet"))
+            if not parts:
+                continue
+            table = pa.concat_tables(
+                [pq.read_table(part, columns=list(dict.fromkeys(["id", *columns])), schema=ARCHIVE_SCHEMA) for part in parts]
+            )
+            frame = table.to_pandas().drop_duplicates("id")
+            if db is not None:
+                frame = frame[~frame["id"].isin(self._hot_ids(db, frame["id"].tolist()))]
+            yield frame[columns]
+
+    def _hot_ids(self, db: Session, prediction_ids: list[int]) -> set[int]:
+        hot: set[int] = set()
+        for start in range(0, len(prediction_ids), DELETE_BATCH):
+            hot.update(
+                db.execute(
+                    select(PredictionResult.id).where(PredictionResult.id.in_(prediction_ids[start : start + DELETE_BATCH]))
+                ).scalars()
+            )
+        return hot
+
+    def portfolio_summary(self, db: Session) -> dict:
+        """Portfolio KPIs over hot rows plus archived day statistics, without touching Parquet."""
+        return self.portfolio_snapshot(db)[0]
+
+    def portfolio_snapshot(self, db: Session) -> tuple[dict, int]:
+        """``portfolio_summary`` plus the highest prediction id it covers.
+
+        Both come from the same statement, so every prediction above the returned id was
+        committed after the summary was read.
+        """
+        *hot, last_prediction_id = db.execute(
+            select(
+                func.count(PredictionResult.id),
+                func.coalesce(func.sum(PredictionResult.risk_score), 0.0),
+                func.coalesce(func.sum(PredictionResult.retention_score), 0.0),
+                func.coalesce(func.sum(case((PredictionResult.risk_score >= settings.high_risk_threshold, 1), else_=0)), 0),
+                func.coalesce(
+                    func.sum(case((PredictionResult.retention_score < settings.low_retention_threshold, 1), else_=0)), 0
+                ),
+                func.coalesce(func.max(PredictionResult.id), 0),
+            )
+        ).one()
+        archived = db.execute(
+            select(*(func.coalesce(func.sum(getattr(PredictionArchiveStat, column)), 0) for column in ARCHIVE_COUNTER_COLUMNS))
+        ).one()
+        total, risk_sum, retention_sum, high_risk, low_retention = (
+            hot_value + archived_value for hot_value, archived_value in zip(hot, archived, strict=True)
+        )
+        summary = {
+            "total_scored": int(total),
+            "avg_risk_score": float(risk_sum) / total if total else 0.0,
+            "avg_retention_score": float(retention_sum) / total if total else 0.0,
+            "high_risk_count": int(high_risk),
+            "low_retention_count": int(low_retention),
+        }
+        return summary, int(last_prediction_id)
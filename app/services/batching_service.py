@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future
+from typing import Any
+
+from app.core.config import settings
+from app.core.metrics import SCORE_BATCH_FLUSHES, SCORE_BATCH_SIZE
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-item calls into one ``handler(items)`` call on a worker thread.
+
+    The first queued item opens a batch. The batch is flushed when ``window_ms`` has elapsed
+    or ``max_size`` items have arrived, whichever comes first. ``handler`` must return one
+    result per item, in order. If it raises, every caller in that batch gets the exception.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list[Any]], Sequence[Any]],
+        window_ms: float = settings.score_batch_window_ms,
+        max_size: int = settings.score_batch_max_size,
+    ):
+        self.handler = handler
+        self.window_seconds = window_ms / 1000
+        self.max_size = max_size
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, item: Any) -> Future:
+        future: Future = Future()
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="score-batcher", daemon=True)
+                    self._thread.start()
+        self._queue.put((item, future))
+        return future
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            stopping = False
+            deadline = time.monotonic() + self.window_seconds
+            reason = "size"
+            while len(batch) < self.max_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    reason = "window"
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    reason = "window"
+                    break
+                batch.append(entry)
+            self._flush(batch, reason)
+            if stopping:
+                return
+
+    def _flush(self, batch: list[tuple[Any, Future]], reason: str) -> None:
+        SCORE_BATCH_SIZE.observe(len(batch))
+        SCORE_BATCH_FLUSHES.inc(reason)
+        futures = [future for _, future in batch]
+        try:
+            results = self.handler([item for item, _ in batch])
+        except BaseException as exc:  # noqa: BLE001 - delivered to every waiting caller
+            for future in futures:
+                future.set_exception(exc)
+            return
+        for future, result in zip(futures, results, strict=True):
+            future.set_result(result)
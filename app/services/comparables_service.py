@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+from scipy.spatial import cKDTree
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import COMPARABLES_INDEX_LOANS, COMPARABLES_INDEX_UPDATES
+from app.models.loan import LoanScenario
+from app.models.prediction import PredictionResult
+
+# The scenario columns stored for every scored loan; processing-time features are not persisted.
+COMPARABLE_FEATURES = ("credit_score", "ltv", "dti", "income", "loan_amount", "interest_rate", "tenure_years")
+SCAN_BATCH = 50_000
+# SQLite caps bound parameters per statement; detail lookups go out in slices of this many ids.
+LOOKUP_BATCH = 5000
+
+
+def _tree(points: np.ndarray) -> cKDTree | None:
+    # Unbalanced, uncompacted trees build several times faster and query just as fast here.
+    return cKDTree(points, leafsize=32, balanced_tree=False, compact_nodes=False) if len(points) else None
+
+
+@dataclass(frozen=True)
+class _IndexState:
+    """One immutable snapshot; updates build a new state and swap it in, so queries never lock."""
+
+    ids: np.ndarray
+    tree: cKDTree | None
+    delta_ids: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    delta_points: np.ndarray = field(default_factory=lambda: np.empty((0, len(COMPARABLE_FEATURES))))
+    delta_tree: cKDTree | None = None
+    watermark: int = 0
+    built_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def size(self) -> int:
+        return len(self.ids) + len(self.delta_ids)
+
+
+class ComparablesIndex:
+    """Nearest-neighbour index of stored loans in the default model's standardized feature space.
+
+    A KD-tree over every loan known at the last full build is paired with a small delta tree
+    holding loans scored since then. A background thread polls for loans above the highest
+    indexed id every ``refresh_seconds`` and rebuilds only the delta tree; once the delta holds
+    ``delta_limit`` loans, or ``rebuild_seconds`` have passed, it rebuilds everything from the
+    database (which also drops archived loans) and persists the standardized points to
+    ``index_path`` so the next start skips the table scan. Loans deleted since the last build
+    can still be returned as neighbours until then; :meth:`describe` skips them.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        center: Sequence[float],
+        scale: Sequence[float],
+        index_path: str | Path | None = None,
+        refresh_seconds: float = settings.comparables_refresh_seconds,
+        rebuild_seconds: float = settings.comparables_rebuild_seconds,
+        delta_limit: int = settings.comparables_delta_limit,
+    ):
+        self.session_factory = session_factory
+        self.center = np.asarray(center, dtype=float)
+        self.scale = np.where(np.asarray(scale, dtype=float) > 0, np.asarray(scale, dtype=float), 1.0)
+        self.index_path = Path(index_path or settings.comparables_index_path)
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.delta_limit = delta_limit
+        self._state: _IndexState | None = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._update_lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._thread_pid: int | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._state is not None
+
+    @property
+    def size(self) -> int:
+        return self._state.size if self._state is not None else 0
+
+    def standardize(self, features: np.ndarray) -> np.ndarray:
+        return (np.asarray(features, dtype=float) - self.center) / self.scale
+
+    def _publish(self, state: _IndexState, kind: str) -> None:
+        self._state = state
+        self._ready.set()
+        COMPARABLES_INDEX_LOANS.set(len(state.ids), "main")
+        COMPARABLES_INDEX_LOANS.set(len(state.delta_ids), "delta")
+        COMPARABLES_INDEX_UPDATES.inc(kind)
+
+    def _scan(self, db: Session, after_id: int = 0) -> tuple[np.ndarray, np.ndarray]:
+        query = (
+            select(LoanScenario.id, *(getattr(LoanScenario, name) for name in COMPARABLE_FEATURES))
+            .where(LoanScenario.id > after_id)
+            .order_by(LoanScenario.id)
+        )
+        blocks = list(self._numeric_chunks(db, query))
+        if not blocks:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(COMPARABLE_FEATURES)))
+        values = np.concatenate(blocks)
+        return values[:, 0].astype(np.int64), self.standardize(values[:, 1:])
+
+    @staticmethod
+    def _numeric_chunks(db: Session, query) -> Iterator[np.ndarray]:
+        connection = db.connection()
+        if connection.dialect.name == "sqlite":
+            # Same raw-cursor fast path as the valuation scan: Row construction dominates otherwise.
+            compiled = query.compile(dialect=connection.dialect)
+            cursor = connection.connection.cursor()
+            try:
+                cursor.execute(str(compiled), [compiled.params[name] for name in compiled.positiontup])
+                while rows := cursor.fetchmany(SCAN_BATCH):
+                    yield np.array(rows, dtype=float)
+            finally:
+                cursor.close()
+            return
+        result = connection.execution_options(yield_per=SCAN_BATCH).execute(query)
+        for rows in result.partitions():
+            yield np.array([tuple(row) for row in rows], dtype=float)
+
+    def build(self) -> int:
+        """Rebuild the whole index from the database and persist it; returns the loan count."""
+        with self._update_lock:
+            with self.session_factory() as db:
+                ids, points = self._scan(db)
+            state = _IndexState(ids=ids, tree=_tree(points), watermark=int(ids[-1]) if len(ids) else 0)
+            self._save(ids, points, state.watermark)
+            self._publish(state, "rebuild")
+            return state.size
+
+    def refresh(self) -> int:
+        """Index loans stored since the last update; returns how many were added."""
+        with self._update_lock:
+            state = self._state
+            if state is None:
+                raise RuntimeError("Build or load the index before refreshing it")
+            with self.session_factory() as db:
+                ids, points = self._scan(db, after_id=state.watermark)
+            if not len(ids):
+                return 0
+            delta_ids = np.concatenate([state.delta_ids, ids])
+            delta_points = np.concatenate([state.delta_points, points])
+            self._publish(
+                _IndexState(
+                    ids=state.ids,
+                    tree=state.tree,
+                    delta_ids=delta_ids,
+                    delta_points=delta_points,
+                    delta_tree=_tree(delta_points),
+                    watermark=int(ids[-1]),
+                    built_at=state.built_at,
+                ),
+                "delta",
+            )
+            return len(ids)
+
+    def _save(self, ids: np.ndarray, points: np.ndarray, watermark: int) -> None:
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.index_path.with_name(f".{self.index_path.name}.{uuid.uuid4().hex}.tmp")
+        with open(temporary, "wb") as handle:
+            np.savez(handle, ids=ids, points=points, watermark=watermark, center=self.center, scale=self.scale)
+        os.replace(temporary, self.index_path)
+
+    def load(self) -> bool:
+        """Load the persisted index; False when missing, unreadable or built with another scaler."""
+        if not self.index_path.exists():
+            return False
+        try:
+            with np.load(self.index_path) as stored:
+                if not (np.allclose(stored["center"], self.center) and np.allclose(stored["scale"], self.scale)):
+                    return False
+                ids, points, watermark = stored["ids"], stored["points"], int(stored["watermark"])
+        except (OSError, ValueError, KeyError):
+            return False
+        with self._update_lock:
+            self._publish(_IndexState(ids=ids, tree=_tree(points), watermark=watermark), "disk")
+        return True
+
+    def start(self) -> None:
+        """Start the background updater once per process (threads do not survive a fork)."""
+        if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="comparables-index", daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None and self._thread_pid == os.getpid():
+            self._thread.join()
+        self._thread = None
+
+    def wait_ready(self, timeout: float) -> bool:
+        return self._ready.wait(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                state = self._state
+                if state is None:
+                    if self.load():
+                        self.refresh()
+                    else:
+                        self.build()
+                elif (
+                    len(state.delta_ids) >= self.delta_limit
+                    or time.monotonic() - state.built_at >= self.rebuild_seconds
+                ):
+                    self.build()
+                else:
+                    self.refresh()
+            except (SQLAlchemyError, OSError):
+                COMPARABLES_INDEX_UPDATES.inc("error")
+            self._stop.wait(self.refresh_seconds)
+
+    def query(
+        self,
+        features: np.ndarray,
+        k: int,
+        exclude_ids: Sequence[int | None] | None = None,
+    ) -> list[list[tuple[int, float]]]:
+        """The ``k`` nearest loans (id, distance) for each row of raw ``features``, closest first.
+
+        ``exclude_ids`` (one per row) drops the query loan itself from its own neighbours.
+        """
+        state = self._state
+        if state is None:
+            raise RuntimeError("The comparables index has not been built yet")
+        points = self.standardize(np.atleast_2d(features))
+        exclude_ids = list(exclude_ids) if exclude_ids is not None else [None] * len(points)
+        candidate_ids, candidate_distances = [], []
+        for tree, ids in ((state.tree, state.ids), (state.delta_tree, state.delta_ids)):
+            if tree is None:
+                continue
+            wanted = min(k + 1, len(ids))
+            distances, positions = tree.query(points, k=wanted)
+            distances = distances.reshape(len(points), wanted)
+            candidate_ids.append(ids[positions.reshape(len(points), wanted)])
+            candidate_distances.append(distances)
+        if not candidate_ids:
+            return [[] for _ in range(len(points))]
+        all_ids = np.concatenate(candidate_ids, axis=1)
+        all_distances = np.concatenate(candidate_distances, axis=1)
+        order = np.argsort(all_distances, axis=1, kind="stable")
+        results = []
+        for row, exclude in enumerate(exclude_ids):
+            neighbours = []
+            for position in order[row]:
+                loan_id = int(all_ids[row, position])
+                if loan_id == exclude:
+                    continue
+                neighbours.append((loan_id, float(all_distances[row, position])))
+                if len(neighbours) == k:
+                    break
+            results.append(neighbours)
+        return results
+
+    def nearest(
+        self,
+        db: Session,
+        features: np.ndarray,
+        k: int,
+        exclude_ids: Sequence[int | None] | None = None,
+    ) -> list[list[dict]]:
+        """Described ``k`` nearest live loans per row of raw ``features``.
+
+        Loans archived or deleted since the last full build are still in the trees; rows that
+        come back short re-query with twice the neighbours until ``k`` live loans are found or
+        the index is exhausted.
+        """
+        points = np.atleast_2d(np.asarray(features, dtype=float))
+        exclude_ids = list(exclude_ids) if exclude_ids is not None else [None] * len(points)
+        results: list[list[dict]] = [[] for _ in range(len(points))]
+        pending = list(range(len(points)))
+        fetch = k
+        while pending:
+            neighbours = self.query(points[pending], fetch, [exclude_ids[row] for row in pending])
+            short = []
+            for row, found, items in zip(pending, neighbours, self.describe(db, neighbours), strict=True):
+                results[row] = items[:k]
+                if len(items) < k and len(found) == fetch:
+                    short.append(row)
+            pending = short
+            fetch *= 2
+        return results
+
+    def features_for(self, db: Session, loan_ids: Sequence[int]) -> dict[int, np.ndarray]:
+        """Raw comparable features of stored loans keyed by id (missing ids are left out)."""
+        found: dict[int, np.ndarray] = {}
+        unique = sorted(set(loan_ids))
+        for start in range(0, len(unique), LOOKUP_BATCH):
+            rows = db.execute(
+                select(LoanScenario.id, *(getattr(LoanScenario, name) for name in COMPARABLE_FEATURES)).where(
+                    LoanScenario.id.in_(unique[start : start + LOOKUP_BATCH])
+                )
+            ).all()
+            found.update({row[0]: np.array(row[1:], dtype=float) for row in rows})
+        return found
+
+    def describe(self, db: Session, neighbours: Sequence[Sequence[tuple[int, float]]]) -> list[list[dict]]:
+        """Attach features, outcomes and the latest scores to neighbour ids with two lookups."""
+        loan_ids = sorted({loan_id for row in neighbours for loan_id, _ in row})
+        loans: dict[int, dict] = {}
+        latest: dict[int, dict] = {}
+        for start in range(0, len(loan_ids), LOOKUP_BATCH):
+            batch = loan_ids[start : start + LOOKUP_BATCH]
+            for row in db.execute(
+                select(
+                    LoanScenario.id,
+                    *(getattr(LoanScenario, name) for name in COMPARABLE_FEATURES),
+                    LoanScenario.defaulted,
+                    LoanScenario.retained,
+                ).where(LoanScenario.id.in_(batch))
+            ):
+                loans[row.id] = dict(row._mapping)
+            for row in db.execute(
+                select(
+                    PredictionResult.loan_id,
+                    PredictionResult.risk_score,
+                    PredictionResult.retention_score,
+                    PredictionResult.model_version,
+                )
+                .where(PredictionResult.loan_id.in_(batch))
+                .order_by(PredictionResult.id)
+            ):
+                latest[row.loan_id] = {
+                    "risk_score": row.risk_score,
+                    "retention_score": row.retention_score,
+                    "model_version": row.model_version,
+                }
+        empty_scores = {"risk_score": None, "retention_score": None, "model_version": None}
+        described = []
+        for row in neighbours:
+            items = []
+            for loan_id, distance in row:
+                loan = loans.get(loan_id)
+                if loan is None:
+                    continue
+                items.append(
+                    {
+                        "loan_id": loan_id,
+                        "distance": round(distance, 6),
+                        **{name: loan[name] for name in COMPARABLE_FEATURES},
+                        "defaulted": loan["defaulted"],
+                        "retained": loan["retained"],
+                        **latest.get(loan_id, empty_scores),
+                    }
+                )
+            described.append(items)
+        return described
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import math
+import threading
+from collections.abc import Mapping
+
+import numpy as np
+
+PSI_EPSILON = 1e-4
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+
+class StreamingDistribution:
+    """Running moments (Welford / Chan merge) plus counts over fixed reference bin edges."""
+
+    def __init__(self, reference: dict):
+        self.reference = reference
+        self.edges = np.asarray(reference["edges"], dtype=float)
+        self.reference_proportions = np.asarray(reference["proportions"], dtype=float)
+        self.bin_counts = np.zeros(len(self.edges) + 1, dtype=np.int64)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, value: float) -> None:
+        self.bin_counts[int(np.searchsorted(self.edges, value, side="right"))] += 1
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def update_many(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return
+        self.bin_counts += np.bincount(np.searchsorted(self.edges, values, side="right"), minlength=len(self.bin_counts))
+        batch_count = values.size
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        total = self.count + batch_count
+        delta = batch_mean - self.mean
+        self.m2 += batch_m2 + delta * delta * self.count * batch_count / total
+        self.mean += delta * batch_count / total
+        self.count = total
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def psi(self) -> float:
+        live = self.bin_counts / self.count
+        expected = np.clip(self.reference_proportions, PSI_EPSILON, None)
+        actual = np.clip(live, PSI_EPSILON, None)
+        return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+    def ks(self) -> float:
+        # Two-sample KS statistic evaluated at the reference bin edges.
+        live_cdf = np.cumsum(self.bin_counts) / self.count
+        reference_cdf = np.cumsum(self.reference_proportions)
+        return float(np.max(np.abs(live_cdf - reference_cdf)))
+
+    def summary(self, name: str) -> dict:
+        if self.count == 0:
+            psi = ks = 0.0
+        else:
+            psi, ks = self.psi(), self.ks()
+        if psi >= PSI_SIGNIFICANT:
+            status = "significant_drift"
+        elif psi >= PSI_MODERATE:
+            status = "moderate_drift"
+        else:
+            status = "stable"
+        return {
+            "name": name,
+            "observations": self.count,
+            "psi": round(psi, 4),
+            "ks_statistic": round(ks, 4),
+            "live_mean": round(self.mean, 4),
+            "reference_mean": round(float(self.reference["mean"]), 4),
+            "live_std": round(self.std, 4),
+            "reference_std": round(float(self.reference["std"]), 4),
+            "status": status if self.count else "no_data",
+        }
+
+
+class DriftMonitor:
+    """Compares live feature and score distributions with the training-time reference profile.
+
+    Updates cost O(features) per scored loan and nothing is read back from the database;
+    state is per process, so each API worker reports on the traffic it has served.
+    """
+
+    def __init__(self, reference_profile: dict | None, model_version: str = "v1"):
+        self.model_version = model_version
+        self.reference_available = bool(reference_profile)
+        self._lock = threading.Lock()
+        profile = reference_profile or {"features": {}, "scores": {}}
+        self.features = {name: StreamingDistribution(ref) for name, ref in profile["features"].items()}
+        self.scores = {name: StreamingDistribution(ref) for name, ref in profile["scores"].items()}
+
+    def observe(self, features: Mapping[str, float], risk_score: float, retention_score: float) -> None:
+        if not self.reference_available:
+            return
+        with self._lock:
+            for name, distribution in self.features.items():
+                distribution.update(float(features[name]))
+            self.scores["risk_score"].update(risk_score)
+            self.scores["retention_score"].update(retention_score)
+
+    def observe_columns(
+        self,
+        columns: Mapping[str, np.ndarray],
+        risk_scores: np.ndarray,
+        retention_scores: np.ndarray,
+    ) -> None:
+        if not self.reference_available:
+            return
+        with self._lock:
+            for name, distribution in self.features.items():
+                distribution.update_many(columns[name])
+            self.scores["risk_score"].update_many(risk_scores)
+            self.scores["retention_score"].update_many(retention_scores)
+
+    def report(self) -> dict:
+        with self._lock:
+            features = [distribution.summary(name) for name, distribution in self.features.items()]
+            scores = [distribution.summary(name) for name, distribution in self.scores.items()]
+            observations = self.scores["risk_score"].count if self.reference_available else 0
+        return {
+            "model_version": self.model_version,
+            "reference_available": self.reference_available,
+            "observations": observations,
+            "features": features,
+            "scores": scores,
+        }
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+
+
+@dataclass
+class ScoredLoanEvent:
+    loan_id: int
+    prediction_id: int
+    risk_score: float
+    retention_score: float
+    recommendation: str
+    model_version: str
+
+
+@dataclass
+class _PendingDelta:
+    scored_count: int = 0
+    risk_score_sum: float = 0.0
+    retention_score_sum: float = 0.0
+    high_risk_count: int = 0
+    low_retention_count: int = 0
+    high_risk_loans: deque = field(default_factory=deque)
+    dropped_high_risk_loans: int = 0
+
+    def is_empty(self) -> bool:
+        return self.scored_count == 0
+
+
+class Subscription:
+    """One subscriber's coalesced backlog; publishers merge into it instead of queueing messages."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_pending_loans: int, hold: bool = False):
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._signalled = False
+        self._pending = _PendingDelta(high_risk_loans=deque(maxlen=max_pending_loans))
+        self._max_pending_loans = max_pending_loans
+        # While held, events are kept raw until the snapshot's high-water prediction id is known.
+        self._after_id: int | None = None if hold else 0
+        self._held: list[ScoredLoanEvent] = []
+
+    def _merge(self, events: list[ScoredLoanEvent], high_risk_threshold: float, low_retention_threshold: float) -> bool:
+        if self._after_id is None:
+            self._held.extend(events)
+            return False
+        events = [event for event in events if event.prediction_id > self._after_id]
+        if not events:
+            return False
+        pending = self._pending
+        for event in events:
+            pending.scored_count += 1
+            pending.risk_score_sum += event.risk_score
+            pending.retention_score_sum += event.retention_score
+            if event.retention_score < low_retention_threshold:
+                pending.low_retention_count += 1
+            if event.risk_score >= high_risk_threshold:
+                pending.high_risk_count += 1
+                if len(pending.high_risk_loans) == pending.high_risk_loans.maxlen:
+                    pending.dropped_high_risk_loans += 1
+                pending.high_risk_loans.append(event)
+        if self._signalled:
+            return False
+        self._signalled = True
+        return True
+
+    def _take(self) -> _PendingDelta:
+        pending = self._pending
+        self._pending = _PendingDelta(high_risk_loans=deque(maxlen=self._max_pending_loans))
+        self._signalled = False
+        self._wakeup.clear()
+        return pending
+
+
+class PortfolioEventBroker:
+    """In-process fan-out of scoring commits to streaming subscribers.
+
+    Publishing is O(subscribers) and never blocks: each subscriber owns a single coalesced
+    delta, so a slow consumer receives fewer, larger updates rather than an unbounded queue.
+    Only the most recent ``max_pending_loans`` high-risk loans are kept per subscriber.
+    """
+
+    def __init__(
+        self,
+        high_risk_threshold: float = settings.high_risk_threshold,
+        low_retention_threshold: float = settings.low_retention_threshold,
+        max_pending_loans: int = 100,
+    ):
+        self.high_risk_threshold = high_risk_threshold
+        self.low_retention_threshold = low_retention_threshold
+        self.max_pending_loans = max_pending_loans
+        self._subscriptions: set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self, hold: bool = False) -> Subscription:
+        """Register a subscriber.
+
+        With ``hold``, publishes are buffered until ``start_after`` receives the high-water
+        prediction id of a snapshot taken after subscribing; events at or below it are already in
+        the snapshot and are dropped, so a snapshot plus its deltas counts every commit once.
+        """
+        subscription = Subscription(asyncio.get_running_loop(), self.max_pending_loans, hold)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def start_after(self, subscription: Subscription, prediction_id: int) -> None:
+        with self._lock:
+            held, subscription._held = subscription._held, []
+            subscription._after_id = prediction_id
+            if subscription._merge(held, self.high_risk_threshold, self.low_retention_threshold):
+                subscription._loop.call_soon_threadsafe(subscription._wakeup.set)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, events: list[ScoredLoanEvent]) -> None:
+        if not events or not self._subscriptions:
+            return
+        with self._lock:
+            for subscription in self._subscriptions:
+                if subscription._merge(events, self.high_risk_threshold, self.low_retention_threshold):
+                    subscription._loop.call_soon_threadsafe(subscription._wakeup.set)
+
+    async def next_delta(self, subscription: Subscription, timeout: float) -> dict | None:
+        try:
+            await asyncio.wait_for(subscription._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        with self._lock:
+            pending = subscription._take()
+        if pending.is_empty():
+            return None
+        return {
+            "scored_count": pending.scored_count,
+            "risk_score_sum": round(pending.risk_score_sum, 6),
+            "retention_score_sum": round(pending.retention_score_sum, 6),
+            "high_risk_count": pending.high_risk_count,
+            "low_retention_count": pending.low_retention_count,
+            "high_risk_loans": [event.__dict__ for event in pending.high_risk_loans],
+            "dropped_high_risk_loans": pending.dropped_high_risk_loans,
+        }
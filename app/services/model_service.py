@@ -1,16 +1,33 @@
 from __future__ import annotations
 
+import time
+from collections.abc import Mapping, Sequence
 from dataclasses import dataclass
 from pathlib import Path
 
 import joblib
+import numpy as np
 import pandas as pd
 
 from app.core.config import settings
+from app.core.metrics import MODEL_LOAD_SECONDS, time_stage
 from app.schemas.loan import LoanRequest
 from pipelines.train_model import train_and_save_model
 
 
+WARMUP_LOAN = LoanRequest(
+    credit_score=700,
+    ltv=80.0,
+    dti=35.0,
+    days_in_processing=15,
+    documentation_completeness_flag=1,
+    income=120000.0,
+    loan_amount=350000.0,
+    interest_rate=6.5,
+    tenure_years=30,
+)
+
+
 @dataclass
 class PredictionResultDTO:
     risk_score: float
@@ -25,25 +42,34 @@ class ModelService:
         self.bundle = self._load_or_train()
 
     def _load_or_train(self) -> dict:
+        start = time.perf_counter()
         if not self.model_path.exists():
-            return train_and_save_model(self.model_path)
-        return joblib.load(self.model_path)
+            bundle = train_and_save_model(self.model_path)
+            MODEL_LOAD_SECONDS.set(time.perf_counter() - start, "trained")
+            return bundle
+        bundle = joblib.load(self.model_path)
+        MODEL_LOAD_SECONDS.set(time.perf_counter() - start, "disk")
+        return bundle
 
     def _recommendation(self, risk: float, retention: float) -> str:
-        if risk >= 0.65 and retention < 0.45:
+        high_risk = risk >= settings.high_risk_threshold
+        low_retention = retention < settings.low_retention_threshold
+        if high_risk and low_retention:
             return "High risk and low retention: immediate intervention required"
-        if risk >= 0.65:
+        if high_risk:
             return "High default risk: tighten underwriting and monitoring"
-        if retention < 0.45:
+        if low_retention:
             return "Low retention risk: offer targeted customer retention program"
         return "Portfolio profile stable: monitor routinely"
 
     def score(self, loan: LoanRequest) -> PredictionResultDTO:
-        source_payload = loan.model_dump()
-        features = self.bundle.get("features", [])
-        payload = pd.DataFrame([{feature: source_payload[feature] for feature in features}])
-        default_prob = float(self.bundle["default_model"].predict_proba(payload)[0, 1])
-        retention_prob = float(self.bundle["retention_model"].predict_proba(payload)[0, 1])
+        with time_stage("feature_assembly"):
+            source_payload = loan.model_dump()
+            features = self.bundle.get("features", [])
+            payload = pd.DataFrame([{feature: source_payload[feature] for feature in features}])
+        with time_stage("predict_proba"):
+            default_prob = float(self.bundle["default_model"].predict_proba(payload)[0, 1])
+            retention_prob = float(self.bundle["retention_model"].predict_proba(payload)[0, 1])
 
         return PredictionResultDTO(
             risk_score=round(default_prob, 4),
@@ -52,6 +78,68 @@ class ModelService:
             model_version=self.bundle.get("version", "v1"),
         )
 
+    def predict_columns(self, columns: Mapping[str, np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+        """Unrounded default and retention probabilities for column-oriented features."""
+        with time_stage("feature_assembly"):
+            features = self.bundle.get("features", [])
+            payload = pd.DataFrame({feature: columns[feature] for feature in features})
+        if payload.empty:
+            return np.empty(0), np.empty(0)
+        with time_stage("predict_proba"):
+            default_probs = self.bundle["default_model"].predict_proba(payload)[:, 1]
+            retention_probs = self.bundle["retention_model"].predict_proba(payload)[:, 1]
+        return default_probs, retention_probs
+
+    def score_columns(self, columns: Mapping[str, np.ndarray]) -> list[PredictionResultDTO]:
+        default_probs, retention_probs = self.predict_columns(columns)
+        version = self.bundle.get("version", "v1")
+
+        return [
+            PredictionResultDTO(
+                risk_score=round(default_prob, 4),
+                retention_score=round(retention_prob, 4),
+                recommendation=self._recommendation(default_prob, retention_prob),
+                model_version=version,
+            )
+            for default_prob, retention_prob in zip(default_probs.tolist(), retention_probs.tolist(), strict=True)
+        ]
+
+    def warm_up(self) -> None:
+        """Score a synthetic loan through the single and column paths so lazy imports,
+        pandas/sklearn dispatch caches and validation code run before the first real request."""
+        start = time.perf_counter()
+        self.score(WARMUP_LOAN)
+        self.score_columns({feature: np.array([value]) for feature, value in WARMUP_LOAN.model_dump().items()})
+        MODEL_LOAD_SECONDS.set(time.perf_counter() - start, "warmup")
+
+    def feature_scaling(self, features: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Centre and scale the default model standardizes ``features`` with.
+
+        Falls back to the reference profile's mean and std for bundles without a fitted scaler.
+        """
+        scaler = getattr(self.bundle["default_model"], "named_steps", {}).get("scaler")
+        if scaler is not None and hasattr(scaler, "mean_"):
+            positions = [list(self.bundle.get("features", [])).index(feature) for feature in features]
+            return np.asarray(scaler.mean_[positions], dtype=float), np.asarray(scaler.scale_[positions], dtype=float)
+        profile = (self.bundle.get("reference_profile") or {}).get("features", {})
+        center = np.array([float(profile.get(feature, {}).get("mean", 0.0)) for feature in features])
+        scale = np.array([float(profile.get(feature, {}).get("std") or 1.0) for feature in features])
+        return center, scale
+
+    def processing_day_risk_shift(self, days: int = 5) -> float:
+        """Average change in default probability per extra day in processing, around the training means.
+
+        Returns 0.0 when the bundle has no reference profile to anchor the comparison.
+        """
+        profile = (self.bundle.get("reference_profile") or {}).get("features", {})
+        features = self.bundle.get("features", [])
+        if "days_in_processing" not in features or any(feature not in profile for feature in features):
+            return 0.0
+        base = {feature: float(profile[feature]["mean"]) for feature in features}
+        payload = pd.DataFrame([base, {**base, "days_in_processing": base["days_in_processing"] + days}])
+        default_probs = self.bundle["default_model"].predict_proba(payload)[:, 1]
+        return float(default_probs[1] - default_probs[0]) / days
+
     def get_performance_summary(self) -> dict:
         metrics = self.bundle.get("metrics", {})
         return {
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.metrics import CACHE_EVICTIONS, record_cache_lookup
+
+CACHE_NAME = "optimization"
+
+
+class OptimizationResultCache:
+    """Bounded LRU of optimizer results keyed by endpoint, request fields and portfolio version.
+
+    The portfolio version is the newest prediction ID, so any new score makes older entries
+    unreachable; they age out through normal LRU eviction. Concurrent misses on the same key
+    may compute twice; the last result wins.
+    """
+
+    def __init__(self, max_entries: int = settings.optimization_cache_size):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(kind: str, request: BaseModel, portfolio_version: int | None) -> tuple:
+        return (kind, request.model_dump_json(), portfolio_version)
+
+    def get_or_compute(
+        self,
+        kind: str,
+        request: BaseModel,
+        portfolio_version: int | None,
+        compute: Callable[[], dict],
+    ) -> dict:
+        key = self.key(kind, request, portfolio_version)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+        record_cache_lookup(CACHE_NAME, cached is not None)
+        if cached is not None:
+            return cached
+
+        result = compute()
+        if self.max_entries <= 0:
+            return result
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                CACHE_EVICTIONS.inc(CACHE_NAME)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
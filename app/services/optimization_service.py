@@ -1,21 +1,74 @@
 from __future__ import annotations
 
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from math import ceil
 
-from app.schemas.optimization import CapacityOptimizationRequest
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import time_stage
+from app.schemas.optimization import CapacityOptimizationRequest, CapacityPlanRequest, CapacitySimulationRequest
+
+FALLBACK_RISK_SCORES = [0.12, 0.18, 0.24, 0.35, 0.41, 0.52, 0.61, 0.67, 0.72, 0.81]
+SIMULATION_BATCH = 25_000
+
+
+def threshold_grid(request: CapacityOptimizationRequest | CapacityPlanRequest) -> list[float]:
+    thresholds = []
+    threshold = request.min_threshold
+    while threshold <= request.max_threshold + 1e-9:
+        thresholds.append(threshold)
+        threshold += request.step
+    return thresholds
+
+
+def simulate_interval_counts(
+    interval_probs: np.ndarray,
+    sample_size: int,
+    daily_applications: int,
+    simulations: int,
+    seed: np.random.SeedSequence,
+) -> np.ndarray:
+    """Draw one day per simulation: Poisson volume, bootstrapped risk mix, multinomial split.
+
+    Returns an ``(simulations, intervals)`` matrix of application counts per score interval.
+    Resampling ``sample_size`` stored scores with replacement is a multinomial over the
+    interval frequencies, so the bootstrap never materialises individual scores.
+    """
+    rng = np.random.default_rng(seed)
+    counts = np.empty((simulations, len(interval_probs)), dtype=np.int32)
+    for start in range(0, simulations, SIMULATION_BATCH):
+        size = min(SIMULATION_BATCH, simulations - start)
+        volumes = rng.poisson(daily_applications, size)
+        mix = rng.multinomial(sample_size, interval_probs, size=size) / sample_size
+        counts[start : start + size] = rng.multinomial(volumes, mix)
+    return counts
 
 
 class UnderwriterCapacityOptimizationService:
+    def __init__(
+        self,
+        simulation_workers: int = settings.simulation_workers,
+        pool_min_simulations: int = settings.simulation_pool_min_simulations,
+    ):
+        self.simulation_workers = simulation_workers
+        self.pool_min_simulations = pool_min_simulations
+        self._pool: ProcessPoolExecutor | None = None
+
     def optimize(self, request: CapacityOptimizationRequest, risk_scores: list[float]) -> dict:
+        with time_stage("optimizer_sweep"):
+            return self._sweep(request, risk_scores)
+
+    def _sweep(self, request: CapacityOptimizationRequest, risk_scores: list[float]) -> dict:
         if not risk_scores:
-            risk_scores = [0.12, 0.18, 0.24, 0.35, 0.41, 0.52, 0.61, 0.67, 0.72, 0.81]
+            risk_scores = FALLBACK_RISK_SCORES
 
-        high_risk_baseline = [score for score in risk_scores if score >= 0.65]
+        high_risk_baseline = [score for score in risk_scores if score >= settings.high_risk_threshold]
         baseline_count = len(high_risk_baseline)
 
         scenarios: list[dict] = []
-        threshold = request.min_threshold
-        while threshold <= request.max_threshold + 1e-9:
+        for threshold in threshold_grid(request):
             flagged_rate = sum(score >= threshold for score in risk_scores) / len(risk_scores)
             expected_manual_reviews = int(round(flagged_rate * request.daily_applications))
             required_underwriters = max(
@@ -45,7 +98,6 @@ class UnderwriterCapacityOptimizationService:
                     "objective": objective,
                 }
             )
-            threshold += request.step
 
         scenarios_sorted = sorted(scenarios, key=lambda item: item["objective"], reverse=True)
         best = scenarios_sorted[0]
@@ -64,3 +116,93 @@ class UnderwriterCapacityOptimizationService:
                 for item in scenarios_sorted
             ],
         }
+
+    def simulate(self, request: CapacitySimulationRequest, risk_scores: list[float]) -> dict:
+        with time_stage("optimizer_simulation"):
+            return self._simulate(request, risk_scores)
+
+    def _simulate(self, request: CapacitySimulationRequest, risk_scores: list[float]) -> dict:
+        scores = np.asarray(risk_scores or FALLBACK_RISK_SCORES, dtype=float)
+        thresholds = threshold_grid(request)
+        edges = np.unique(np.asarray([*thresholds, settings.high_risk_threshold]))
+        interval_probs = np.bincount(np.searchsorted(edges, scores, side="right"), minlength=len(edges) + 1) / len(scores)
+        counts = self._draw(interval_probs, len(scores), request)
+
+        # Column i of ``at_or_above`` counts applications scoring >= edges[i].
+        at_or_above = np.cumsum(counts[:, ::-1], axis=1, dtype=np.int32)[:, ::-1][:, 1:]
+        high_risk_total = at_or_above[:, np.searchsorted(edges, settings.high_risk_threshold)]
+        has_high_risk = high_risk_total > 0
+
+        scenarios: list[dict] = []
+        for threshold in thresholds:
+            column = int(np.searchsorted(edges, threshold))
+            reviews = at_or_above[:, column]
+            required = np.maximum(1, -(-reviews // request.review_capacity_per_underwriter))
+            if threshold <= settings.high_risk_threshold:
+                captured = has_high_risk.astype(float)
+            else:
+                captured = np.divide(reviews, high_risk_total, out=np.zeros(len(reviews)), where=has_high_risk)
+            captured = captured[has_high_risk]
+
+            recommended = int(np.quantile(required, request.service_level, method="higher"))
+            values, frequency = np.unique(required, return_counts=True)
+            captured_mean = float(captured.mean()) if captured.size else 0.0
+            staffing_penalty = max(0, recommended - request.max_underwriters) * 0.25
+            staffing_delta_penalty = abs(request.current_underwriters - recommended) * 0.01
+            p50, p90, p95 = np.quantile(required, [0.5, 0.9, 0.95], method="higher")
+
+            scenarios.append(
+                {
+                    "threshold": round(threshold, 3),
+                    "mean_manual_reviews": round(float(reviews.mean()), 2),
+                    "p95_manual_reviews": int(np.quantile(reviews, 0.95, method="higher")),
+                    "required_underwriters_mean": round(float(required.mean()), 3),
+                    "required_underwriters_p50": int(p50),
+                    "required_underwriters_p90": int(p90),
+                    "required_underwriters_p95": int(p95),
+                    "required_underwriters_distribution": {
+                        int(value): round(float(count) / len(required), 4)
+                        for value, count in zip(values, frequency, strict=True)
+                    },
+                    "recommended_underwriters": recommended,
+                    "shortfall_probability": round(float(np.mean(required > request.current_underwriters)), 4),
+                    "captured_high_risk_rate_mean": round(captured_mean, 4),
+                    "captured_high_risk_rate_p05": (
+                        round(float(np.quantile(captured, 0.05)), 4) if captured.size else 0.0
+                    ),
+                    "objective": captured_mean - staffing_penalty - staffing_delta_penalty,
+                }
+            )
+
+        scenarios.sort(key=lambda item: item["objective"], reverse=True)
+        best = scenarios[0]
+        for item in scenarios:
+            del item["objective"]
+        return {
+            "recommended_threshold": best["threshold"],
+            "recommended_underwriters": best["recommended_underwriters"],
+            "simulations": request.simulations,
+            "service_level": request.service_level,
+            "scenarios": scenarios,
+        }
+
+    def _draw(self, interval_probs: np.ndarray, sample_size: int, request: CapacitySimulationRequest) -> np.ndarray:
+        # Fixed-size chunks with spawned seeds give the same draws in-process or on the pool.
+        chunk_sizes = [
+            min(SIMULATION_BATCH, request.simulations - start)
+            for start in range(0, request.simulations, SIMULATION_BATCH)
+        ]
+        seeds = np.random.SeedSequence(request.seed).spawn(len(chunk_sizes))
+        args = [
+            (interval_probs, sample_size, request.daily_applications, size, seed)
+            for size, seed in zip(chunk_sizes, seeds, strict=True)
+        ]
+        if self.simulation_workers > 1 and request.simulations >= self.pool_min_simulations:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.simulation_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            chunks = list(self._pool.map(simulate_interval_counts, *zip(*args, strict=True)))
+        else:
+            chunks = [simulate_interval_counts(*chunk_args) for chunk_args in args]
+        return np.concatenate(chunks)
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from datetime import datetime
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.upsert import increment_counters
+from app.models.loan import LoanScenario
+from app.models.performance import ModelPerformanceBin
+from app.models.prediction import PredictionResult
+from app.services.archive_service import PredictionArchiveService
+from app.services.rollup_service import bucket_start
+
+SCORE_BINS = 100
+# outcome name -> (LoanScenario label column, PredictionResult score column)
+OUTCOMES = {"default": ("defaulted", "risk_score"), "retention": ("retained", "retention_score")}
+BIN_KEY_COLUMNS = ("model_version", "window_start", "outcome", "score_bin")
+BIN_COUNTER_COLUMNS = ("positive_count", "negative_count")
+INGEST_BATCH = 5_000
+PREDICTION_COLUMNS = ["id", "loan_id", "model_version", "created_at", "risk_score", "retention_score"]
+
+
+def score_bin(score: float) -> int:
+    return min(max(int(score * SCORE_BINS + 1e-9), 0), SCORE_BINS - 1)
+
+
+def auc_from_bins(positives: np.ndarray, negatives: np.ndarray) -> float | None:
+    """ROC-AUC from per-bin label counts; loans sharing a bin count as ties."""
+    total_pos, total_neg = positives.sum(), negatives.sum()
+    if total_pos == 0 or total_neg == 0:
+        return None
+    pos_desc, neg_desc = positives[::-1], negatives[::-1]
+    higher_pos = np.cumsum(pos_desc) - pos_desc
+    return float(np.sum(neg_desc * (higher_pos + pos_desc / 2)) / (total_pos * total_neg))
+
+
+def _batched(items: Iterable, size: int) -> Iterable[list]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class ModelPerformanceTracker:
+    """Keeps realized-outcome counts per model version, day and score bin.
+
+    Each label change adjusts a handful of counters, so AUC, precision and recall for any
+    window are computed from at most ``SCORE_BINS`` rows per outcome instead of full history.
+    Scores are binned at 0.01 resolution, so ties within a bin and thresholds are exact only
+    to that resolution. Predictions moved to the Parquet archive still count: archival keeps a
+    loan's row until both outcomes are known, and ingest and rebuild read the archived scores.
+    """
+
+    def __init__(
+        self,
+        high_risk_threshold: float = settings.high_risk_threshold,
+        batch_size: int = INGEST_BATCH,
+        archive_service: PredictionArchiveService | None = None,
+    ):
+        self.high_risk_threshold = high_risk_threshold
+        self.batch_size = batch_size
+        self.archive = archive_service or PredictionArchiveService()
+
+    def ingest(self, db: Session, outcomes: Iterable[Mapping]) -> dict:
+        summary = {"received": 0, "updated": 0, "unchanged": 0, "unknown_loan_ids": []}
+        for batch in _batched(outcomes, self.batch_size):
+            result = self._ingest_batch(db, batch)
+            db.commit()
+            for key in ("received", "updated", "unchanged"):
+                summary[key] += result[key]
+            summary["unknown_loan_ids"].extend(result["unknown_loan_ids"])
+        return summary
+
+    def _ingest_batch(self, db: Session, batch: list[Mapping]) -> dict:
+        # Later entries for the same loan win; None leaves that label unchanged.
+        incoming = {int(item["loan_id"]): item for item in batch}
+        current = {
+            row.id: {"defaulted": row.defaulted, "retained": row.retained}
+            for row in db.execute(
+                select(LoanScenario.id, LoanScenario.defaulted, LoanScenario.retained).where(
+                    LoanScenario.id.in_(incoming)
+                )
+            )
+        }
+        updates: list[dict] = []
+        changes: dict[int, tuple[dict, dict]] = {}
+        unchanged = 0
+        for loan_id, item in incoming.items():
+            old = current.get(loan_id)
+            if old is None:
+                continue
+            new = {
+                label: old[label] if item.get(label) is None else bool(item[label]) for label in ("defaulted", "retained")
+            }
+            if new == old:
+                unchanged += 1
+                continue
+            updates.append({"id": loan_id, **new})
+            changes[loan_id] = (old, new)
+
+        deltas: dict[tuple, list[int]] = {}
+        for prediction in self._predictions_for(db, list(changes)).itertuples(index=False):
+            self._accumulate(deltas, prediction, *changes[prediction.loan_id])
+
+        if updates:
+            db.execute(update(LoanScenario), updates)
+        self._apply(db, deltas)
+        return {
+            "received": len(batch),
+            "updated": len(updates),
+            "unchanged": unchanged,
+            "unknown_loan_ids": sorted(set(incoming) - set(current)),
+        }
+
+    def _predictions_for(self, db: Session, loan_ids: list[int]) -> pd.DataFrame:
+        """Hot and archived predictions for ``loan_ids``, one row per prediction id."""
+        if not loan_ids:
+            return pd.DataFrame(columns=PREDICTION_COLUMNS)
+        hot = pd.DataFrame(
+            db.execute(
+                select(*(getattr(PredictionResult, column) for column in PREDICTION_COLUMNS)).where(
+                    PredictionResult.loan_id.in_(loan_ids)
+                )
+            ).all(),
+            columns=PREDICTION_COLUMNS,
+        )
+        archived = self.archive.read_loans(loan_ids, PREDICTION_COLUMNS)
+        if archived.empty:
+            return hot
+        return pd.concat([hot, archived], ignore_index=True).drop_duplicates("id")
+
+    @staticmethod
+    def _accumulate(deltas: dict[tuple, list[int]], prediction, old: Mapping, new: Mapping) -> None:
+        window = bucket_start(prediction.created_at, "day")
+        for outcome, (label, score_column) in OUTCOMES.items():
+            if old[label] == new[label]:
+                continue
+            key = (prediction.model_version, window, outcome, score_bin(getattr(prediction, score_column)))
+            counts = deltas.setdefault(key, [0, 0])
+            if old[label] is not None:
+                counts[0 if old[label] else 1] -= 1
+            if new[label] is not None:
+                counts[0 if new[label] else 1] += 1
+
+    @staticmethod
+    def _apply(db: Session, deltas: dict[tuple, list[int]]) -> None:
+        increment_counters(
+            db,
+            ModelPerformanceBin,
+            BIN_KEY_COLUMNS,
+            BIN_COUNTER_COLUMNS,
+            [
+                {**dict(zip(BIN_KEY_COLUMNS, key, strict=True)), "positive_count": pos, "negative_count": neg}
+                for key, (pos, neg) in deltas.items()
+                if pos or neg
+            ],
+        )
+
+    def rebuild(self, db: Session) -> int:
+        db.query(ModelPerformanceBin).delete()
+        unlabelled = {"defaulted": None, "retained": None}
+        processed = 0
+        for day in self.archive.iter_days([*PREDICTION_COLUMNS, "defaulted", "retained"], db):
+            # Loans still in the hot table may have received outcomes after their predictions moved.
+            day = day.astype({"defaulted": object, "retained": object})
+            for start in range(0, len(day), self.batch_size):
+                chunk = day.iloc[start : start + self.batch_size]
+                current = {
+                    row.id: (row.defaulted, row.retained)
+                    for row in db.execute(
+                        select(LoanScenario.id, LoanScenario.defaulted, LoanScenario.retained).where(
+                            LoanScenario.id.in_(chunk["loan_id"].tolist())
+                        )
+                    )
+                }
+                deltas: dict[tuple, list[int]] = {}
+                for row in chunk.itertuples(index=False):
+                    defaulted, retained = current.get(row.loan_id, (row.defaulted, row.retained))
+                    if defaulted is None and retained is None:
+                        continue
+                    self._accumulate(deltas, row, unlabelled, {"defaulted": defaulted, "retained": retained})
+                    processed += 1
+                self._apply(db, deltas)
+
+        query = (
+            select(
+                PredictionResult.model_version,
+                PredictionResult.created_at,
+                PredictionResult.risk_score,
+                PredictionResult.retention_score,
+                LoanScenario.defaulted,
+                LoanScenario.retained,
+            )
+            .join(LoanScenario, PredictionResult.loan_id == LoanScenario.id)
+            .where((LoanScenario.defaulted.is_not(None)) | (LoanScenario.retained.is_not(None)))
+            .execution_options(yield_per=self.batch_size)
+        )
+        for chunk in db.execute(query).partitions():
+            deltas: dict[tuple, list[int]] = {}
+            for row in chunk:
+                self._accumulate(deltas, row, unlabelled, {"defaulted": row.defaulted, "retained": row.retained})
+            self._apply(db, deltas)
+            processed += len(chunk)
+        db.commit()
+        return processed
+
+    def live_performance(
+        self,
+        db: Session,
+        model_version: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[dict]:
+        query = select(
+            ModelPerformanceBin.model_version,
+            ModelPerformanceBin.outcome,
+            ModelPerformanceBin.score_bin,
+            func.sum(ModelPerformanceBin.positive_count),
+            func.sum(ModelPerformanceBin.negative_count),
+        ).group_by(ModelPerformanceBin.model_version, ModelPerformanceBin.outcome, ModelPerformanceBin.score_bin)
+        if model_version is not None:
+            query = query.where(ModelPerformanceBin.model_version == model_version)
+        if start is not None:
+            query = query.where(ModelPerformanceBin.window_start >= bucket_start(start, "day"))
+        if end is not None:
+            query = query.where(ModelPerformanceBin.window_start <= end)
+
+        counts: dict[str, dict[str, np.ndarray]] = {}
+        for version, outcome, bin_index, positives, negatives in db.execute(query):
+            per_outcome = counts.setdefault(version, {name: np.zeros((2, SCORE_BINS), dtype=np.int64) for name in OUTCOMES})
+            per_outcome[outcome][:, bin_index] = (positives or 0, negatives or 0)
+
+        return [self._summarize(version, per_outcome) for version, per_outcome in sorted(counts.items())]
+
+    def _summarize(self, model_version: str, per_outcome: dict[str, np.ndarray]) -> dict:
+        default_pos, default_neg = per_outcome["default"]
+        retention_pos, retention_neg = per_outcome["retention"]
+        default_labelled = int(default_pos.sum() + default_neg.sum())
+        retention_labelled = int(retention_pos.sum() + retention_neg.sum())
+
+        cutoff = score_bin(self.high_risk_threshold)
+        true_pos = int(default_pos[cutoff:].sum())
+        flagged = true_pos + int(default_neg[cutoff:].sum())
+        return {
+            "model_version": model_version,
+            "labelled_default_count": default_labelled,
+            "observed_default_rate": round(default_pos.sum() / default_labelled, 4) if default_labelled else None,
+            "roc_auc": _round(auc_from_bins(default_pos, default_neg)),
+            "precision_high_risk": round(true_pos / flagged, 4) if flagged else None,
+            "recall_high_risk": round(true_pos / default_pos.sum(), 4) if default_pos.sum() else None,
+            "labelled_retention_count": retention_labelled,
+            "observed_retention_rate": (
+                round(retention_pos.sum() / retention_labelled, 4) if retention_labelled else None
+            ),
+            "retention_roc_auc": _round(auc_from_bins(retention_pos, retention_neg)),
+        }
+
+
+def _round(value: float | None) -> float | None:
+    return None if value is None else round(value, 4)
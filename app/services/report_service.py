@@ -1,57 +1,216 @@
 from __future__ import annotations
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 
-import matplotlib.pyplot as plt
+import numpy as np
 import seaborn as sns
 from fpdf import FPDF
-from sqlalchemy import func
+from matplotlib.figure import Figure
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.models.prediction import PredictionResult
+from app.core.metrics import time_stage
+from app.services.rollup_service import DISTRIBUTION_BINS, PortfolioRollupService
+
+TREND_GRANULARITY = "week"
+
+
+@dataclass
+class ReportData:
+    # KPI counters per model version, from the rollups (archived predictions included).
+    versions: dict[str, dict]
+    # (risk bin x retention bin) loan counts per model version.
+    distributions: dict[str, np.ndarray]
+    # Rollup timeseries points per bucket and model version.
+    trend: list[dict]
+
+    @property
+    def summary(self) -> dict:
+        total = sum(version["scored_count"] for version in self.versions.values())
+        risk_sum = sum(version["risk_score_sum"] for version in self.versions.values())
+        retention_sum = sum(version["retention_score_sum"] for version in self.versions.values())
+        return {
+            "total_scored": int(total),
+            "avg_risk_score": float(risk_sum) / total if total else 0.0,
+            "avg_retention_score": float(retention_sum) / total if total else 0.0,
+            "high_risk_count": int(sum(version["high_risk_count"] for version in self.versions.values())),
+            "low_retention_count": int(sum(version["low_retention_count"] for version in self.versions.values())),
+        }
 
 
 class ReportService:
-    def __init__(self) -> None:
+    """Builds the multi-section executive PDF from pre-aggregated tables only.
+
+    KPIs, per-version breakdowns and trend lines come from the portfolio rollups (so high-risk
+    and low-retention counts use the thresholds in force when each loan was scored), and score
+    distributions from ``score_distribution_bins``; each is one ``GROUP BY`` over rows whose
+    count depends on time buckets, versions and bins rather than on predictions, so build time
+    stays flat as the prediction table grows. The independent charts render concurrently with
+    the object-oriented ``Figure`` API on an Agg canvas, which unlike ``pyplot`` keeps no
+    shared state between threads.
+    """
+
+    def __init__(
+        self,
+        rollup_service: PortfolioRollupService | None = None,
+        chart_workers: int = settings.report_chart_workers,
+    ) -> None:
+        self.rollup_service = rollup_service or PortfolioRollupService()
+        # 0 means one thread per chart, capped at the CPU count; 1 renders inline.
+        self.chart_workers = chart_workers
         self.report_dir = Path(settings.reports_dir)
         self.report_dir.mkdir(parents=True, exist_ok=True)
 
+    def collect(self, db: Session) -> ReportData:
+        return ReportData(
+            versions=self.rollup_service.version_totals(db),
+            distributions=self.rollup_service.distribution(db),
+            trend=self.rollup_service.timeseries(db, granularity=TREND_GRANULARITY, segment="model_version")["points"],
+        )
+
     def _build_chart(self, avg_risk: float, avg_retention: float, out_path: Path) -> None:
-        sns.set_theme(style="whitegrid")
-        plt.figure(figsize=(6, 3.5))
-        plt.bar(["Avg Risk", "Avg Retention"], [avg_risk, avg_retention])
-        plt.ylim(0, 1)
-        plt.ylabel("Score")
-        plt.title("Portfolio Score Snapshot")
-        plt.tight_layout()
-        plt.savefig(out_path)
-        plt.close()
+        figure = Figure(figsize=(6, 3.5))
+        axes = figure.subplots()
+        axes.bar(["Avg Risk", "Avg Retention"], [avg_risk, avg_retention])
+        axes.set_ylim(0, 1)
+        axes.set_ylabel("Score")
+        axes.set_title("Portfolio Score Snapshot")
+        figure.tight_layout()
+        figure.savefig(out_path)
 
-    def generate_executive_summary(self, db: Session) -> Path:
-        total_scored = db.query(func.count(PredictionResult.id)).scalar() or 0
-        avg_risk = db.query(func.avg(PredictionResult.risk_score)).scalar() or 0.0
-        avg_retention = db.query(func.avg(PredictionResult.retention_score)).scalar() or 0.0
-        high_risk = (
-            db.query(func.count(PredictionResult.id))
-            .filter(PredictionResult.risk_score >= 0.65)
-            .scalar()
-            or 0
-        )
-        low_retention = (
-            db.query(func.count(PredictionResult.id))
-            .filter(PredictionResult.retention_score < 0.45)
-            .scalar()
-            or 0
+    def _build_distribution_chart(self, data: ReportData, axis: int, out_path: Path) -> None:
+        label, threshold = (
+            ("Default risk", settings.high_risk_threshold)
+            if axis == 1
+            else ("Retention", settings.low_retention_threshold)
         )
+        edges = np.linspace(0, 1, DISTRIBUTION_BINS + 1)
+        figure = Figure(figsize=(7, 3.5))
+        axes = figure.subplots()
+        for model_version, matrix in data.distributions.items():
+            counts = matrix.sum(axis=axis)
+            if counts.sum():
+                axes.stairs(counts / counts.sum(), edges, label=model_version, linewidth=1.8)
+        axes.axvline(threshold, color="black", linestyle="--", linewidth=1, label=f"threshold {threshold:.2f}")
+        axes.set_xlim(0, 1)
+        axes.set_xlabel(f"{label} score")
+        axes.set_ylabel("Share of loans")
+        axes.set_title(f"{label} distribution by model version")
+        axes.legend(fontsize=8)
+        figure.tight_layout()
+        figure.savefig(out_path)
 
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        pdf_path = self.report_dir / f"executive_summary_{timestamp}.pdf"
-        chart_path = self.report_dir / f"portfolio_snapshot_{timestamp}.png"
+    def _build_joint_chart(self, data: ReportData, out_path: Path) -> None:
+        joint = np.zeros((DISTRIBUTION_BINS, DISTRIBUTION_BINS), dtype=np.int64)
+        for matrix in data.distributions.values():
+            joint += matrix
+        figure = Figure(figsize=(5.5, 4.5))
+        axes = figure.subplots()
+        image = axes.imshow(joint, origin="lower", extent=(0, 1, 0, 1), aspect="auto", cmap="viridis")
+        axes.grid(False)
+        axes.axhline(settings.high_risk_threshold, color="white", linestyle="--", linewidth=1)
+        axes.axvline(settings.low_retention_threshold, color="white", linestyle="--", linewidth=1)
+        axes.set_xlabel("Retention score")
+        axes.set_ylabel("Default risk score")
+        axes.set_title("Risk vs retention (loans per cell)")
+        figure.colorbar(image, ax=axes)
+        figure.tight_layout()
+        figure.savefig(out_path)
+
+    def _build_trend_chart(self, data: ReportData, out_path: Path) -> None:
+        figure = Figure(figsize=(7, 5))
+        volume_axes, score_axes = figure.subplots(2, 1, sharex=True)
+        for model_version in data.versions:
+            points = [point for point in data.trend if point["segment_value"] == model_version]
+            if not points:
+                continue
+            buckets = [point["bucket_start"] for point in points]
+            style = {"marker": "o", "markersize": 3}
+            volume_axes.plot(buckets, [point["total_scored"] for point in points], label=model_version, **style)
+            score_axes.plot(buckets, [point["avg_risk_score"] for point in points], label=f"{model_version} risk", **style)
+            score_axes.plot(
+                buckets,
+                [point["avg_retention_score"] for point in points],
+                linestyle="--",
+                label=f"{model_version} retention",
+                **style,
+            )
+        volume_axes.set_ylabel("Loans scored")
+        volume_axes.set_title(f"Scoring volume and average scores per {TREND_GRANULARITY}")
+        score_axes.set_ylabel("Average score")
+        score_axes.set_ylim(0, 1)
+        if data.trend:
+            volume_axes.legend(fontsize=8)
+            score_axes.legend(fontsize=8, ncol=2)
+        figure.autofmt_xdate()
+        figure.tight_layout()
+        figure.savefig(out_path)
+
+    def _render_charts(self, data: ReportData, timestamp: str) -> dict[str, Path]:
+        summary = data.summary
+        paths = {
+            "snapshot": self.report_dir / f"portfolio_snapshot_{timestamp}.png",
+            "risk": self.report_dir / f"risk_distribution_{timestamp}.png",
+            "retention": self.report_dir / f"retention_distribution_{timestamp}.png",
+            "joint": self.report_dir / f"risk_retention_{timestamp}.png",
+            "trend": self.report_dir / f"score_trend_{timestamp}.png",
+        }
+        jobs = [
+            (self._build_chart, float(summary["avg_risk_score"]), float(summary["avg_retention_score"]), paths["snapshot"]),
+            (self._build_distribution_chart, data, 1, paths["risk"]),
+            (self._build_distribution_chart, data, 0, paths["retention"]),
+            (self._build_joint_chart, data, paths["joint"]),
+            (self._build_trend_chart, data, paths["trend"]),
+        ]
+        # Theme changes touch global rcParams, so apply them before any worker reads them.
+        sns.set_theme(style="whitegrid")
+        workers = self.chart_workers or min(len(jobs), os.cpu_count() or 1)
+        if workers <= 1:
+            for build, *args in jobs:
+                build(*args)
+            return paths
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report-chart") as pool:
+            for future in [pool.submit(*job) for job in jobs]:
+                future.result()
+        return paths
+
+    def _heading(self, pdf: FPDF, text: str) -> None:
+        pdf.ln(4)
+        pdf.set_font("Helvetica", "B", 12)
+        pdf.cell(0, 8, text, new_x="LMARGIN", new_y="NEXT")
+        pdf.set_font("Helvetica", size=11)
 
-        self._build_chart(float(avg_risk), float(avg_retention), chart_path)
+    def _version_table(self, pdf: FPDF, data: ReportData) -> None:
+        total = data.summary["total_scored"]
+        header = ("Model version", "Loans", "Share", "Avg risk", "Avg retention", "High risk", "Low retention")
+        widths = (34, 26, 20, 24, 30, 26, 30)
+        pdf.set_font("Helvetica", "B", 9)
+        for title, width in zip(header, widths, strict=True):
+            pdf.cell(width, 7, title, border=1)
+        pdf.ln()
+        pdf.set_font("Helvetica", size=9)
+        for model_version, version in data.versions.items():
+            count = version["scored_count"]
+            values = (
+                model_version,
+                f"{count:,}",
+                f"{count / total:.1%}" if total else "-",
+                f"{version['risk_score_sum'] / count:.2%}" if count else "-",
+                f"{version['retention_score_sum'] / count:.2%}" if count else "-",
+                f"{version['high_risk_count'] / count:.1%}" if count else "-",
+                f"{version['low_retention_count'] / count:.1%}" if count else "-",
+            )
+            for value, width in zip(values, widths, strict=True):
+                pdf.cell(width, 7, value, border=1)
+            pdf.ln()
+        pdf.set_font("Helvetica", size=11)
 
+    def _build_pdf(self, data: ReportData, charts: dict[str, Path], pdf_path: Path) -> None:
+        summary = data.summary
         pdf = FPDF()
         pdf.set_auto_page_break(auto=True, margin=12)
         pdf.add_page()
@@ -61,31 +220,57 @@ class ReportService:
 
         pdf.set_font("Helvetica", size=11)
         pdf.cell(0, 8, f"Generated: {datetime.utcnow().isoformat()} UTC", new_x="LMARGIN", new_y="NEXT")
-        pdf.ln(4)
 
-        pdf.set_font("Helvetica", "B", 12)
-        pdf.cell(0, 8, "Portfolio KPIs", new_x="LMARGIN", new_y="NEXT")
+        self._heading(pdf, "Portfolio KPIs")
+        pdf.cell(0, 7, f"- Total loans scored: {int(summary['total_scored'])}", new_x="LMARGIN", new_y="NEXT")
+        pdf.cell(0, 7, f"- Average default risk: {float(summary['avg_risk_score']):.2%}", new_x="LMARGIN", new_y="NEXT")
+        pdf.cell(0, 7, f"- Average retention score: {float(summary['avg_retention_score']):.2%}", new_x="LMARGIN", new_y="NEXT")
+        pdf.cell(0, 7, f"- High-risk accounts: {int(summary['high_risk_count'])}", new_x="LMARGIN", new_y="NEXT")
+        pdf.cell(0, 7, f"- Low-retention accounts: {int(summary['low_retention_count'])}", new_x="LMARGIN", new_y="NEXT")
+        pdf.set_font("Helvetica", "I", 9)
+        pdf.multi_cell(
+            0,
+            5,
+            "High-risk and low-retention counts use the thresholds configured when each loan was scored.",
+            new_x="LMARGIN",
+            new_y="NEXT",
+        )
         pdf.set_font("Helvetica", size=11)
-        pdf.cell(0, 7, f"- Total loans scored: {int(total_scored)}", new_x="LMARGIN", new_y="NEXT")
-        pdf.cell(0, 7, f"- Average default risk: {float(avg_risk):.2%}", new_x="LMARGIN", new_y="NEXT")
-        pdf.cell(0, 7, f"- Average retention score: {float(avg_retention):.2%}", new_x="LMARGIN", new_y="NEXT")
-        pdf.cell(0, 7, f"- High-risk accounts: {int(high_risk)}", new_x="LMARGIN", new_y="NEXT")
-        pdf.cell(0, 7, f"- Low-retention accounts: {int(low_retention)}", new_x="LMARGIN", new_y="NEXT")
 
-        pdf.ln(4)
-        pdf.set_font("Helvetica", "B", 12)
-        pdf.cell(0, 8, "Interpretation", new_x="LMARGIN", new_y="NEXT")
-        pdf.set_font("Helvetica", size=11)
+        self._heading(pdf, "Interpretation")
         pdf.multi_cell(
             0,
             7,
             "Use high default risk populations for underwriting review and collections strategy. "
             "Use low retention cohorts for outreach campaigns, refinancing offers, and customer support prioritization.",
         )
-
         pdf.ln(4)
-        if chart_path.exists():
-            pdf.image(str(chart_path), w=170)
+        pdf.image(str(charts["snapshot"]), w=170)
+
+        pdf.add_page()
+        self._heading(pdf, "Model versions")
+        self._version_table(pdf, data)
+        self._heading(pdf, "Score distributions")
+        pdf.image(str(charts["risk"]), w=170)
+        pdf.image(str(charts["retention"]), w=170)
+
+        pdf.add_page()
+        self._heading(pdf, "Risk vs retention")
+        pdf.image(str(charts["joint"]), w=140)
+        self._heading(pdf, "Trends")
+        pdf.image(str(charts["trend"]), w=170)
 
         pdf.output(str(pdf_path))
+
+    def generate_executive_summary(self, db: Session) -> Path:
+        with time_stage("report_query"):
+            data = self.collect(db)
+
+        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        pdf_path = self.report_dir / f"executive_summary_{timestamp}.pdf"
+
+        with time_stage("report_chart"):
+            charts = self._render_charts(data, timestamp)
+        with time_stage("report_pdf"):
+            self._build_pdf(data, charts, pdf_path)
         return pdf_path
@@ -0,0 +1,382 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.upsert import increment_counters
+from app.models.loan import LoanScenario
+from app.models.prediction import PredictionResult
+from app.models.rollup import PortfolioRollup, ScoreDistributionBin
+from app.services.archive_service import PredictionArchiveService
+
+GRANULARITIES = ("hour", "day", "week")
+SEGMENTS = ("all", "model_version", "credit_score", "ltv")
+BANDED_SEGMENTS = {
+    "credit_score": (np.array([620, 680, 740]), ["<620", "620-679", "680-739", "740+"]),
+    "ltv": (np.array([60, 80, 95]), ["<60", "60-80", "80-95", ">=95"]),
+}
+ROLLUP_KEY_COLUMNS = ("granularity", "bucket_start", "model_version", "segment", "band")
+COUNTER_COLUMNS = ("scored_count", "risk_score_sum", "retention_score_sum", "high_risk_count", "low_retention_count")
+DISTRIBUTION_KEY_COLUMNS = ("day", "model_version", "risk_bin", "retention_bin")
+DISTRIBUTION_BINS = 20
+REBUILD_CHUNK = 50_000
+RAW_COLUMNS = ["created_at", "model_version", "credit_score", "ltv", "risk_score", "retention_score"]
+
+
+@dataclass
+class ScoredRow:
+    created_at: datetime
+    model_version: str
+    credit_score: float
+    ltv: float
+    risk_score: float
+    retention_score: float
+
+
+def bucket_start(ts: datetime, granularity: str) -> datetime:
+    hour = ts.replace(minute=0, second=0, microsecond=0)
+    if granularity == "hour":
+        return hour
+    day = hour.replace(hour=0)
+    if granularity == "day":
+        return day
+    return day - timedelta(days=day.weekday())
+
+
+def bucket_end(ts: datetime, granularity: str) -> datetime:
+    """Exclusive end of the bucket containing ``ts``."""
+    step = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}[granularity]
+    return bucket_start(ts, granularity) + step
+
+
+def distribution_bin(score: float) -> int:
+    # Scores are stored at 4 decimals; integer arithmetic keeps bin edges such as 0.65 exact.
+    return min(int(round(score * 10_000)) // (10_000 // DISTRIBUTION_BINS), DISTRIBUTION_BINS - 1)
+
+
+def band_label(segment: str, value: float) -> str:
+    edges, labels = BANDED_SEGMENTS[segment]
+    return labels[int(np.searchsorted(edges, value, side="right"))]
+
+
+class PortfolioRollupService:
+    """Maintains hour/day/week KPI rollups per model version and feature band on every write.
+
+    Alongside the rollups it counts loans per day, model version and (risk, retention) score bin
+    in ``score_distribution_bins``, so score distributions never need a prediction scan.
+    """
+
+    def __init__(
+        self,
+        high_risk_threshold: float = settings.high_risk_threshold,
+        low_retention_threshold: float = settings.low_retention_threshold,
+        archive_service: PredictionArchiveService | None = None,
+    ):
+        self.high_risk_threshold = high_risk_threshold
+        self.low_retention_threshold = low_retention_threshold
+        self.archive = archive_service or PredictionArchiveService()
+
+    def record(self, db: Session, rows: Iterable[ScoredRow]) -> None:
+        totals: dict[tuple, list[float]] = {}
+        distribution: dict[tuple, int] = {}
+        for row in rows:
+            bin_key = (
+                bucket_start(row.created_at, "day"),
+                row.model_version,
+                distribution_bin(row.risk_score),
+                distribution_bin(row.retention_score),
+            )
+            distribution[bin_key] = distribution.get(bin_key, 0) + 1
+            increments = (
+                1,
+                row.risk_score,
+                row.retention_score,
+                int(row.risk_score >= self.high_risk_threshold),
+                int(row.retention_score < self.low_retention_threshold),
+            )
+            segments = (
+                ("all", "all"),
+                ("credit_score", band_label("credit_score", row.credit_score)),
+                ("ltv", band_label("ltv", row.ltv)),
+            )
+            for granularity in GRANULARITIES:
+                start = bucket_start(row.created_at, granularity)
+                for segment, band in segments:
+                    key = (granularity, start, row.model_version, segment, band)
+                    current = totals.setdefault(key, [0, 0.0, 0.0, 0, 0])
+                    for index, increment in enumerate(increments):
+                        current[index] += increment
+
+        if totals:
+            self._upsert(
+                db,
+                [
+                    {
+                        "granularity": granularity,
+                        "bucket_start": start,
+                        "model_version": model_version,
+                        "segment": segment,
+                        "band": band,
+                        **dict(zip(COUNTER_COLUMNS, counters, strict=True)),
+                    }
+                    for (granularity, start, model_version, segment, band), counters in totals.items()
+                ],
+            )
+        if distribution:
+            increment_counters(
+                db,
+                ScoreDistributionBin,
+                DISTRIBUTION_KEY_COLUMNS,
+                ("scored_count",),
+                [
+                    {**dict(zip(DISTRIBUTION_KEY_COLUMNS, key, strict=True)), "scored_count": count}
+                    for key, count in distribution.items()
+                ],
+            )
+
+    def record_predictions(self, db: Session, pairs: Iterable[tuple[LoanScenario, PredictionResult]]) -> None:
+        now = datetime.utcnow()
+        self.record(
+            db,
+            (
+                ScoredRow(
+                    created_at=pred_row.created_at or now,
+                    model_version=pred_row.model_version,
+                    credit_score=loan_row.credit_score,
+                    ltv=loan_row.ltv,
+                    risk_score=pred_row.risk_score,
+                    retention_score=pred_row.retention_score,
+                )
+                for loan_row, pred_row in pairs
+            ),
+        )
+
+    def _upsert(self, db: Session, values: list[dict]) -> None:
+        increment_counters(db, PortfolioRollup, ROLLUP_KEY_COLUMNS, COUNTER_COLUMNS, values)
+
+    def rebuild(self, db: Session) -> int:
+        db.query(PortfolioRollup).delete()
+        db.query(ScoreDistributionBin).delete()
+        query = (
+            select(
+                PredictionResult.created_at,
+                PredictionResult.model_version,
+                LoanScenario.credit_score,
+                LoanScenario.ltv,
+                PredictionResult.risk_score,
+                PredictionResult.retention_score,
+            )
+            .join(LoanScenario, PredictionResult.loan_id == LoanScenario.id)
+            .execution_options(yield_per=REBUILD_CHUNK)
+        )
+        processed = 0
+        for day in self.archive.iter_days(RAW_COLUMNS, db):
+            self.record(db, (ScoredRow(ts.to_pydatetime(), *rest) for ts, *rest in day.itertuples(index=False)))
+            processed += len(day)
+        for chunk in db.execute(query).partitions():
+            self.record(db, (ScoredRow(*row) for row in chunk))
+            processed += len(chunk)
+        db.commit()
+        return processed
+
+    def backfill_if_empty(self, db: Session) -> int:
+        has_rollups = (
+            db.query(PortfolioRollup.id).limit(1).first() is not None
+            and db.query(ScoreDistributionBin.id).limit(1).first() is not None
+        )
+        has_predictions = db.query(PredictionResult.id).limit(1).first() is not None
+        if has_rollups or not has_predictions:
+            return 0
+        return self.rebuild(db)
+
+    def version_totals(self, db: Session) -> dict[str, dict]:
+        """All-time KPI counters per model version (archived predictions included)."""
+        rows = db.execute(
+            select(
+                PortfolioRollup.model_version,
+                *(func.sum(getattr(PortfolioRollup, column)) for column in COUNTER_COLUMNS),
+            )
+            .where(PortfolioRollup.granularity == "week", PortfolioRollup.segment == "all")
+            .group_by(PortfolioRollup.model_version)
+            .order_by(PortfolioRollup.model_version)
+        ).all()
+        return {model_version: dict(zip(COUNTER_COLUMNS, counters, strict=True)) for model_version, *counters in rows}
+
+    def distribution(self, db: Session, start: datetime | None = None, end: datetime | None = None) -> dict[str, np.ndarray]:
+        """Loans per (risk bin, retention bin) for each model version, summed in the database.
+
+        Returns a ``DISTRIBUTION_BINS`` x ``DISTRIBUTION_BINS`` count matrix per version with risk
+        bins as rows; bin ``i`` covers scores in ``[i / DISTRIBUTION_BINS, (i + 1) / DISTRIBUTION_BINS)``.
+        """
+        query = select(
+            ScoreDistributionBin.model_version,
+            ScoreDistributionBin.risk_bin,
+            ScoreDistributionBin.retention_bin,
+            func.sum(ScoreDistributionBin.scored_count),
+        ).group_by(ScoreDistributionBin.model_version, ScoreDistributionBin.risk_bin, ScoreDistributionBin.retention_bin)
+        if start is not None:
+            query = query.where(ScoreDistributionBin.day >= bucket_start(start, "day"))
+        if end is not None:
+            query = query.where(ScoreDistributionBin.day < bucket_end(end, "day"))
+        matrices: dict[str, np.ndarray] = {}
+        for model_version, risk_bin, retention_bin, count in db.execute(query):
+            matrix = matrices.setdefault(model_version, np.zeros((DISTRIBUTION_BINS, DISTRIBUTION_BINS), dtype=np.int64))
+            matrix[risk_bin, retention_bin] = count
+        return dict(sorted(matrices.items()))
+
+    def timeseries(
+        self,
+        db: Session,
+        granularity: str = "day",
+        segment: str = "all",
+        start: datetime | None = None,
+        end: datetime | None = None,
+        model_version: str | None = None,
+        high_risk_threshold: float | None = None,
+        low_retention_threshold: float | None = None,
+    ) -> dict:
+        """KPI points per bucket and segment.
+
+        ``start`` and ``end`` select whole buckets: every bucket from the one containing ``start``
+        through the one containing ``end`` is returned in full, on both the rollup and raw paths.
+        """
+        high_risk_threshold = self.high_risk_threshold if high_risk_threshold is None else high_risk_threshold
+        low_retention_threshold = (
+            self.low_retention_threshold if low_retention_threshold is None else low_retention_threshold
+        )
+        ad_hoc = (
+            high_risk_threshold != self.high_risk_threshold or low_retention_threshold != self.low_retention_threshold
+        )
+
+        if ad_hoc:
+            frame = self._raw_scan(db, granularity, segment, start, end, model_version, high_risk_threshold, low_retention_threshold)
+            source = "raw"
+        else:
+            frame = self._from_rollups(db, granularity, segment, start, end, model_version)
+            source = "rollup"
+
+        counts = frame["scored_count"].to_numpy(dtype=np.int64)
+        safe_counts = np.maximum(counts, 1)
+        points = pd.DataFrame(
+            {
+                "bucket_start": frame["bucket_start"].to_numpy(dtype=object),
+                "segment_value": frame["segment_value"].astype(str).to_numpy(dtype=object),
+                "total_scored": counts,
+                "avg_risk_score": np.round(frame["risk_score_sum"].to_numpy(dtype=float) / safe_counts, 4),
+                "avg_retention_score": np.round(frame["retention_score_sum"].to_numpy(dtype=float) / safe_counts, 4),
+                "high_risk_count": frame["high_risk_count"].to_numpy(dtype=np.int64),
+                "low_retention_count": frame["low_retention_count"].to_numpy(dtype=np.int64),
+            }
+        ).to_dict(orient="records")
+
+        return {
+            "granularity": granularity,
+            "segment": segment,
+            "source": source,
+            "high_risk_threshold": high_risk_threshold,
+            "low_retention_threshold": low_retention_threshold,
+            "points": points,
+        }
+
+    def _from_rollups(
+        self,
+        db: Session,
+        granularity: str,
+        segment: str,
+        start: datetime | None,
+        end: datetime | None,
+        model_version: str | None,
+    ) -> pd.DataFrame:
+        key_column = PortfolioRollup.model_version if segment == "model_version" else PortfolioRollup.band
+        stored_segment = "all" if segment == "model_version" else segment
+        query = (
+            select(
+                PortfolioRollup.bucket_start,
+                key_column.label("segment_value"),
+                *(func.sum(getattr(PortfolioRollup, column)).label(column) for column in COUNTER_COLUMNS),
+            )
+            .where(PortfolioRollup.granularity == granularity, PortfolioRollup.segment == stored_segment)
+            .group_by(PortfolioRollup.bucket_start, key_column)
+            .order_by(PortfolioRollup.bucket_start, key_column)
+        )
+        if start is not None:
+            query = query.where(PortfolioRollup.bucket_start >= bucket_start(start, granularity))
+        if end is not None:
+            query = query.where(PortfolioRollup.bucket_start < bucket_end(end, granularity))
+        if model_version is not None:
+            query = query.where(PortfolioRollup.model_version == model_version)
+
+        rows = db.execute(query).all()
+        return pd.DataFrame(rows, columns=["bucket_start", "segment_value", *COUNTER_COLUMNS])
+
+    def _raw_scan(
+        self,
+        db: Session,
+        granularity: str,
+        segment: str,
+        start: datetime | None,
+        end: datetime | None,
+        model_version: str | None,
+        high_risk_threshold: float,
+        low_retention_threshold: float,
+    ) -> pd.DataFrame:
+        query = select(
+            PredictionResult.id,
+            PredictionResult.created_at,
+            PredictionResult.model_version,
+            LoanScenario.credit_score,
+            LoanScenario.ltv,
+            PredictionResult.risk_score,
+            PredictionResult.retention_score,
+        ).join(LoanScenario, PredictionResult.loan_id == LoanScenario.id)
+        if start is not None:
+            query = query.where(PredictionResult.created_at >= bucket_start(start, granularity))
+        # Same bucket-inclusive range as the rollup path: whole buckets from start's to end's.
+        raw_end = bucket_end(end, granularity) if end is not None else None
+        if raw_end is not None:
+            query = query.where(PredictionResult.created_at < raw_end)
+        if model_version is not None:
+            query = query.where(PredictionResult.model_version == model_version)
+
+        raw_start = bucket_start(start, granularity) if start is not None else None
+        hot = pd.DataFrame(db.execute(query).all(), columns=["id", *RAW_COLUMNS])
+        archived = self.archive.read(
+            ["id", *RAW_COLUMNS], raw_start, raw_end - timedelta(microseconds=1) if raw_end is not None else None, model_version
+        )
+        # A crash between writing Parquet and deleting the hot rows leaves both copies; keep the hot one.
+        raw = pd.concat([frame for frame in (hot, archived) if not frame.empty] or [hot], ignore_index=True)
+        raw = raw.drop_duplicates("id")
+        if raw.empty:
+            return pd.DataFrame(columns=["bucket_start", "segment_value", *COUNTER_COLUMNS])
+
+        created_at = pd.to_datetime(raw["created_at"])
+        if granularity == "hour":
+            raw["bucket_start"] = created_at.dt.floor("h")
+        elif granularity == "day":
+            raw["bucket_start"] = created_at.dt.floor("D")
+        else:
+            raw["bucket_start"] = created_at.dt.floor("D") - pd.to_timedelta(created_at.dt.weekday, unit="D")
+
+        if segment == "all":
+            raw["segment_value"] = "all"
+        elif segment == "model_version":
+            raw["segment_value"] = raw["model_version"]
+        else:
+            edges, labels = BANDED_SEGMENTS[segment]
+            raw["segment_value"] = np.asarray(labels)[np.searchsorted(edges, raw[segment].to_numpy(), side="right")]
+
+        raw["scored_count"] = 1
+        raw["risk_score_sum"] = raw["risk_score"]
+        raw["retention_score_sum"] = raw["retention_score"]
+        raw["high_risk_count"] = (raw["risk_score"] >= high_risk_threshold).astype(int)
+        raw["low_retention_count"] = (raw["retention_score"] < low_retention_threshold).astype(int)
+        grouped = raw.groupby(["bucket_start", "segment_value"], as_index=False)[list(COUNTER_COLUMNS)].sum()
+        grouped["bucket_start"] = grouped["bucket_start"].dt.to_pydatetime()
+        return grouped.sort_values(["bucket_start", "segment_value"])
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import time_stage
+from app.schemas.optimization import CapacityPlanRequest
+from app.services.optimization_service import FALLBACK_RISK_SCORES, threshold_grid
+
+BACKLOG_LEVELS = 121
+MAX_WAIT_DAYS = 30
+
+
+class UnderwriterSchedulingService:
+    """Plans thresholds and staffing over a multi-day horizon with backlog carried between days.
+
+    Solved by backward dynamic programming over a discretized backlog grid. Each day's flagged
+    volume depends on the expected wait: arrivals queue behind the backlog, and every day of
+    processing shifts their risk scores by ``backlog_risk_shift_per_day``. The value function is
+    linearly interpolated between backlog levels, and the reported plan is a forward pass that
+    re-optimises each day against it using the unrounded backlog.
+    """
+
+    def __init__(self, backlog_levels: int = BACKLOG_LEVELS, max_wait_days: int = MAX_WAIT_DAYS):
+        self.backlog_levels = backlog_levels
+        self.max_wait_days = max_wait_days
+
+    def plan(self, request: CapacityPlanRequest, risk_scores: list[float], risk_shift_per_day: float) -> dict:
+        with time_stage("optimizer_plan"):
+            return self._plan(request, risk_scores, risk_shift_per_day)
+
+    def _plan(self, request: CapacityPlanRequest, risk_scores: list[float], risk_shift_per_day: float) -> dict:
+        scores = np.sort(np.asarray(risk_scores or FALLBACK_RISK_SCORES, dtype=float))
+        thresholds = np.asarray(threshold_grid(request))
+        volumes = np.asarray(request.daily_applications, dtype=float)
+        capacity = request.review_capacity_per_underwriter
+
+        # flagged[w, j]: share of applications at or above threshold j after waiting w days.
+        shifted = scores[None, :] + risk_shift_per_day * np.arange(self.max_wait_days + 1)[:, None]
+        flagged = np.stack([(shifted >= threshold).mean(axis=1) for threshold in thresholds], axis=1)
+        high_risk = (shifted >= settings.high_risk_threshold).mean(axis=1)[:, None]
+        captured = np.where(
+            thresholds[None, :] <= settings.high_risk_threshold,
+            (high_risk > 0).astype(float),
+            np.divide(flagged, high_risk, out=np.zeros_like(flagged), where=high_risk > 0),
+        )
+
+        max_backlog = request.initial_backlog + float((volumes * flagged.max()).sum())
+        levels = np.linspace(0.0, max(max_backlog, 1.0), self.backlog_levels)
+        # Staff beyond what could clear the largest possible queue never helps.
+        useful = int(np.ceil((max_backlog + volumes.max() * flagged.max()) / capacity))
+        underwriters = np.arange(1, max(1, min(request.max_underwriters, useful)) + 1)
+
+        # values[d] is the best achievable objective from day d onward for each backlog level.
+        values = [np.zeros(len(levels)) for _ in range(len(volumes) + 1)]
+        for day in range(len(volumes) - 1, -1, -1):
+            q = self._action_values(
+                levels, volumes[day], underwriters, capacity, flagged, captured, levels, values[day + 1], request
+            )[0]
+            values[day] = q.reshape(len(levels), -1).max(axis=1)
+
+        backlog = float(request.initial_backlog)
+        days = []
+        objective = 0.0
+        for day, volume in enumerate(volumes, start=1):
+            q, reward, flagged_reviews, ending, wait = self._action_values(
+                np.array([backlog]), volume, underwriters, capacity, flagged, captured, levels, values[day], request
+            )
+            u_index, t_index = np.unravel_index(int(np.argmax(q[0])), q[0].shape)
+            objective += float(reward[0, u_index, t_index])
+            wait_days = int(wait[0, u_index])
+            ending_backlog = float(ending[0, u_index, t_index])
+            days.append(
+                {
+                    "day": day,
+                    "daily_applications": int(volume),
+                    "threshold": round(float(thresholds[t_index]), 3),
+                    "underwriters": int(underwriters[u_index]),
+                    "starting_backlog": round(backlog, 2),
+                    "expected_manual_reviews": round(float(flagged_reviews[0, u_index, t_index]), 2),
+                    "processed_reviews": round(backlog + float(flagged_reviews[0, u_index, t_index]) - ending_backlog, 2),
+                    "ending_backlog": round(ending_backlog, 2),
+                    "expected_wait_days": wait_days,
+                    "captured_high_risk_rate": round(float(captured[wait_days, t_index]), 4),
+                }
+            )
+            backlog = ending_backlog
+
+        return {
+            "horizon_days": len(volumes),
+            "objective": round(objective, 4),
+            "backlog_risk_shift_per_day": risk_shift_per_day,
+            "days": days,
+        }
+
+    def _action_values(
+        self,
+        backlog: np.ndarray,
+        volume: float,
+        underwriters: np.ndarray,
+        capacity: int,
+        flagged: np.ndarray,
+        captured: np.ndarray,
+        levels: np.ndarray,
+        continuation: np.ndarray,
+        request: CapacityPlanRequest,
+    ) -> tuple[np.ndarray, ...]:
+        """Score every (underwriters, threshold) action for each backlog value; arrays are (B, U, T)."""
+        daily_capacity = underwriters * capacity
+        wait = np.minimum(backlog[:, None] // daily_capacity[None, :], self.max_wait_days).astype(int)
+        flagged_reviews = volume * flagged[wait]
+        queued = backlog[:, None, None] + flagged_reviews
+        ending = np.maximum(queued - daily_capacity[None, :, None], 0.0)
+        reward = (
+            captured[wait]
+            - request.staffing_weight * underwriters[None, :, None]
+            - request.backlog_weight * ending / volume
+        )
+        q = reward + np.interp(ending, levels, continuation)
+        return q, reward, flagged_reviews, ending, wait
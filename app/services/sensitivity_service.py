@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.schemas.loan import SensitivityRequest
+from app.services.model_service import ModelService
+
+INTEGER_FEATURES = {"credit_score"}
+
+
+class SensitivityService:
+    """What-if grids for a single loan, scored in one vectorized pass and never persisted."""
+
+    def __init__(self, model_service: ModelService):
+        self.model_service = model_service
+
+    def sweep(self, request: SensitivityRequest) -> dict:
+        axis_values = []
+        for axis in request.axes:
+            values = np.linspace(axis.start, axis.stop, axis.points)
+            if axis.feature in INTEGER_FEATURES:
+                values = np.rint(values)
+            axis_values.append(values)
+
+        grids = np.meshgrid(*axis_values, indexing="ij")
+        shape = grids[0].shape
+        size = grids[0].size
+        base = request.loan.model_dump()
+        columns = {feature: np.full(size, value, dtype=float) for feature, value in base.items()}
+        for axis, grid in zip(request.axes, grids, strict=True):
+            columns[axis.feature] = grid.ravel()
+
+        # Row 0 is the unmodified loan so the base score shares the same pass.
+        columns = {feature: np.concatenate(([base[feature]], values)) for feature, values in columns.items()}
+        risk, retention = self.model_service.predict_columns(columns)
+
+        return {
+            "model_version": self.model_service.bundle.get("version", "v1"),
+            "base_risk_score": round(float(risk[0]), 4),
+            "base_retention_score": round(float(retention[0]), 4),
+            "axes": [
+                {"feature": axis.feature, "values": values.tolist()}
+                for axis, values in zip(request.axes, axis_values, strict=True)
+            ],
+            "risk_scores": np.round(risk[1:], 4).reshape(shape).tolist(),
+            "retention_scores": np.round(retention[1:], 4).reshape(shape).tolist(),
+        }
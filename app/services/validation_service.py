@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+import annotated_types
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+from app.schemas.loan import LoanRequest
+
+
+@dataclass(frozen=True)
+class FieldConstraint:
+    name: str
+    integer: bool
+    ge: float | None = None
+    gt: float | None = None
+    le: float | None = None
+    lt: float | None = None
+
+
+@dataclass
+class ColumnarValidationResult:
+    columns: dict[str, np.ndarray]
+    valid_mask: np.ndarray
+    errors: list[dict] = field(default_factory=list)
+
+    @property
+    def valid_rows(self) -> np.ndarray:
+        return np.flatnonzero(self.valid_mask)
+
+    @property
+    def row_count(self) -> int:
+        return int(self.valid_mask.shape[0])
+
+
+def constraints_from_model(model: type[BaseModel]) -> list[FieldConstraint]:
+    constraints: list[FieldConstraint] = []
+    for name, info in model.model_fields.items():
+        bounds: dict[str, float] = {}
+        for item in info.metadata:
+            if isinstance(item, annotated_types.Ge):
+                bounds["ge"] = float(item.ge)
+            elif isinstance(item, annotated_types.Gt):
+                bounds["gt"] = float(item.gt)
+            elif isinstance(item, annotated_types.Le):
+                bounds["le"] = float(item.le)
+            elif isinstance(item, annotated_types.Lt):
+                bounds["lt"] = float(item.lt)
+        constraints.append(FieldConstraint(name=name, integer=info.annotation is int, **bounds))
+    return constraints
+
+
+def _format_bound(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def _to_float_column(values: Any, row_count: int) -> np.ndarray:
+    if hasattr(values, "to_numpy") and not isinstance(values, (pd.Series, pd.Index)):
+        # pyarrow arrays need zero_copy_only=False to materialize nulls.
+        values = values.to_numpy(zero_copy_only=False)
+    array = np.asarray(values)
+    if array.ndim != 1 or array.shape[0] != row_count:
+        raise ValueError(f"Column length {array.shape} does not match row count {row_count}")
+    if array.dtype.kind in "biuf":
+        return array.astype(np.float64, copy=False)
+    return pd.to_numeric(pd.Series(array, copy=False), errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+class ColumnarLoanValidator:
+    """Applies the ``LoanRequest`` field constraints to whole columns at once."""
+
+    def __init__(self, model: type[BaseModel] = LoanRequest):
+        self.model = model
+        self.constraints = constraints_from_model(model)
+
+    @property
+    def fields(self) -> list[str]:
+        return [constraint.name for constraint in self.constraints]
+
+    def validate_frame(self, frame: pd.DataFrame) -> ColumnarValidationResult:
+        return self.validate({column: frame[column].to_numpy() for column in frame.columns}, len(frame))
+
+    def validate_records(self, records: list[Mapping[str, Any]]) -> ColumnarValidationResult:
+        return self.validate_frame(pd.DataFrame.from_records(records, columns=self.fields))
+
+    def validate(self, columns: Mapping[str, Any], row_count: int | None = None) -> ColumnarValidationResult:
+        if row_count is None:
+            row_count = len(next(iter(columns.values()))) if columns else 0
+
+        problems: dict[int, list[dict[str, str]]] = {}
+
+        def flag(mask: np.ndarray, field_name: str, message: str) -> None:
+            for row in np.flatnonzero(mask).tolist():
+                problems.setdefault(row, []).append({"field": field_name, "message": message})
+
+        coerced: dict[str, np.ndarray] = {}
+        for constraint in self.constraints:
+            name = constraint.name
+            if name not in columns:
+                coerced[name] = np.full(row_count, np.nan)
+                flag(np.ones(row_count, dtype=bool), name, "Field required")
+                continue
+
+            values = _to_float_column(columns[name], row_count)
+            coerced[name] = values
+
+            missing = np.isnan(values)
+            flag(missing, name, "Input should be a valid number")
+            present = ~missing
+            if constraint.integer:
+                flag(present & (values != np.floor(values)), name, "Input should be a valid integer")
+            if constraint.ge is not None:
+                flag(
+                    present & (values < constraint.ge),
+                    name,
+                    f"Input should be greater than or equal to {_format_bound(constraint.ge)}",
+                )
+            if constraint.gt is not None:
+                flag(
+                    present & (values <= constraint.gt),
+                    name,
+                    f"Input should be greater than {_format_bound(constraint.gt)}",
+                )
+            if constraint.le is not None:
+                flag(
+                    present & (values > constraint.le),
+                    name,
+                    f"Input should be less than or equal to {_format_bound(constraint.le)}",
+                )
+            if constraint.lt is not None:
+                flag(
+                    present & (values >= constraint.lt),
+                    name,
+                    f"Input should be less than {_format_bound(constraint.lt)}",
+                )
+
+        valid_mask = np.ones(row_count, dtype=bool)
+        if problems:
+            valid_mask[list(problems)] = False
+
+        return ColumnarValidationResult(
+            columns=coerced,
+            valid_mask=valid_mask,
+            errors=[{"row": row, "errors": problems[row]} for row in sorted(problems)],
+        )
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+DEFAULT_THRESHOLD = 0.25
+
+
+def _load_medians(results_path: Path) -> dict[str, float]:
+    data = json.loads(results_path.read_text())
+    return {bench["name"]: float(bench["stats"]["median"]) for bench in data.get("benchmarks", [])}
+
+
+def update_baseline(results_path: Path, baseline_path: Path) -> None:
+    existing = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+    baseline = {
+        "default_threshold": existing.get("default_threshold", DEFAULT_THRESHOLD),
+        "thresholds": existing.get("thresholds", {}),
+        "medians": _load_medians(results_path),
+    }
+    baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+    print(f"Baseline updated with {len(baseline['medians'])} benchmarks: {baseline_path}")
+
+
+def compare(results_path: Path, baseline_path: Path) -> int:
+    baseline = json.loads(baseline_path.read_text())
+    default_threshold = float(baseline.get("default_threshold", DEFAULT_THRESHOLD))
+    thresholds = baseline.get("thresholds", {})
+    current = _load_medians(results_path)
+
+    regressions = 0
+    print(f"{'benchmark':<40} {'baseline_ms':>12} {'current_ms':>12} {'change':>8}  status")
+    for name, baseline_median in sorted(baseline["medians"].items()):
+        if name not in current:
+            print(f"{name:<40} {baseline_median * 1000:>12.3f} {'-':>12} {'-':>8}  missing")
+            continue
+        change = current[name] / baseline_median - 1
+        limit = float(thresholds.get(name, default_threshold))
+        status = "REGRESSION" if change > limit else "ok"
+        regressions += status == "REGRESSION"
+        print(
+            f"{name:<40} {baseline_median * 1000:>12.3f} {current[name] * 1000:>12.3f} "
+            f"{change:>+8.1%}  {status} (limit {limit:+.0%})"
+        )
+    for name in sorted(set(current) - set(baseline["medians"])):
+        print(f"{name:<40} {'-':>12} {current[name] * 1000:>12.3f} {'-':>8}  new")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare pytest-benchmark JSON results against the stored baseline.")
+    parser.add_argument("results", type=Path, help="JSON written by pytest --benchmark-json")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline medians")
+    args = parser.parse_args()
+
+    if args.update_baseline:
+        update_baseline(args.results, args.baseline)
+        sys.exit(0)
+    sys.exit(compare(args.results, args.baseline))
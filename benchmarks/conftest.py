@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.base import Base
+from app.models.loan import LoanScenario
+from app.models.prediction import PredictionResult
+from app.services.model_service import ModelService
+from app.services.rollup_service import PortfolioRollupService
+
+CACHE_DIR = Path(os.getenv("BENCH_CACHE_DIR", Path(__file__).parent / ".cache"))
+SMALL_ROWS = int(os.getenv("BENCH_SMALL_ROWS", "10000"))
+LARGE_ROWS = int(os.getenv("BENCH_LARGE_ROWS", "1000000"))
+INSERT_CHUNK = 50_000
+
+
+def synthetic_loan_columns(n: int, seed: int = 11) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return {
+        "credit_score": rng.integers(520, 821, size=n),
+        "ltv": rng.uniform(45, 105, size=n).round(2),
+        "dti": rng.uniform(10, 60, size=n).round(2),
+        "days_in_processing": rng.integers(2, 46, size=n),
+        "documentation_completeness_flag": rng.integers(0, 2, size=n),
+        "income": rng.uniform(40_000, 250_000, size=n).round(2),
+        "loan_amount": rng.uniform(80_000, 1_000_000, size=n).round(2),
+        "interest_rate": rng.uniform(2.5, 10.5, size=n).round(2),
+        "tenure_years": rng.integers(10, 31, size=n),
+    }
+
+
+def _populate(database_url: str, n: int) -> None:
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    columns = synthetic_loan_columns(n)
+    rng = np.random.default_rng(23)
+    risk = rng.beta(2, 3, size=n).round(4)
+    retention = rng.beta(3, 2, size=n).round(4)
+    loan_fields = ["credit_score", "ltv", "dti", "income", "loan_amount", "interest_rate", "tenure_years"]
+
+    with engine.begin() as conn:
+        for start in range(0, n, INSERT_CHUNK):
+            stop = min(start + INSERT_CHUNK, n)
+            ids = range(start + 1, stop + 1)
+            conn.execute(
+                LoanScenario.__table__.insert(),
+                [
+                    {"id": loan_id, **{name: columns[name][i].item() for name in loan_fields}}
+                    for i, loan_id in zip(range(start, stop), ids, strict=True)
+                ],
+            )
+            conn.execute(
+                PredictionResult.__table__.insert(),
+                [
+                    {
+                        "id": loan_id,
+                        "loan_id": loan_id,
+                        "risk_score": risk[i].item(),
+                        "retention_score": retention[i].item(),
+                        "recommendation": "Portfolio profile stable: monitor routinely",
+                        "model_version": "v1",
+                    }
+                    for i, loan_id in zip(range(start, stop), ids, strict=True)
+                ],
+            )
+    engine.dispose()
+
+
+def _portfolio_session(n: int) -> Session:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    db_path = CACHE_DIR / f"portfolio_{n}.db"
+    database_url = f"sqlite:///{db_path}"
+    if not db_path.exists():
+        partial = db_path.with_suffix(".partial")
+        partial.unlink(missing_ok=True)
+        _populate(f"sqlite:///{partial}", n)
+        partial.rename(db_path)
+    engine = create_engine(database_url, connect_args={"check_same_thread": False})
+    # Caches generated before a table was added still need it (e.g. prediction_archive_stats),
+    # and the report reads rollups and score bins, which the bulk insert above skips.
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    PortfolioRollupService().backfill_if_empty(session)
+    return session
+
+
+@pytest.fixture(scope="session")
+def small_portfolio_db():
+    session = _portfolio_session(SMALL_ROWS)
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def large_portfolio_db():
+    session = _portfolio_session(LARGE_ROWS)
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def model_service() -> ModelService:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return ModelService(model_path=CACHE_DIR / "model_bundle.joblib")
+
+
+@pytest.fixture(scope="session")
+def loan_columns() -> dict[str, np.ndarray]:
+    return synthetic_loan_columns(SMALL_ROWS)
@@ -0,0 +1,31 @@
+import pytest
+
+from app.api.formats import ARROW, JSON, MSGPACK, NDJSON, encode_stream, msgpack
+from app.api.routes import BATCH_RESULT_SCHEMA, _column_chunks
+
+FORMATS = [JSON, NDJSON, ARROW] + ([MSGPACK] if msgpack is not None else [])
+
+
+def _results(loan_columns) -> dict[str, list]:
+    n = len(loan_columns["credit_score"])
+    return {
+        "row": list(range(n)),
+        "loan_id": list(range(n)),
+        "prediction_id": list(range(n)),
+        "risk_score": (loan_columns["ltv"] / 150).round(4).tolist(),
+        "retention_score": (loan_columns["dti"] / 100).round(4).tolist(),
+        "recommendation": ["Portfolio profile stable: monitor routinely"] * n,
+    }
+
+
+@pytest.mark.parametrize("media_type", FORMATS, ids=lambda media_type: media_type.rsplit("/", 1)[-1])
+def test_encode_batch_results_10k(benchmark, loan_columns, media_type):
+    results = _results(loan_columns)
+
+    def encode() -> bytes:
+        chunks = _column_chunks(results)
+        return b"".join(encode_stream(media_type, BATCH_RESULT_SCHEMA, chunks, list_key="results", footer={"errors": []}))
+
+    payload = benchmark(encode)
+    benchmark.extra_info["bytes"] = len(payload)
+    assert payload
@@ -0,0 +1,60 @@
+import numpy as np
+
+from app.schemas.optimization import CapacityOptimizationRequest, CapacityPlanRequest, CapacitySimulationRequest
+from app.services.optimization_service import UnderwriterCapacityOptimizationService
+from app.services.scheduling_service import UnderwriterSchedulingService
+
+
+def _request(step: float) -> CapacityOptimizationRequest:
+    return CapacityOptimizationRequest(
+        daily_applications=5000,
+        review_capacity_per_underwriter=35,
+        current_underwriters=40,
+        max_underwriters=200,
+        min_threshold=0.4,
+        max_threshold=0.95,
+        step=step,
+    )
+
+
+def _risk_scores(n: int) -> list[float]:
+    return np.random.default_rng(5).beta(2, 3, size=n).round(4).tolist()
+
+
+def test_optimize_default_window(benchmark):
+    service = UnderwriterCapacityOptimizationService()
+    result = benchmark(service.optimize, _request(0.05), _risk_scores(5000))
+    assert result["scenarios"]
+
+
+def test_optimize_large_n_fine_step(benchmark):
+    service = UnderwriterCapacityOptimizationService()
+    result = benchmark.pedantic(
+        service.optimize,
+        args=(_request(0.001), _risk_scores(100_000)),
+        rounds=3,
+        iterations=1,
+    )
+    assert len(result["scenarios"]) > 500
+
+
+def test_simulate_10k(benchmark):
+    service = UnderwriterCapacityOptimizationService()
+    request = CapacitySimulationRequest(**_request(0.05).model_dump(), simulations=10_000, seed=1)
+    result = benchmark(service.simulate, request, _risk_scores(5000))
+    assert result["simulations"] == 10_000
+
+
+def test_plan_monthly(benchmark):
+    service = UnderwriterSchedulingService()
+    request = CapacityPlanRequest(
+        daily_applications=[5000, 5200, 5400, 4800, 4500, 1500, 900] * 4 + [5000, 5100, 5300],
+        review_capacity_per_underwriter=35,
+        max_underwriters=200,
+        min_threshold=0.4,
+        max_threshold=0.95,
+        step=0.05,
+        initial_backlog=500,
+    )
+    result = benchmark(service.plan, request, _risk_scores(5000), 0.002)
+    assert result["horizon_days"] == 31
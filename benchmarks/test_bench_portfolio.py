@@ -0,0 +1,18 @@
+from app.api.routes import portfolio_summary
+from app.services.valuation_service import PortfolioValuationService
+
+
+def test_portfolio_summary_small(benchmark, small_portfolio_db):
+    summary = benchmark(portfolio_summary, db=small_portfolio_db)
+    assert summary.total_scored > 0
+
+
+def test_portfolio_summary_large(benchmark, large_portfolio_db):
+    summary = benchmark.pedantic(portfolio_summary, kwargs={"db": large_portfolio_db}, rounds=3, iterations=1)
+    assert summary.total_scored > 0
+
+
+def test_portfolio_valuation_large(benchmark, large_portfolio_db):
+    service = PortfolioValuationService()
+    result = benchmark.pedantic(service.value_portfolio, args=(large_portfolio_db,), rounds=3, iterations=1)
+    assert result["loan_count"] > 0
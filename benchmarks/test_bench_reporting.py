@@ -0,0 +1,37 @@
+from app.services.report_service import ReportService
+from pipelines.train_model import train_and_save_model
+
+
+def test_generate_executive_summary(benchmark, small_portfolio_db, tmp_path):
+    service = ReportService()
+    service.report_dir = tmp_path
+    pdf_path = benchmark.pedantic(
+        service.generate_executive_summary,
+        args=(small_portfolio_db,),
+        rounds=3,
+        iterations=1,
+    )
+    assert pdf_path.exists()
+
+
+def test_generate_executive_summary_large(benchmark, large_portfolio_db, tmp_path):
+    service = ReportService()
+    service.report_dir = tmp_path
+    pdf_path = benchmark.pedantic(
+        service.generate_executive_summary,
+        args=(large_portfolio_db,),
+        rounds=3,
+        iterations=1,
+    )
+    assert pdf_path.exists()
+
+
+def test_train_and_save_model(benchmark, tmp_path, monkeypatch):
+    monkeypatch.setenv("REPORTS_DIR", str(tmp_path / "reports"))
+    bundle = benchmark.pedantic(
+        train_and_save_model,
+        args=(tmp_path / "model_bundle.joblib",),
+        rounds=1,
+        iterations=1,
+    )
+    assert "default_model" in bundle
@@ -0,0 +1,33 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas.loan import LoanRequest
+
+SAMPLE_LOAN = {
+    "credit_score": 710,
+    "ltv": 78.5,
+    "dti": 31.2,
+    "days_in_processing": 11,
+    "documentation_completeness_flag": 1,
+    "income": 125000,
+    "loan_amount": 320000,
+    "interest_rate": 6.1,
+    "tenure_years": 30,
+}
+
+
+def test_model_score_single(benchmark, model_service):
+    loan = LoanRequest(**SAMPLE_LOAN)
+    result = benchmark(model_service.score, loan)
+    assert 0.0 <= result.risk_score <= 1.0
+
+
+def test_model_score_batch_10k(benchmark, model_service, loan_columns):
+    results = benchmark.pedantic(model_service.score_columns, args=(loan_columns,), rounds=5, iterations=1)
+    assert len(results) == len(loan_columns["credit_score"])
+
+
+def test_score_endpoint_end_to_end(benchmark):
+    client = TestClient(app)
+    response = benchmark(client.post, "/api/v1/score", json=SAMPLE_LOAN)
+    assert response.status_code == 200
@@ -1,29 +1,180 @@
 from __future__ import annotations
 
+import json
 import os
+import time
 
 import requests
 import streamlit as st
-from sqlalchemy import func
+from requests.adapters import HTTPAdapter
 
 from app.db.base import Base
-from app.db.session import SessionLocal, engine
+from app.db.session import SessionLocal, engine, read_router
 from app.models.loan import LoanScenario
 from app.models.prediction import PredictionResult
 from app.schemas.loan import LoanRequest
+from app.services.archive_service import PredictionArchiveService
 from app.services.model_service import ModelService
 from app.services.report_service import ReportService
+from app.services.rollup_service import PortfolioRollupService
 
 API_BASE = os.getenv("API_BASE_URL", "http://127.0.0.1:8000").rstrip("/")
 USE_LOCAL_SERVICES = os.getenv("STREAMLIT_LOCAL_SERVICES", "0") == "1" or (
     os.getenv("SPACE_ID") is not None and not os.getenv("API_BASE_URL")
 )
+CACHE_TTL_SECONDS = int(os.getenv("DASHBOARD_CACHE_TTL", "30"))
+MODEL_CACHE_TTL_SECONDS = int(os.getenv("DASHBOARD_MODEL_CACHE_TTL", "600"))
+REPORT_CACHE_TTL_SECONDS = int(os.getenv("DASHBOARD_REPORT_CACHE_TTL", "300"))
+LIVE_STREAM_SECONDS = int(os.getenv("DASHBOARD_LIVE_STREAM_SECONDS", "60"))
 
 
 @st.cache_resource
 def get_local_services() -> tuple[ModelService, ReportService]:
     Base.metadata.create_all(bind=engine)
-    return ModelService(), ReportService()
+    report_service = ReportService()
+    # The report reads rollups and score bins only; databases seeded before they existed need a backfill.
+    with SessionLocal() as db:
+        report_service.rollup_service.backfill_if_empty(db)
+    return ModelService(), report_service
+
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    # Shared across reruns and sessions so analysts reuse keep-alive connections.
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def fetch_api_health() -> bool | None:
+    try:
+        return get_http_session().get(f"{API_BASE}/health", timeout=3).ok
+    except requests.RequestException:
+        return None
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_portfolio_summary() -> dict | None:
+    if USE_LOCAL_SERVICES:
+        db = read_router.session()
+        try:
+            return PredictionArchiveService().portfolio_summary(db)
+        finally:
+            db.close()
+
+    summary_resp = get_http_session().get(f"{API_BASE}/api/v1/portfolio/summary", timeout=5)
+    return summary_resp.json() if summary_resp.ok else None
+
+
+@st.cache_data(ttl=MODEL_CACHE_TTL_SECONDS, show_spinner=False)
+def load_model_performance() -> dict | None:
+    if USE_LOCAL_SERVICES:
+        local_model_service, _ = get_local_services()
+        return local_model_service.get_performance_summary()
+    try:
+        perf_resp = get_http_session().get(f"{API_BASE}/api/v1/model/performance", timeout=5)
+        return perf_resp.json() if perf_resp.ok else None
+    except requests.RequestException:
+        return None
+
+
+@st.cache_data(ttl=REPORT_CACHE_TTL_SECONDS, show_spinner="Generating executive summary...")
+def load_executive_summary_pdf() -> tuple[bytes, str]:
+    if USE_LOCAL_SERVICES:
+        _, local_report_service = get_local_services()
+        db = read_router.session()
+        try:
+            pdf_path = local_report_service.generate_executive_summary(db)
+            return pdf_path.read_bytes(), pdf_path.name
+        finally:
+            db.close()
+
+    report_resp = get_http_session().get(f"{API_BASE}/api/v1/report/executive-summary", timeout=20)
+    report_resp.raise_for_status()
+    return report_resp.content, "executive_summary.pdf"
+
+
+def clear_portfolio_caches() -> None:
+    load_portfolio_summary.clear()
+    load_executive_summary_pdf.clear()
+
+
+def iter_sse_events(response: requests.Response):
+    event_name, data_lines = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if line == "":
+            if data_lines:
+                yield event_name, json.loads("\n".join(data_lines))
+            event_name, data_lines = "message", []
+        elif line.startswith(":"):
+            yield "keepalive", None
+        elif line.startswith("event:"):
+            event_name = line[6:].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[5:].strip())
+
+
+def render_summary_metrics(container, summary: dict) -> None:
+    c1, c2, c3, c4, c5 = container.columns(5)
+    c1.metric("Scored Loans", summary["total_scored"])
+    c2.metric("Avg Risk", f"{summary['avg_risk_score']:.2%}")
+    c3.metric("Avg Retention", f"{summary['avg_retention_score']:.2%}")
+    c4.metric("High Risk", summary["high_risk_count"])
+    c5.metric("Low Retention", summary["low_retention_count"])
+
+
+def apply_kpi_delta(summary: dict, delta: dict) -> dict:
+    total = summary["total_scored"] + delta["scored_count"]
+    risk_sum = summary["avg_risk_score"] * summary["total_scored"] + delta["risk_score_sum"]
+    retention_sum = summary["avg_retention_score"] * summary["total_scored"] + delta["retention_score_sum"]
+    return {
+        "total_scored": total,
+        "avg_risk_score": risk_sum / total if total else 0.0,
+        "avg_retention_score": retention_sum / total if total else 0.0,
+        "high_risk_count": summary["high_risk_count"] + delta["high_risk_count"],
+        "low_retention_count": summary["low_retention_count"] + delta["low_retention_count"],
+    }
+
+
+def stream_live_updates(seconds: int) -> None:
+    metrics_slot = st.empty()
+    loans_slot = st.empty()
+    status_slot = st.empty()
+    high_risk_loans: list[dict] = []
+    summary: dict | None = None
+    deadline = time.monotonic() + seconds
+    try:
+        with get_http_session().get(
+            f"{API_BASE}/api/v1/portfolio/stream",
+            params={"heartbeat_seconds": 5},
+            stream=True,
+            timeout=(3, 10),
+        ) as stream_resp:
+            stream_resp.raise_for_status()
+            for event_name, data in iter_sse_events(stream_resp):
+                if event_name == "snapshot":
+                    summary = data
+                elif event_name == "kpi_delta" and summary is not None:
+                    summary = apply_kpi_delta(summary, data)
+                    high_risk_loans = (data["high_risk_loans"] + high_risk_loans)[:20]
+                if summary is not None:
+                    render_summary_metrics(metrics_slot.container(), summary)
+                if high_risk_loans:
+                    loans_slot.dataframe(high_risk_loans)
+                remaining = deadline - time.monotonic()
+                status_slot.caption(f"Listening for live updates... {max(0, int(remaining))}s left")
+                if remaining <= 0:
+                    break
+    except requests.RequestException as exc:
+        status_slot.warning(f"Live stream unavailable: {exc}")
+        return
+    status_slot.caption("Live stream closed.")
+    load_portfolio_summary.clear()
 
 st.set_page_config(page_title="Mortgage Risk Dashboard", layout="wide")
 st.title("Mortgage Risk & Retention Analytics")
@@ -36,57 +187,49 @@ if USE_LOCAL_SERVICES:
     local_model_service, local_report_service = get_local_services()
 else:
     st.caption(f"Mode: FastAPI backend ({API_BASE})")
-    try:
-        health_resp = requests.get(f"{API_BASE}/health", timeout=3)
-        if health_resp.ok:
-            st.success("API connection: online")
-        else:
-            st.warning("API connection: unhealthy response")
-    except requests.RequestException:
+    api_healthy = fetch_api_health()
+    if api_healthy:
+        st.success("API connection: online")
+    elif api_healthy is None:
         st.warning("API connection: offline")
+    else:
+        st.warning("API connection: unhealthy response")
 
-st.subheader("Portfolio Summary")
-if USE_LOCAL_SERVICES:
-    db = SessionLocal()
-    try:
-        total_scored = db.query(func.count(PredictionResult.id)).scalar() or 0
-        avg_risk = db.query(func.avg(PredictionResult.risk_score)).scalar() or 0.0
-        avg_retention = db.query(func.avg(PredictionResult.retention_score)).scalar() or 0.0
-        high_risk = (
-            db.query(func.count(PredictionResult.id))
-            .filter(PredictionResult.risk_score >= 0.65)
-            .scalar()
-            or 0
-        )
-        low_retention = (
-            db.query(func.count(PredictionResult.id))
-            .filter(PredictionResult.retention_score < 0.45)
-            .scalar()
-            or 0
+header_col, refresh_col = st.columns([5, 1])
+header_col.subheader("Portfolio Summary")
+if refresh_col.button("Refresh data"):
+    fetch_api_health.clear()
+    load_model_performance.clear()
+    clear_portfolio_caches()
+    st.rerun()
+
+try:
+    summary = load_portfolio_summary()
+    if summary is not None:
+        render_summary_metrics(st, summary)
+        st.caption(f"Cached for up to {CACHE_TTL_SECONDS}s; use Refresh data for the latest figures.")
+    else:
+        st.warning("Could not load portfolio summary.")
+except requests.RequestException:
+    st.error(f"FastAPI service not reachable. Current API_BASE_URL={API_BASE}")
+
+if not USE_LOCAL_SERVICES:
+    with st.expander("Live portfolio updates"):
+        st.caption(
+            "Streams KPI deltas and newly scored high-risk loans from the API as they are committed, "
+            "instead of polling the summary endpoint."
         )
-        c1, c2, c3, c4, c5 = st.columns(5)
-        c1.metric("Scored Loans", int(total_scored))
-        c2.metric("Avg Risk", f"{float(avg_risk):.2%}")
-        c3.metric("Avg Retention", f"{float(avg_retention):.2%}")
-        c4.metric("High Risk", int(high_risk))
-        c5.metric("Low Retention", int(low_retention))
-    finally:
-        db.close()
-else:
-    try:
-        summary_resp = requests.get(f"{API_BASE}/api/v1/portfolio/summary", timeout=5)
-        if summary_resp.ok:
-            summary = summary_resp.json()
-            c1, c2, c3, c4, c5 = st.columns(5)
-            c1.metric("Scored Loans", summary["total_scored"])
-            c2.metric("Avg Risk", f"{summary['avg_risk_score']:.2%}")
-            c3.metric("Avg Retention", f"{summary['avg_retention_score']:.2%}")
-            c4.metric("High Risk", summary["high_risk_count"])
-            c5.metric("Low Retention", summary["low_retention_count"])
-        else:
-            st.warning("Could not load portfolio summary.")
-    except requests.RequestException:
-        st.error(f"FastAPI service not reachable. Current API_BASE_URL={API_BASE}")
+        if st.button(f"Listen for {LIVE_STREAM_SECONDS}s"):
+            stream_live_updates(LIVE_STREAM_SECONDS)
+
+performance = load_model_performance()
+if performance is not None:
+    with st.expander("Model performance"):
+        p1, p2, p3, p4 = st.columns(4)
+        p1.metric("ROC-AUC", f"{performance['roc_auc']:.3f}")
+        p2.metric("Precision (high risk)", f"{performance['precision_high_risk']:.3f}")
+        p3.metric("Recall (high risk)", f"{performance['recall_high_risk']:.3f}")
+        p4.metric("CV Accuracy", f"{performance['cross_validated_accuracy']:.3f}")
 
 st.divider()
 st.subheader("Model Scoring Interface")
@@ -149,7 +292,10 @@ if submitted:
                 model_version=scored.model_version,
             )
             db.add(pred_row)
+            db.flush()
+            PortfolioRollupService().record_predictions(db, [(loan_row, pred_row)])
             db.commit()
+            clear_portfolio_caches()
 
             st.success("Scoring completed")
             col_a, col_b = st.columns(2)
@@ -163,9 +309,10 @@ if submitted:
             db.close()
     else:
         try:
-            score_resp = requests.post(f"{API_BASE}/api/v1/score", json=payload, timeout=8)
+            score_resp = get_http_session().post(f"{API_BASE}/api/v1/score", json=payload, timeout=8)
             if score_resp.ok:
                 result = score_resp.json()
+                clear_portfolio_caches()
                 st.success("Scoring completed")
                 col_a, col_b = st.columns(2)
                 col_a.metric("Default Risk", f"{result['risk_score']:.2%}")
@@ -178,31 +325,17 @@ if submitted:
 
 st.divider()
 if st.button("Download Executive Summary PDF"):
-    if USE_LOCAL_SERVICES:
-        db = SessionLocal()
-        try:
-            pdf_path = local_report_service.generate_executive_summary(db)
-            st.download_button(
-                label="Save Executive Summary",
-                data=pdf_path.read_bytes(),
-                file_name=pdf_path.name,
-                mime="application/pdf",
-            )
-        except Exception as exc:
-            st.error(f"Failed to generate report: {exc}")
-        finally:
-            db.close()
-    else:
-        try:
-            report_resp = requests.get(f"{API_BASE}/api/v1/report/executive-summary", timeout=20)
-            if report_resp.ok:
-                st.download_button(
-                    label="Save Executive Summary",
-                    data=report_resp.content,
-                    file_name="executive_summary.pdf",
-                    mime="application/pdf",
-                )
-            else:
-                st.error("Failed to generate report.")
-        except requests.RequestException:
-            st.error("FastAPI service not reachable for report generation.")
+    try:
+        pdf_bytes, pdf_name = load_executive_summary_pdf()
+        st.download_button(
+            label="Save Executive Summary",
+            data=pdf_bytes,
+            file_name=pdf_name,
+            mime="application/pdf",
+        )
+    except requests.HTTPError:
+        st.error("Failed to generate report.")
+    except requests.RequestException:
+        st.error("FastAPI service not reachable for report generation.")
+    except Exception as exc:
+        st.error(f"Failed to generate report: {exc}")
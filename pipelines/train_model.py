@@ -96,6 +96,29 @@ def _build_feature_importance_plot(feature_scores: dict[str, float], out_path: P
     plt.close()
 
 
+def _distribution_profile(values: np.ndarray, n_bins: int = 10) -> dict:
+    values = np.asarray(values, dtype=float)
+    edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+    counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+    return {
+        "edges": edges.tolist(),
+        "proportions": (counts / counts.sum()).tolist(),
+        "mean": float(values.mean()),
+        "std": float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+        "count": int(len(values)),
+    }
+
+
+def build_reference_profile(X: pd.DataFrame, default_model: Pipeline, retention_model: Pipeline) -> dict:
+    return {
+        "features": {feature: _distribution_profile(X[feature].to_numpy()) for feature in FEATURES},
+        "scores": {
+            "risk_score": _distribution_profile(default_model.predict_proba(X)[:, 1]),
+            "retention_score": _distribution_profile(retention_model.predict_proba(X)[:, 1]),
+        },
+    }
+
+
 def train_and_save_model(model_path: str | Path = DEFAULT_MODEL_PATH) -> dict:
     model_path = Path(model_path)
     model_path.parent.mkdir(parents=True, exist_ok=True)
@@ -175,6 +198,7 @@ def train_and_save_model(model_path: str | Path = DEFAULT_MODEL_PATH) -> dict:
             "retention_accuracy": retention_acc,
         },
         "top_predictive_features": top_features,
+        "reference_profile": build_reference_profile(X, default_pipeline, retention_pipeline),
         "explainability": {
             "shap_values_sample": {k: round(v, 4) for k, v in shap_values_sample.items()},
             "shap_method": "linear_model_contribution_approximation",
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import argparse
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.services.archive_service import PredictionArchiveService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move aged predictions into day-partitioned Parquet files.")
+    parser.add_argument("--older-than-days", type=int, default=settings.archive_after_days)
+    parser.add_argument("--chunk-size", type=int, default=settings.archive_chunk_size)
+    parser.add_argument("--compact", action="store_true", help="Merge each day's part files into one file afterwards")
+    parser.add_argument("--min-files", type=int, default=2, help="Only compact days with at least this many parts")
+    parser.add_argument("--vacuum", action="store_true", help="Run VACUUM afterwards so SQLite returns freed pages")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    service = PredictionArchiveService(archive_after_days=args.older_than_days, chunk_size=args.chunk_size)
+    db = SessionLocal()
+    try:
+        summary = service.archive(db)
+    finally:
+        db.close()
+    print(
+        f"Archived {summary['predictions']} predictions and {summary['loans']} loans from before "
+        f"{summary['cutoff']:%Y-%m-%d} into {summary['files']} files across {summary['days']} days"
+    )
+
+    if args.compact:
+        compacted = service.compact(min_files=args.min_files)
+        print(
+            f"Compacted {compacted['partitions']} day partitions: "
+            f"{compacted['files_before']} -> {compacted['files_after']} files"
+        )
+
+    if args.vacuum and engine.dialect.name == "sqlite":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("VACUUM"))
+        print("Vacuumed SQLite database")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.loan import LoanScenario
+from app.services.comparables_service import COMPARABLE_FEATURES, ComparablesIndex
+from app.services.model_service import ModelService
+
+
+def _loans(n: int, seed: int) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return {
+        "credit_score": rng.integers(300, 851, n),
+        "ltv": rng.uniform(40, 100, n).round(1),
+        "dti": rng.uniform(10, 60, n).round(1),
+        "income": rng.lognormal(11.8, 0.4, n).round(-2),
+        "loan_amount": rng.lognormal(12.9, 0.5, n).round(-3),
+        "interest_rate": rng.uniform(3, 9, n).round(2),
+        "tenure_years": rng.choice([10, 15, 20, 30], n),
+    }
+
+
+def _seed(session_factory: sessionmaker, n: int) -> np.ndarray:
+    columns = _loans(n, seed=11)
+    with session_factory() as db:
+        for start in range(0, n, 100_000):
+            rows = [
+                dict(zip(COMPARABLE_FEATURES, values, strict=True))
+                for values in zip(*(columns[name][start : start + 100_000].tolist() for name in COMPARABLE_FEATURES))
+            ]
+            db.execute(insert(LoanScenario), rows)
+        db.commit()
+    return np.column_stack([columns[name] for name in COMPARABLE_FEATURES]).astype(float)
+
+
+def _percentiles_us(samples: list[float]) -> str:
+    p50, p99 = np.percentile(np.array(samples) * 1e6, [50, 99])
+    return f"p50 {p50:8.1f} us   p99 {p99:8.1f} us"
+
+
+def run(loans: int, queries: int, k: int, delta: int) -> None:
+    with tempfile.TemporaryDirectory() as scratch:
+        engine = create_engine(f"sqlite:///{Path(scratch) / 'loans.db'}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        center, scale = ModelService().feature_scaling(COMPARABLE_FEATURES)
+        path = Path(scratch) / "comparables_index.npz"
+
+        start = time.perf_counter()
+        features = _seed(session_factory, loans)
+        print(f"seeded {loans:,} loans in {time.perf_counter() - start:.1f} s")
+
+        index = ComparablesIndex(session_factory, center, scale, path)
+        start = time.perf_counter()
+        index.build()
+        print(f"full build from database: {time.perf_counter() - start:6.2f} s ({path.stat().st_size / 2**20:.0f} MiB on disk)")
+
+        restored = ComparablesIndex(session_factory, center, scale, path)
+        start = time.perf_counter()
+        restored.load()
+        print(f"load from disk:           {time.perf_counter() - start:6.2f} s")
+
+        if delta:
+            extra = _seed(session_factory, delta)
+            start = time.perf_counter()
+            restored.refresh()
+            print(f"delta refresh ({delta:,} loans): {(time.perf_counter() - start) * 1000:6.1f} ms")
+            features = np.concatenate([features, extra])
+
+        rng = np.random.default_rng(3)
+        probes = features[rng.integers(0, len(features), queries)]
+        points = restored.standardize(features)
+        tree_times, scan_times = [], []
+        for probe in probes:
+            begin = time.perf_counter()
+            restored.query(probe, k=k)
+            tree_times.append(time.perf_counter() - begin)
+        for probe in probes[: max(1, queries // 20)]:
+            begin = time.perf_counter()
+            distances = np.einsum("ij,ij->i", points - restored.standardize(probe), points - restored.standardize(probe))
+            np.argpartition(distances, k)[:k]
+            scan_times.append(time.perf_counter() - begin)
+        print(f"k={k} query, KD-tree + delta: {_percentiles_us(tree_times)}")
+        print(f"k={k} query, full scan:       {_percentiles_us(scan_times)}")
+
+        begin = time.perf_counter()
+        restored.query(probes[:100], k=k)
+        print(f"batch of 100 queries:       {(time.perf_counter() - begin) * 1000:6.2f} ms")
+        engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time comparables index builds and nearest-neighbour queries.")
+    parser.add_argument("--loans", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--delta", type=int, default=20_000, help="Loans added after the build, served from the delta tree")
+    args = parser.parse_args()
+    run(args.loans, args.queries, args.k, args.delta)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import io
+import time
+
+import numpy as np
+import orjson
+import pyarrow as pa
+
+from app.api.formats import ARROW, JSON, MSGPACK, NDJSON, encode_stream, msgpack
+from app.api.routes import BATCH_RESULT_SCHEMA, _column_chunks
+from app.schemas.prediction import BatchScoreResponse
+
+
+def _results(n: int) -> dict[str, list]:
+    rng = np.random.default_rng(5)
+    return {
+        "row": list(range(n)),
+        "loan_id": list(range(1_000_000, 1_000_000 + n)),
+        "prediction_id": list(range(2_000_000, 2_000_000 + n)),
+        "risk_score": rng.random(n).round(4).tolist(),
+        "retention_score": rng.random(n).round(4).tolist(),
+        "recommendation": rng.choice(
+            ["High default risk: tighten underwriting and monitoring", "Portfolio profile stable: monitor routinely"], n
+        ).tolist(),
+    }
+
+
+def _pydantic_response(results: dict[str, list]) -> bytes:
+    # What the endpoint did before streaming: build the response model, then dump it.
+    names = list(results)
+    rows = [dict(zip(names, values)) for values in zip(*results.values())]
+    response = BatchScoreResponse(model_version="v1", scored_count=len(rows), rejected_count=0, results=rows, errors=[])
+    return response.model_dump_json().encode()
+
+
+def _cpu_ms(function, repeats: int) -> tuple[float, object]:
+    best, value = float("inf"), None
+    for _ in range(repeats):
+        start = time.process_time()
+        value = function()
+        best = min(best, time.process_time() - start)
+    return best * 1000, value
+
+
+def run(rows: int, repeats: int) -> None:
+    results = _results(rows)
+    header = {"model_version": "v1", "scored_count": rows, "rejected_count": 0}
+    formats = [JSON, NDJSON, ARROW] + ([MSGPACK] if msgpack is not None else [])
+
+    print(f"{'format':<40} {'bytes':>10} {'encode_ms':>10} {'decode_ms':>10}")
+    encode_ms, payload = _cpu_ms(lambda: _pydantic_response(results), repeats)
+    decode_ms, _ = _cpu_ms(lambda: BatchScoreResponse.model_validate_json(payload), repeats)
+    print(f"{'pydantic response_model (previous)':<40} {len(payload):>10} {encode_ms:>10.2f} {decode_ms:>10.2f}")
+    for media_type in formats:
+
+        def encode(media_type=media_type) -> bytes:
+            return b"".join(
+                encode_stream(
+                    media_type,
+                    BATCH_RESULT_SCHEMA,
+                    _column_chunks(results),
+                    list_key="results",
+                    header=header,
+                    footer={"errors": []},
+                )
+            )
+
+        encode_ms, payload = _cpu_ms(encode, repeats)
+        if media_type == JSON:
+            decode = lambda: orjson.loads(payload)  # noqa: E731
+        elif media_type == NDJSON:
+            decode = lambda: [orjson.loads(line) for line in payload.splitlines()]  # noqa: E731
+        elif media_type == ARROW:
+            decode = lambda: pa.ipc.open_stream(payload).read_all()  # noqa: E731
+        else:
+            decode = lambda: list(msgpack.Unpacker(io.BytesIO(payload), raw=False))  # noqa: E731
+        decode_ms, _ = _cpu_ms(decode, repeats)
+        print(f"{media_type:<40} {len(payload):>10} {encode_ms:>10.2f} {decode_ms:>10.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bytes and CPU per batch of scored loans for each wire format.")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    run(args.rows, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
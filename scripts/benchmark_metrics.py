@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from app.core.metrics import MetricsMiddleware, time_stage
+
+
+def _stage_timer_us(iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with time_stage("benchmark"):
+            pass
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def _bare_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def _send(message):
+    return None
+
+
+async def _drive(app, iterations: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/ping"}
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await app(dict(scope), _receive, _send)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def run(iterations: int) -> None:
+    print(f"stage timer overhead: {_stage_timer_us(iterations):.3f} us per timed block")
+
+    plain_us = min(asyncio.run(_drive(_bare_app, iterations)) for _ in range(3))
+    wrapped_us = min(asyncio.run(_drive(MetricsMiddleware(_bare_app), iterations)) for _ in range(3))
+    print(f"bare ASGI call:        {plain_us:.3f} us")
+    print(f"with MetricsMiddleware: {wrapped_us:.3f} us")
+    print(f"middleware overhead:   {wrapped_us - plain_us:.3f} us per request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure metrics instrumentation overhead.")
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+    run(args.iterations)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.schemas.loan import LoanRequest
+from app.services.validation_service import ColumnarLoanValidator
+
+
+def _build_records(n: int, invalid_rate: float = 0.02) -> list[dict]:
+    rng = np.random.default_rng(7)
+    frame = pd.DataFrame(
+        {
+            "credit_score": rng.integers(520, 821, size=n),
+            "ltv": rng.uniform(45, 105, size=n).round(2),
+            "dti": rng.uniform(10, 60, size=n).round(2),
+            "days_in_processing": rng.integers(2, 46, size=n),
+            "documentation_completeness_flag": rng.integers(0, 2, size=n),
+            "income": rng.uniform(40_000, 250_000, size=n).round(2),
+            "loan_amount": rng.uniform(80_000, 1_000_000, size=n).round(2),
+            "interest_rate": rng.uniform(2.5, 10.5, size=n).round(2),
+            "tenure_years": rng.integers(10, 31, size=n),
+        }
+    )
+    invalid = rng.random(n) < invalid_rate
+    frame.loc[invalid, "credit_score"] = 900
+    return frame.to_dict(orient="records")
+
+
+def _per_row_pydantic(records: list[dict]) -> int:
+    failures = 0
+    for record in records:
+        try:
+            LoanRequest(**record)
+        except ValueError:
+            failures += 1
+    return failures
+
+
+def run(sizes: list[int], repeats: int) -> None:
+    validator = ColumnarLoanValidator()
+    print(f"{'rows':>10} {'pydantic_ms':>12} {'columnar_ms':>12} {'records_ms':>12} {'speedup':>8}")
+    for n in sizes:
+        records = _build_records(n)
+        frame = pd.DataFrame.from_records(records)
+
+        pydantic_times, columnar_times, records_times = [], [], []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            pydantic_failures = _per_row_pydantic(records)
+            pydantic_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            result = validator.validate_frame(frame)
+            columnar_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            validator.validate_records(records)
+            records_times.append(time.perf_counter() - start)
+
+        assert pydantic_failures == len(result.errors)
+        pydantic_ms = min(pydantic_times) * 1000
+        columnar_ms = min(columnar_times) * 1000
+        records_ms = min(records_times) * 1000
+        print(
+            f"{n:>10} {pydantic_ms:>12.2f} {columnar_ms:>12.2f} {records_ms:>12.2f} "
+            f"{pydantic_ms / columnar_ms:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-row Pydantic and columnar LoanRequest validation.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeats)
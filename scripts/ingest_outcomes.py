@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.services.performance_service import INGEST_BATCH, ModelPerformanceTracker
+
+TRUE_VALUES = {"1", "true", "t", "yes", "y"}
+FALSE_VALUES = {"0", "false", "f", "no", "n"}
+
+
+def _parse_flag(value) -> bool | None:
+    if pd.isna(value):
+        return None
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    if text == "":
+        return None
+    raise ValueError(f"Unrecognised outcome flag: {value!r}")
+
+
+def _read_outcomes(path: Path, batch_size: int):
+    for chunk in pd.read_csv(path, chunksize=batch_size, dtype=str, keep_default_na=False):
+        if "loan_id" not in chunk.columns:
+            raise ValueError("Outcome file needs a loan_id column")
+        for record in chunk.to_dict(orient="records"):
+            yield {
+                "loan_id": int(record["loan_id"]),
+                "defaulted": _parse_flag(record.get("defaulted", "")),
+                "retained": _parse_flag(record.get("retained", "")),
+            }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill realized default/retention outcomes by loan ID.")
+    parser.add_argument("csv", type=Path, nargs="?", help="CSV with loan_id and defaulted and/or retained columns")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH)
+    parser.add_argument("--rebuild", action="store_true", help="Recompute performance bins from stored labels")
+    args = parser.parse_args()
+    if args.csv is None and not args.rebuild:
+        parser.error("pass an outcome CSV, --rebuild, or both")
+
+    Base.metadata.create_all(bind=engine)
+    tracker = ModelPerformanceTracker(batch_size=args.batch_size)
+    db = SessionLocal()
+    try:
+        if args.csv is not None:
+            summary = tracker.ingest(db, _read_outcomes(args.csv, args.batch_size))
+            print(
+                f"Received {summary['received']} outcomes: {summary['updated']} updated, "
+                f"{summary['unchanged']} unchanged, {len(summary['unknown_loan_ids'])} unknown loan IDs"
+            )
+        if args.rebuild:
+            processed = tracker.rebuild(db)
+            print(f"Rebuilt performance bins from {processed} labelled predictions")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+OPERATIONS: dict[str, tuple[str, str]] = {
+    "score": ("POST", "/api/v1/score"),
+    "summary": ("GET", "/api/v1/portfolio/summary"),
+    "optimize": ("POST", "/api/v1/optimization/underwriter-capacity"),
+    "report": ("GET", "/api/v1/report/executive-summary"),
+}
+DEFAULT_MIX = "score=70,summary=20,optimize=8,report=2"
+
+OPTIMIZATION_PAYLOAD = {
+    "daily_applications": 400,
+    "review_capacity_per_underwriter": 35,
+    "current_underwriters": 10,
+    "max_underwriters": 20,
+    "min_threshold": 0.5,
+    "max_threshold": 0.8,
+    "step": 0.05,
+}
+
+
+def _score_payload(rng: random.Random) -> dict:
+    return {
+        "credit_score": rng.randint(580, 810),
+        "ltv": round(rng.uniform(55, 100), 2),
+        "dti": round(rng.uniform(15, 55), 2),
+        "days_in_processing": rng.randint(2, 40),
+        "documentation_completeness_flag": rng.randint(0, 1),
+        "income": round(rng.uniform(55000, 240000), 2),
+        "loan_amount": round(rng.uniform(120000, 900000), 2),
+        "interest_rate": round(rng.uniform(3.2, 9.8), 2),
+        "tenure_years": rng.randint(10, 30),
+    }
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    mix: dict[str, float] = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}'; choose from {sorted(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+@dataclass
+class RunResult:
+    backend: str
+    concurrency: int
+    elapsed: float
+    samples: dict[str, list[float]] = field(default_factory=dict)
+    errors: dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> dict:
+        operations = {}
+        all_latencies: list[float] = []
+        total_errors = 0
+        for name in sorted(set(self.samples) | set(self.errors)):
+            latencies = self.samples.get(name, [])
+            errors = self.errors.get(name, 0)
+            all_latencies.extend(latencies)
+            total_errors += errors
+            operations[name] = _latency_stats(latencies, errors, self.elapsed)
+        return {
+            "backend": self.backend,
+            "concurrency": self.concurrency,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "total": _latency_stats(all_latencies, total_errors, self.elapsed),
+            "operations": operations,
+        }
+
+
+def _latency_stats(latencies: list[float], errors: int, elapsed: float) -> dict:
+    requests = len(latencies) + errors
+    stats = {
+        "requests": requests,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(errors / requests, 4) if requests else 0.0,
+    }
+    if latencies:
+        p50, p95, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+        stats.update({"p50_ms": round(float(p50), 2), "p95_ms": round(float(p95), 2), "p99_ms": round(float(p99), 2)})
+    return stats
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    mix: dict[str, float],
+    deadline: float,
+    result: RunResult,
+    seed: int,
+) -> None:
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        method, path = OPERATIONS[name]
+        body = None
+        if name == "score":
+            body = _score_payload(rng)
+        elif name == "optimize":
+            body = OPTIMIZATION_PAYLOAD
+
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=body)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        latency = time.perf_counter() - start
+
+        if ok:
+            result.samples.setdefault(name, []).append(latency)
+        else:
+            result.errors[name] = result.errors.get(name, 0) + 1
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    backend: str,
+    mix: dict[str, float],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+) -> RunResult:
+    if warmup > 0:
+        await asyncio.gather(
+            *(_worker(client, mix, time.perf_counter() + warmup, RunResult(backend, concurrency, 0), i) for i in range(concurrency))
+        )
+
+    result = RunResult(backend=backend, concurrency=concurrency, elapsed=0.0)
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(_worker(client, mix, deadline, result, 1000 + i) for i in range(concurrency)))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _postgres_available(url: str) -> bool:
+    from sqlalchemy import create_engine, text
+
+    try:
+        engine = create_engine(url)
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        engine.dispose()
+        return True
+    except Exception as exc:  # noqa: BLE001 - any driver/connection failure means "not available"
+        print(f"Postgres stand-in not available ({exc.__class__.__name__}: {exc}); skipping.")
+        return False
+
+
+class UvicornServer:
+    def __init__(self, database_url: str, workdir: Path):
+        self.port = _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        env = {
+            **os.environ,
+            "DATABASE_URL": database_url,
+            "REPORTS_DIR": str(workdir / "reports"),
+            "MODEL_PATH": os.getenv("MODEL_PATH", str(workdir / "model_bundle.joblib")),
+        }
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(self.port), "--log-level", "warning"],
+            env=env,
+        )
+
+    def wait_ready(self, timeout: float = 120.0) -> None:
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError("uvicorn exited during startup")
+            try:
+                if httpx.get(f"{self.base_url}/health", timeout=1).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                time.sleep(0.25)
+        raise TimeoutError("uvicorn did not become healthy in time")
+
+    def stop(self) -> None:
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def _print_table(results: list[dict]) -> None:
+    header = f"{'backend':<10} {'conc':>5} {'operation':<10} {'reqs':>7} {'rps':>9} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} {'err%':>6}"
+    print(header)
+    print("-" * len(header))
+    for summary in results:
+        rows = [("total", summary["total"]), *summary["operations"].items()]
+        for name, stats in rows:
+            print(
+                f"{summary['backend']:<10} {summary['concurrency']:>5} {name:<10} {stats['requests']:>7} "
+                f"{stats['throughput_rps']:>9.1f} {stats.get('p50_ms', 0):>8.1f} {stats.get('p95_ms', 0):>8.1f} "
+                f"{stats.get('p99_ms', 0):>8.1f} {stats['error_rate'] * 100:>5.1f}%"
+            )
+
+
+async def _run_against(base_url: str | None, backend: str, args, mix) -> list[dict]:
+    if base_url is None:
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout)
+    else:
+        limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+        client = httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits)
+
+    summaries = []
+    async with client:
+        for concurrency in args.concurrency:
+            result = await run_load(client, backend, mix, concurrency, args.duration, args.warmup)
+            summaries.append(result.summary())
+    return summaries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent load test for the mortgage analytics API.")
+    parser.add_argument(
+        "--mode",
+        choices=["inprocess", "uvicorn", "url"],
+        default="uvicorn",
+        help="inprocess: ASGITransport against app.main:app; uvicorn: one local worker per backend; url: existing server",
+    )
+    parser.add_argument("--url", default=os.getenv("API_BASE_URL", "http://127.0.0.1:8000"))
+    parser.add_argument("--backends", nargs="+", default=["sqlite", "postgres"], choices=["sqlite", "postgres"])
+    parser.add_argument("--postgres-url", default=os.getenv("LOADTEST_POSTGRES_URL", ""))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted operation mix, e.g. {DEFAULT_MIX}")
+    parser.add_argument("--json-out", type=Path, help="Write the raw summaries as JSON")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    summaries: list[dict] = []
+    if args.mode == "inprocess":
+        summaries += asyncio.run(_run_against(None, "inprocess", args, mix))
+    elif args.mode == "url":
+        summaries += asyncio.run(_run_against(args.url, "remote", args, mix))
+    else:
+        with tempfile.TemporaryDirectory(prefix="loadtest_") as tmp:
+            workdir = Path(tmp)
+            for backend in args.backends:
+                if backend == "sqlite":
+                    database_url = f"sqlite:///{workdir / 'loadtest.db'}"
+                elif args.postgres_url and _postgres_available(args.postgres_url):
+                    database_url = args.postgres_url
+                else:
+                    if not args.postgres_url:
+                        print("No --postgres-url / LOADTEST_POSTGRES_URL set; skipping postgres backend.")
+                    continue
+
+                server = UvicornServer(database_url, workdir)
+                try:
+                    server.wait_ready()
+                    summaries += asyncio.run(_run_against(server.base_url, backend, args, mix))
+                finally:
+                    server.stop()
+
+    _print_table(summaries)
+    if args.json_out:
+        args.json_out.parent.mkdir(parents=True, exist_ok=True)
+        args.json_out.write_text(json.dumps(summaries, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.services.rollup_service import PortfolioRollupService
+
+
+def rebuild() -> None:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        processed = PortfolioRollupService().rebuild(db)
+        print(f"Rebuilt portfolio rollups from {processed} predictions")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild()
@@ -8,6 +8,7 @@ from app.models.loan import LoanScenario
 from app.models.prediction import PredictionResult
 from app.schemas.loan import LoanRequest
 from app.services.model_service import ModelService
+from app.services.rollup_service import PortfolioRollupService
 
 
 def seed(n: int = 30) -> None:
@@ -16,6 +17,7 @@ def seed(n: int = 30) -> None:
 
     db = SessionLocal()
     try:
+        scored_pairs = []
         for _ in range(n):
             loan = LoanRequest(
                 credit_score=random.randint(580, 810),
@@ -43,16 +45,18 @@ def seed(n: int = 30) -> None:
             db.flush()
 
             scored = model.score(loan)
-            db.add(
-                PredictionResult(
-                    loan_id=loan_row.id,
-                    risk_score=scored.risk_score,
-                    retention_score=scored.retention_score,
-                    recommendation=scored.recommendation,
-                    model_version=scored.model_version,
-                )
+            pred_row = PredictionResult(
+                loan_id=loan_row.id,
+                risk_score=scored.risk_score,
+                retention_score=scored.retention_score,
+                recommendation=scored.recommendation,
+                model_version=scored.model_version,
             )
+            db.add(pred_row)
+            scored_pairs.append((loan_row, pred_row))
 
+        db.flush()
+        PortfolioRollupService().record_predictions(db, scored_pairs)
         db.commit()
         print(f"Seeded {n} records")
     finally:
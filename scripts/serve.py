@@ -0,0 +1,155 @@
+"""Pre-fork production launcher.
+
+`uvicorn --workers N` spawns fresh interpreters, so every worker re-imports pandas/sklearn and
+loads its own copy of the model bundle. This launcher imports the app (bundle, warm-up, schema
+creation) once in the master, freezes the heap with `gc.freeze()` so the collector does not
+dirty those pages, then forks the workers. Children share the master's memory copy-on-write and
+serve from one inherited listening socket. Linux/macOS only (requires `os.fork`).
+
+    python scripts/serve.py --workers 4 --port 8000 --memory-report 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import time
+
+import uvicorn
+
+from app.core.config import settings
+from app.core.metrics import process_memory
+
+SHUTDOWN_GRACE_SECONDS = 30.0
+POLL_SECONDS = 0.5
+
+
+def _bind(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket, log_level: str) -> None:
+    # Undo the master's handlers; uvicorn installs its own for graceful shutdown.
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _format_memory(label: str, pid: int) -> str:
+    memory = process_memory(pid)
+    if not memory:
+        return f"{label} pid={pid} memory unavailable"
+    mib = {kind: value / 2**20 for kind, value in memory.items()}
+    return (
+        f"{label} pid={pid} rss={mib['rss']:.1f}MiB uss={mib['uss']:.1f}MiB "
+        f"pss={mib['pss']:.1f}MiB shared={mib['shared']:.1f}MiB"
+    )
+
+
+def serve(host: str, port: int, workers: int, log_level: str, freeze: bool, memory_report: float) -> None:
+    # Importing the app loads the model bundle, creates tables and runs the warm-up score.
+    from app.db.session import engine, read_engine
+    from app.main import app
+
+    # Connections must not be shared across processes; children open their own.
+    engine.dispose()
+    if read_engine is not None:
+        read_engine.dispose()
+    sock = _bind(host, port, backlog=2048)
+    if freeze:
+        gc.collect()
+        gc.freeze()
+
+    def fork_worker() -> int:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(app, sock, log_level)
+            finally:
+                os._exit(0)
+        return pid
+
+    children = {fork_worker(): index for index in range(workers)}
+    print(f"Pre-forked {workers} workers on http://{host}:{port} (gc.freeze={'on' if freeze else 'off'})", flush=True)
+
+    stopping = False
+
+    def request_stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    next_report = time.monotonic() + memory_report if memory_report > 0 else float("inf")
+    while not stopping:
+        time.sleep(POLL_SECONDS)
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid = 0
+            if pid == 0:
+                break
+            index = children.pop(pid, None)
+            if index is not None and not stopping:
+                print(f"Worker {index} (pid {pid}) exited with status {status}; restarting", flush=True)
+                children[fork_worker()] = index
+        if time.monotonic() >= next_report:
+            print(_format_memory("master", os.getpid()), flush=True)
+            for pid, index in sorted(children.items(), key=lambda item: item[1]):
+                print(_format_memory(f"worker {index}", pid), flush=True)
+            next_report = time.monotonic() + memory_report
+
+    for pid in children:
+        os.kill(pid, signal.SIGTERM)
+    deadline = time.monotonic() + SHUTDOWN_GRACE_SECONDS
+    while children and time.monotonic() < deadline:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            time.sleep(POLL_SECONDS / 5)
+        else:
+            children.pop(pid, None)
+    for pid in children:
+        os.kill(pid, signal.SIGKILL)
+    sock.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=settings.api_host)
+    parser.add_argument("--port", type=int, default=settings.api_port)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.prefork_workers or os.cpu_count() or 1,
+        help="Worker processes (default: PREFORK_WORKERS, else CPU count)",
+    )
+    parser.add_argument("--log-level", default="warning")
+    parser.add_argument("--no-freeze", action="store_true", help="Skip gc.freeze() before forking (for comparison)")
+    parser.add_argument(
+        "--memory-report",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="Print per-worker RSS/USS/PSS every SECONDS (0 disables)",
+    )
+    args = parser.parse_args()
+    serve(args.host, args.port, max(args.workers, 1), args.log_level, not args.no_freeze, args.memory_report)
+
+
+if __name__ == "__main__":
+    main()
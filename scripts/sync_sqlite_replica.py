@@ -0,0 +1,46 @@
+"""Copy the primary SQLite database into READ_DATABASE_URL, once or on an interval.
+
+A local stand-in for streaming replication: between copies the replica falls behind, so the
+read router's staleness checks can be exercised without a Postgres standby.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import time
+
+from app.core.config import settings
+
+
+def _sqlite_path(database_url: str) -> str:
+    if not database_url.startswith("sqlite:///"):
+        raise SystemExit(f"Expected a sqlite:/// URL, got {database_url!r}")
+    return database_url.replace("sqlite:///", "", 1)
+
+
+def sync(primary_path: str, replica_path: str) -> None:
+    with sqlite3.connect(primary_path) as source, sqlite3.connect(replica_path) as target:
+        source.backup(target)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--interval", type=float, default=0.0, help="Seconds between copies (0 copies once)")
+    args = parser.parse_args()
+    if not settings.read_database_url:
+        raise SystemExit("Set READ_DATABASE_URL to the replica file first")
+
+    primary_path = _sqlite_path(settings.database_url)
+    replica_path = _sqlite_path(settings.read_database_url)
+    while True:
+        started = time.perf_counter()
+        sync(primary_path, replica_path)
+        print(f"Copied {primary_path} -> {replica_path} in {time.perf_counter() - started:.2f}s", flush=True)
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
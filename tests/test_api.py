@@ -1,3 +1,5 @@
+import json
+
 from fastapi.testclient import TestClient
 
 from app.main import app
@@ -60,3 +62,391 @@ def test_underwriter_capacity_optimization_endpoint():
     assert 0.5 <= data["recommended_threshold"] <= 0.8
     assert data["recommended_underwriters"] >= 1
     assert len(data["scenarios"]) >= 1
+
+
+def test_batch_score_endpoint_reports_invalid_rows():
+    valid = {
+        "credit_score": 690,
+        "ltv": 82.0,
+        "dti": 36.5,
+        "days_in_processing": 9,
+        "documentation_completeness_flag": 0,
+        "income": 98000,
+        "loan_amount": 280000,
+        "interest_rate": 6.8,
+        "tenure_years": 25,
+    }
+    response = client.post(
+        "/api/v1/score/batch",
+        json={"loans": [valid, {**valid, "credit_score": 200}, {**valid, "ltv": 60.0}]},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["scored_count"] == 2
+    assert data["rejected_count"] == 1
+    assert [item["row"] for item in data["results"]] == [0, 2]
+    assert data["errors"][0]["row"] == 1
+    assert data["errors"][0]["errors"][0]["field"] == "credit_score"
+
+
+def test_file_score_endpoint_accepts_csv():
+    csv_body = (
+        "credit_score,ltv,dti,days_in_processing,documentation_completeness_flag,"
+        "income,loan_amount,interest_rate,tenure_years\n"
+        "720,75,28,10,1,130000,300000,5.9,30\n"
+        "650,95,45,30,0,70000,250000,7.4,30\n"
+    )
+    response = client.post(
+        "/api/v1/score/file",
+        content=csv_body,
+        headers={"content-type": "text/csv"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["scored_count"] == 2
+    assert data["errors"] == []
+
+
+def test_metrics_endpoint_exposes_route_and_stage_latency():
+    client.get("/health")
+    client.get("/api/v1/portfolio/summary")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'route="/api/v1/portfolio/summary"' in body
+    assert "stage_duration_seconds_bucket" in body
+    assert 'model_load_seconds{source=' in body
+    assert 'model_load_seconds{source="warmup"}' in body
+
+
+def test_portfolio_stream_sends_snapshot():
+    with client.stream("GET", "/api/v1/portfolio/stream", params={"limit": 1}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = "".join(response.iter_text())
+    assert body.startswith("event: snapshot\n")
+    assert '"total_scored"' in body
+
+
+def test_portfolio_stream_counts_a_commit_during_the_snapshot_once(monkeypatch):
+    from app.api import routes
+
+    loan = routes.LoanRequest(
+        credit_score=700,
+        ltv=80,
+        dti=30,
+        days_in_processing=10,
+        documentation_completeness_flag=1,
+        income=100000,
+        loan_amount=300000,
+        interest_rate=6,
+        tenure_years=30,
+    )
+    snapshot = routes._portfolio_snapshot
+
+    def snapshot_with_concurrent_commits():
+        with routes.SessionLocal() as db:
+            routes.score_loan(loan, db=db)  # after subscribe, before the snapshot read
+        taken = snapshot()
+        with routes.SessionLocal() as db:
+            routes.score_loan(loan, db=db)  # after the snapshot read
+        return taken
+
+    monkeypatch.setattr(routes, "_portfolio_snapshot", snapshot_with_concurrent_commits)
+    with client.stream("GET", "/api/v1/portfolio/stream", params={"limit": 2, "heartbeat_seconds": 5}) as response:
+        events = [json.loads(line[6:]) for line in response.iter_lines() if line.startswith("data: ")]
+
+    with routes.SessionLocal() as db:
+        total = routes.archive_service.portfolio_summary(db)["total_scored"]
+    assert events[0]["total_scored"] == total - 1
+    assert events[1]["scored_count"] == 1
+
+
+def test_portfolio_timeseries_endpoint():
+    response = client.get("/api/v1/portfolio/timeseries", params={"granularity": "hour", "segment": "credit_score"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["source"] == "rollup"
+    assert data["points"]
+    assert {point["segment_value"] for point in data["points"]} <= {"<620", "620-679", "680-739", "740+"}
+
+    adhoc = client.get("/api/v1/portfolio/timeseries", params={"high_risk_threshold": 0.5})
+    assert adhoc.status_code == 200
+    assert adhoc.json()["source"] == "raw"
+
+
+def test_model_drift_endpoint():
+    response = client.get("/api/v1/model/drift")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["reference_available"] is True
+    assert data["observations"] >= 1
+    assert {metric["name"] for metric in data["scores"]} == {"risk_score", "retention_score"}
+    assert len(data["features"]) == 9
+
+
+def test_outcome_ingest_updates_live_performance():
+    loan = {
+        "credit_score": 650,
+        "ltv": 91.0,
+        "dti": 44.0,
+        "days_in_processing": 20,
+        "documentation_completeness_flag": 0,
+        "income": 85000,
+        "loan_amount": 310000,
+        "interest_rate": 7.4,
+        "tenure_years": 30,
+    }
+    scored = client.post("/api/v1/score/batch", json={"loans": [loan, loan]}).json()
+    loan_ids = [item["loan_id"] for item in scored["results"]]
+    response = client.post(
+        "/api/v1/outcomes",
+        json={"outcomes": [{"loan_id": loan_ids[0], "defaulted": True}, {"loan_id": loan_ids[1], "defaulted": False}]},
+    )
+    assert response.status_code == 200
+    assert response.json()["updated"] == 2
+
+    live = client.get("/api/v1/model/performance").json()["live"]
+    assert sum(entry["labelled_default_count"] for entry in live) >= 2
+
+
+def test_underwriter_capacity_simulation_endpoint():
+    payload = {
+        "daily_applications": 400,
+        "review_capacity_per_underwriter": 35,
+        "current_underwriters": 10,
+        "max_underwriters": 20,
+        "min_threshold": 0.5,
+        "max_threshold": 0.8,
+        "step": 0.1,
+        "simulations": 2000,
+        "seed": 7,
+    }
+    response = client.post("/api/v1/optimization/underwriter-capacity/simulate", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["simulations"] == 2000
+    assert len(data["scenarios"]) == 4
+    assert all(0 <= item["shortfall_probability"] <= 1 for item in data["scenarios"])
+
+
+def test_underwriter_capacity_plan_endpoint():
+    payload = {
+        "daily_applications": [400, 420, 380, 150, 100],
+        "review_capacity_per_underwriter": 35,
+        "max_underwriters": 20,
+        "min_threshold": 0.5,
+        "max_threshold": 0.8,
+        "step": 0.1,
+        "initial_backlog": 60,
+    }
+    response = client.post("/api/v1/optimization/underwriter-capacity/plan", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["horizon_days"] == 5
+    assert data["backlog_risk_shift_per_day"] >= 0
+    assert [day["day"] for day in data["days"]] == [1, 2, 3, 4, 5]
+
+
+def test_portfolio_valuation_endpoint():
+    response = client.get("/api/v1/portfolio/valuation", params={"loss_given_default": 0.3, "horizon_years": 3})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["loss_given_default"] == 0.3
+    assert data["expected_loss"] <= data["total_exposure"] * 0.3
+    assert {segment["segment"] for segment in data["segments"]} == {"credit_score", "ltv", "risk_tier", "model_version"}
+
+
+def test_score_sensitivity_endpoint_does_not_persist():
+    before = client.get("/api/v1/portfolio/summary").json()["total_scored"]
+    payload = {
+        "loan": {
+            "credit_score": 700,
+            "ltv": 80.0,
+            "dti": 35.0,
+            "days_in_processing": 10,
+            "documentation_completeness_flag": 1,
+            "income": 120000,
+            "loan_amount": 300000,
+            "interest_rate": 6.5,
+            "tenure_years": 30,
+        },
+        "axes": [
+            {"feature": "ltv", "start": 50, "stop": 110, "points": 100},
+            {"feature": "interest_rate", "start": 3, "stop": 10, "points": 100},
+        ],
+    }
+    response = client.post("/api/v1/score/sensitivity", json=payload)
+    assert response.status_code == 200
+    assert len(response.json()["risk_scores"]) == 100
+    assert client.get("/api/v1/portfolio/summary").json()["total_scored"] == before
+
+
+def test_score_endpoint_with_micro_batching(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.api import routes
+    from app.services.batching_service import MicroBatcher
+
+    batcher = MicroBatcher(routes._score_coalesced, window_ms=20, max_size=16)
+    monkeypatch.setattr(routes, "score_batcher", batcher)
+    payloads = [
+        {
+            "credit_score": 640 + i * 10,
+            "ltv": 70.0 + i,
+            "dti": 30.0,
+            "days_in_processing": 12,
+            "documentation_completeness_flag": 1,
+            "income": 110000,
+            "loan_amount": 280000,
+            "interest_rate": 6.4,
+            "tenure_years": 30,
+        }
+        for i in range(8)
+    ]
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            responses = list(pool.map(lambda payload: client.post("/api/v1/score", json=payload), payloads))
+    finally:
+        batcher.close()
+
+    assert all(response.status_code == 200 for response in responses)
+    bodies = [response.json() for response in responses]
+    assert len({body["prediction_id"] for body in bodies}) == 8
+    direct = routes.model_service.score(routes.LoanRequest(**payloads[3]))
+    assert bodies[3]["risk_score"] == direct.risk_score
+    assert all(body["created_at"] for body in bodies)
+
+
+def test_analytical_reads_route_to_replica(monkeypatch, tmp_path):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db import session as session_module
+    from app.db.base import Base
+    from app.db.replica import ReadReplicaRouter
+
+    replica_engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(bind=replica_engine)
+    router = ReadReplicaRouter(
+        session_module.SessionLocal,
+        sessionmaker(bind=replica_engine),
+        max_lag_seconds=float("inf"),
+        check_interval_seconds=0,
+    )
+    monkeypatch.setattr(session_module, "read_router", router)
+
+    payload = {
+        "credit_score": 700,
+        "ltv": 80,
+        "dti": 30,
+        "days_in_processing": 10,
+        "documentation_completeness_flag": 1,
+        "income": 100000,
+        "loan_amount": 300000,
+        "interest_rate": 6,
+        "tenure_years": 30,
+    }
+    assert client.post("/api/v1/score", json=payload).status_code == 200
+    # The write went to the primary; the empty replica answers the summary.
+    assert client.get("/api/v1/portfolio/summary").json()["total_scored"] == 0
+    assert 'db_read_sessions_total{target="replica"}' in client.get("/metrics").text
+
+
+def test_batch_scoring_negotiates_row_formats():
+    import pyarrow as pa
+
+    valid = {
+        "credit_score": 700,
+        "ltv": 80,
+        "dti": 30,
+        "days_in_processing": 10,
+        "documentation_completeness_flag": 1,
+        "income": 100000,
+        "loan_amount": 300000,
+        "interest_rate": 6,
+        "tenure_years": 30,
+    }
+    body = {"loans": [valid, {**valid, "credit_score": 200}, valid]}
+    response = client.post("/api/v1/score/batch", json=body, headers={"accept": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    header, *rows = [json.loads(line) for line in response.text.splitlines()]
+    assert header["scored_count"] == 2 and header["errors"][0]["row"] == 1
+    assert [row["row"] for row in rows] == [0, 2]
+
+    upload = pa.Table.from_pylist([valid, valid])
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, upload.schema) as writer:
+        writer.write_table(upload)
+    response = client.post(
+        "/api/v1/score/file",
+        content=sink.getvalue().to_pybytes(),
+        headers={"content-type": "application/vnd.apache.arrow.stream", "accept": "application/vnd.apache.arrow.stream"},
+    )
+    assert response.status_code == 200
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == 2
+    assert table.column_names[:3] == ["row", "loan_id", "prediction_id"]
+
+    assert client.post("/api/v1/score/batch", json=body, headers={"accept": "text/html"}).status_code == 406
+    unsupported = client.post("/api/v1/score/file", content=b"x", headers={"content-type": "application/xml"})
+    assert unsupported.status_code == 415
+
+
+def test_prediction_listing_pages_and_streams():
+    import pyarrow as pa
+
+    first = client.get("/api/v1/predictions", params={"limit": 2})
+    assert first.status_code == 200
+    page = first.json()["predictions"]
+    assert len(page) == 2
+    assert page[0]["prediction_id"] < page[1]["prediction_id"]
+
+    following = client.get("/api/v1/predictions", params={"limit": 2, "after_id": page[-1]["prediction_id"]}).json()
+    assert all(row["prediction_id"] > page[-1]["prediction_id"] for row in following["predictions"])
+
+    arrow = client.get(
+        "/api/v1/predictions", params={"limit": 2}, headers={"accept": "application/vnd.apache.arrow.stream"}
+    )
+    assert pa.ipc.open_stream(arrow.content).read_all().column("prediction_id").to_pylist() == [
+        row["prediction_id"] for row in page
+    ]
+
+
+def test_loan_comparables_endpoints():
+    from app.api.routes import comparables_index
+
+    payload = {
+        "credit_score": 705,
+        "ltv": 79.0,
+        "dti": 32.0,
+        "days_in_processing": 9,
+        "documentation_completeness_flag": 1,
+        "income": 118000,
+        "loan_amount": 330000,
+        "interest_rate": 6.2,
+        "tenure_years": 30,
+    }
+    loan_id = client.post("/api/v1/score", json=payload).json()["loan_id"]
+    client.post("/api/v1/score", json={**payload, "credit_score": 706})
+    comparables_index.start()
+    assert comparables_index.wait_ready(30)
+    comparables_index.refresh()
+
+    response = client.get(f"/api/v1/loans/{loan_id}/comparables", params={"k": 3})
+    assert response.status_code == 200
+    data = response.json()
+    distances = [item["distance"] for item in data["comparables"]]
+    assert data["loan_id"] == loan_id
+    assert len(distances) == 3
+    assert distances == sorted(distances)
+    assert loan_id not in [item["loan_id"] for item in data["comparables"]]
+    # The 706 loan differs by one credit score point, a tiny step in standardized units.
+    assert distances[0] < 0.05
+
+    assert client.get("/api/v1/loans/999999999/comparables").status_code == 404
+    batch = client.post("/api/v1/loans/comparables", json={"loan_ids": [loan_id, 999999999], "k": 2}).json()
+    assert [result["loan_id"] for result in batch["results"]] == [loan_id]
+    assert batch["missing_loan_ids"] == [999999999]
@@ -0,0 +1,178 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func
+
+from app.models.archive import PredictionArchiveStat
+from app.models.loan import LoanScenario
+from app.models.prediction import PredictionResult
+from app.services.archive_service import PredictionArchiveService
+from app.services.performance_service import ModelPerformanceTracker
+from app.services.rollup_service import PortfolioRollupService
+from app.services.valuation_service import PortfolioValuationService
+
+NOW = datetime(2026, 6, 30, 12)
+
+
+def _seed(db, rollups, days_ago, count, risk=0.7, retention=0.4, version="v1", defaulted=False, retained=True):
+    created_at = NOW - timedelta(days=days_ago)
+    pairs = []
+    for index in range(count):
+        loan = LoanScenario(
+            credit_score=600 + 10 * index,
+            ltv=60 + index,
+            dti=30,
+            income=100000,
+            loan_amount=300000,
+            interest_rate=6,
+            tenure_years=30,
+            defaulted=defaulted,
+            retained=retained,
+        )
+        db.add(loan)
+        db.flush()
+        pred = PredictionResult(
+            loan_id=loan.id,
+            risk_score=risk - 0.01 * index,
+            retention_score=retention + 0.01 * index,
+            recommendation="",
+            model_version=version,
+            created_at=created_at + timedelta(minutes=index),
+        )
+        db.add(pred)
+        pairs.append((loan, pred))
+    db.flush()
+    rollups.record_predictions(db, pairs)
+    db.commit()
+
+
+def test_archive_moves_aged_rows_and_keeps_summary_exact(db, tmp_path):
+    archive = PredictionArchiveService(tmp_path, archive_after_days=30, chunk_size=4)
+    rollups = PortfolioRollupService(archive_service=archive)
+    _seed(db, rollups, days_ago=45, count=5)
+    _seed(db, rollups, days_ago=40, count=3, version="v2")
+    _seed(db, rollups, days_ago=2, count=2, risk=0.3, retention=0.8)
+    before = archive.portfolio_summary(db)
+
+    result = archive.archive(db, now=NOW)
+
+    assert result["predictions"] == 8
+    assert result["loans"] == 8
+    assert result["days"] == 2
+    assert db.query(func.count(PredictionResult.id)).scalar() == 2
+    assert db.query(func.count(LoanScenario.id)).scalar() == 2
+    assert db.query(func.sum(PredictionArchiveStat.scored_count)).scalar() == 8
+    after = archive.portfolio_summary(db)
+    assert after["total_scored"] == before["total_scored"] == 10
+    assert after["high_risk_count"] == before["high_risk_count"]
+    assert after["avg_risk_score"] == pytest.approx(before["avg_risk_score"])
+    assert archive.archive(db, now=NOW)["predictions"] == 0
+
+    archived = archive.read(["id", "model_version", "credit_score"], start=NOW - timedelta(days=41))
+    assert sorted(archived["model_version"]) == ["v2", "v2", "v2"]
+
+
+def test_compaction_merges_parts_and_readers_drop_duplicates(db, tmp_path):
+    archive = PredictionArchiveService(tmp_path, archive_after_days=30, chunk_size=2)
+    rollups = PortfolioRollupService(archive_service=archive)
+    _seed(db, rollups, days_ago=50, count=5)
+    archive.archive(db, now=NOW)
+    day_dir = next(archive.root.glob("day=*"))
+    parts = sorted(day_dir.glob("part-*.parquet"))
+    assert len(parts) == 3
+    # Simulate a crash-and-retry leaving the same rows in two files.
+    (day_dir / "part-1-2-copy.parquet").write_bytes(parts[0].read_bytes())
+    assert len(archive.read(["id"])) == 5
+
+    summary = archive.compact()
+
+    assert summary == {"partitions": 1, "files_before": 4, "files_after": 1}
+    assert [part.name for part in day_dir.glob("part-*.parquet")] == ["part-1-5.parquet"]
+    assert archive.read(["id"])["id"].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_raw_timeseries_and_rebuild_include_archived_rows(db, tmp_path):
+    archive = PredictionArchiveService(tmp_path, archive_after_days=30)
+    rollups = PortfolioRollupService(high_risk_threshold=0.65, low_retention_threshold=0.45, archive_service=archive)
+    _seed(db, rollups, days_ago=60, count=3)
+    _seed(db, rollups, days_ago=1, count=2)
+    rolled = rollups.timeseries(db, granularity="day", segment="credit_score")["points"]
+    adhoc = rollups.timeseries(db, granularity="day", high_risk_threshold=0.6)["points"]
+
+    archive.archive(db, now=NOW)
+
+    assert rollups.timeseries(db, granularity="day", high_risk_threshold=0.6)["points"] == adhoc
+    assert rollups.rebuild(db) == 5
+    assert rollups.timeseries(db, granularity="day", segment="credit_score")["points"] == rolled
+
+
+def test_valuation_includes_archived_predictions(db, tmp_path):
+    archive = PredictionArchiveService(tmp_path, archive_after_days=30)
+    rollups = PortfolioRollupService(archive_service=archive)
+    valuation = PortfolioValuationService(chunk_size=2, archive_service=archive)
+    _seed(db, rollups, days_ago=60, count=3, version="v2")
+    _seed(db, rollups, days_ago=45, count=2)
+    _seed(db, rollups, days_ago=1, count=2)
+    before = valuation.value_portfolio(db)
+    v2_before = valuation.value_portfolio(db, model_version="v2")
+
+    archive.archive(db, now=NOW)
+
+    assert db.query(func.count(PredictionResult.id)).scalar() == 2
+    assert valuation.value_portfolio(db) == before
+    assert valuation.value_portfolio(db, model_version="v2") == v2_before
+    assert before["loan_count"] == 7
+
+
+def test_outcomes_for_archived_predictions_are_ingested_and_rebuilt(db, tmp_path):
+    archive = PredictionArchiveService(tmp_path, archive_after_days=30)
+    rollups = PortfolioRollupService(archive_service=archive)
+    tracker = ModelPerformanceTracker(archive_service=archive)
+    _seed(db, rollups, days_ago=60, count=3, defaulted=True, retained=False)
+    _seed(db, rollups, days_ago=50, count=4, defaulted=None, retained=None, version="v2")
+    tracker.rebuild(db)
+
+    result = archive.archive(db, now=NOW)
+
+    # Only the fully labelled loans leave the hot table; the rest wait for their outcomes.
+    assert result == {**result, "predictions": 7, "loans": 3}
+    pending = [loan_id for (loan_id,) in db.query(LoanScenario.id).order_by(LoanScenario.id)]
+    assert len(pending) == 4
+    summary = tracker.ingest(
+        db, [{"loan_id": loan_id, "defaulted": index % 2 == 0, "retained": True} for index, loan_id in enumerate(pending)]
+    )
+    assert summary["updated"] == 4
+    assert summary["unknown_loan_ids"] == []
+
+    live = {entry["model_version"]: entry for entry in tracker.live_performance(db)}
+    assert live["v1"]["labelled_default_count"] == 3
+    assert live["v2"]["labelled_default_count"] == 4
+    assert live["v2"]["observed_default_rate"] == 0.5
+    assert live["v2"]["labelled_retention_count"] == 4
+
+    before = tracker.live_performance(db)
+    assert tracker.rebuild(db) == 7
+    assert tracker.live_performance(db) == before
+
+
+def test_rows_left_hot_by_an_interrupted_archive_are_counted_once(db, tmp_path, monkeypatch):
+    archive = PredictionArchiveService(tmp_path, archive_after_days=30)
+    rollups = PortfolioRollupService(high_risk_threshold=0.65, low_retention_threshold=0.45, archive_service=archive)
+    _seed(db, rollups, days_ago=60, count=3)
+    _seed(db, rollups, days_ago=1, count=2)
+    rolled = rollups.timeseries(db, granularity="day")["points"]
+
+    def crash(*args):
+        raise RuntimeError("crashed before delete")
+
+    monkeypatch.setattr(archive, "_delete", crash)
+    with pytest.raises(RuntimeError):
+        archive.archive(db, now=NOW)
+    db.rollback()
+    assert len(archive.read(["id"])) == 3
+    assert db.query(func.count(PredictionResult.id)).scalar() == 5
+
+    adhoc = rollups.timeseries(db, granularity="day", high_risk_threshold=0.6)["points"]
+    assert [point["total_scored"] for point in adhoc] == [3, 2]
+    assert rollups.rebuild(db) == 5
+    assert rollups.timeseries(db, granularity="day")["points"] == rolled
@@ -0,0 +1,54 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.metrics import SCORE_BATCH_FLUSHES
+from app.services.batching_service import MicroBatcher
+
+
+def test_concurrent_submissions_are_coalesced_in_order():
+    batches = []
+    release = threading.Event()
+
+    def handler(items):
+        release.wait(1)
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    batcher = MicroBatcher(handler, window_ms=50, max_size=8)
+    try:
+        futures = [batcher.submit(i) for i in range(20)]
+        release.set()
+        assert [future.result(timeout=5) for future in futures] == [i * 10 for i in range(20)]
+    finally:
+        batcher.close()
+
+    assert [item for batch in batches for item in batch] == list(range(20))
+    assert max(len(batch) for batch in batches) == 8
+    assert len(batches) < 20
+
+
+def test_window_flushes_partial_batch():
+    before = SCORE_BATCH_FLUSHES.value("window")
+    batcher = MicroBatcher(lambda items: items, window_ms=1, max_size=64)
+    try:
+        assert batcher.submit("only").result(timeout=5) == "only"
+    finally:
+        batcher.close()
+    assert SCORE_BATCH_FLUSHES.value("window") == before + 1
+
+
+def test_handler_errors_reach_every_caller():
+    def handler(items):
+        raise RuntimeError("model unavailable")
+
+    batcher = MicroBatcher(handler, window_ms=20, max_size=4)
+    try:
+        with ThreadPoolExecutor(4) as pool:
+            futures = list(pool.map(batcher.submit, range(4)))
+        for future in futures:
+            with pytest.raises(RuntimeError, match="model unavailable"):
+                future.result(timeout=5)
+    finally:
+        batcher.close()
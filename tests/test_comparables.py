@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.loan import LoanScenario
+from app.models.prediction import PredictionResult
+from app.services.comparables_service import COMPARABLE_FEATURES, ComparablesIndex
+
+CENTER = [680, 75, 35, 120000, 350000, 6.5, 25]
+SCALE = [80, 15, 12, 50000, 200000, 2, 6]
+
+
+@pytest.fixture()
+def session_factory(tmp_path):
+    # A file database, so the background updater thread sees the same data.
+    engine = create_engine(f"sqlite:///{tmp_path / 'loans.db'}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def _add_loans(session_factory, count, start_score=600):
+    with session_factory() as db:
+        loans = [
+            LoanScenario(
+                credit_score=start_score + index,
+                ltv=70 + index % 10,
+                dti=30,
+                income=100000,
+                loan_amount=300000,
+                interest_rate=6,
+                tenure_years=30,
+                defaulted=index % 2 == 0,
+            )
+            for index in range(count)
+        ]
+        db.add_all(loans)
+        db.flush()
+        db.add_all(
+            PredictionResult(loan_id=loan.id, risk_score=0.5, retention_score=0.5, recommendation="", model_version="v1")
+            for loan in loans
+        )
+        db.commit()
+        return [loan.id for loan in loans]
+
+
+def _brute_force(session_factory, index, features, k):
+    with session_factory() as db:
+        rows = db.query(LoanScenario.id, *(getattr(LoanScenario, name) for name in COMPARABLE_FEATURES)).all()
+    ids = np.array([row[0] for row in rows])
+    points = index.standardize(np.array([row[1:] for row in rows], dtype=float))
+    distances = np.linalg.norm(points - index.standardize(features), axis=1)
+    return ids[np.argsort(distances, kind="stable")[:k]].tolist()
+
+
+def test_index_matches_brute_force_across_main_and_delta_trees(session_factory, tmp_path):
+    index = ComparablesIndex(session_factory, CENTER, SCALE, tmp_path / "index.npz")
+    _add_loans(session_factory, 40)
+    assert index.build() == 40
+    _add_loans(session_factory, 15, start_score=615)
+    assert index.refresh() == 15
+    assert index.refresh() == 0
+
+    query = np.array([621, 73, 30, 100000, 300000, 6, 30], dtype=float)
+    found = [loan_id for loan_id, _ in index.query(query, k=6)[0]]
+
+    assert found == _brute_force(session_factory, index, query, 6)
+    assert index.size == 55
+
+
+def test_query_excludes_the_loan_itself_and_describe_skips_deleted_loans(session_factory, tmp_path):
+    index = ComparablesIndex(session_factory, CENTER, SCALE, tmp_path / "index.npz")
+    loan_ids = _add_loans(session_factory, 10)
+    index.build()
+    with session_factory() as db:
+        features = index.features_for(db, [loan_ids[0]])
+        neighbours = index.query(np.array([features[loan_ids[0]]]), k=3, exclude_ids=[loan_ids[0]])
+        assert loan_ids[0] not in [loan_id for loan_id, _ in neighbours[0]]
+        db.query(PredictionResult).filter(PredictionResult.loan_id == neighbours[0][0][0]).delete()
+        db.query(LoanScenario).filter(LoanScenario.id == neighbours[0][0][0]).delete()
+        db.commit()
+
+        described = index.describe(db, neighbours)
+
+    assert [item["loan_id"] for item in described[0]] == [loan_id for loan_id, _ in neighbours[0][1:]]
+    assert described[0][0]["risk_score"] == 0.5
+    assert set(COMPARABLE_FEATURES) <= set(described[0][0])
+
+
+def test_persisted_index_loads_without_a_scan_and_rejects_another_scaler(session_factory, tmp_path):
+    path = tmp_path / "index.npz"
+    _add_loans(session_factory, 20)
+    ComparablesIndex(session_factory, CENTER, SCALE, path).build()
+
+    restored = ComparablesIndex(session_factory, CENTER, SCALE, path)
+    assert restored.load()
+    assert restored.size == 20
+    _add_loans(session_factory, 5, start_score=700)
+    assert restored.refresh() == 5
+
+    assert not ComparablesIndex(session_factory, CENTER, [1] * len(SCALE), path).load()
+
+
+def test_background_updater_builds_then_follows_new_loans(session_factory, tmp_path):
+    index = ComparablesIndex(session_factory, CENTER, SCALE, tmp_path / "index.npz", refresh_seconds=0.01)
+    _add_loans(session_factory, 8)
+    index.start()
+    try:
+        assert index.wait_ready(5)
+        _add_loans(session_factory, 4, start_score=650)
+        for _ in range(500):
+            if index.size == 12:
+                break
+            index._stop.wait(0.01)
+    finally:
+        index.stop()
+    assert index.size == 12
+    assert (tmp_path / "index.npz").exists()
+
+
+def test_nearest_refills_results_when_indexed_loans_were_archived(session_factory, tmp_path):
+    index = ComparablesIndex(session_factory, CENTER, SCALE, tmp_path / "index.npz")
+    loan_ids = _add_loans(session_factory, 30)
+    index.build()
+    query = np.array([600, 70, 30, 100000, 300000, 6, 30], dtype=float)
+    closest = [loan_id for loan_id, _ in index.query(query, k=12)[0]]
+    with session_factory() as db:
+        db.query(PredictionResult).filter(PredictionResult.loan_id.in_(closest[:9])).delete()
+        db.query(LoanScenario).filter(LoanScenario.id.in_(closest[:9])).delete()
+        db.commit()
+
+        described = index.nearest(db, query, k=5, exclude_ids=[loan_ids[0]])
+
+    assert [item["loan_id"] for item in described[0]] == [
+        loan_id for loan_id in _brute_force(session_factory, index, query, 6) if loan_id != loan_ids[0]
+    ][:5]
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from app.services.drift_service import DriftMonitor, StreamingDistribution
+from pipelines.train_model import _distribution_profile
+
+
+def test_streaming_moments_match_numpy():
+    rng = np.random.default_rng(3)
+    values = rng.normal(50, 8, size=1000)
+    one_by_one = StreamingDistribution(_distribution_profile(values))
+    for value in values[:400]:
+        one_by_one.update(value)
+    one_by_one.update_many(values[400:])
+
+    assert one_by_one.count == 1000
+    assert np.isclose(one_by_one.mean, values.mean())
+    assert np.isclose(one_by_one.std, values.std(ddof=1))
+    assert one_by_one.psi() < 0.01
+    assert one_by_one.ks() < 0.01
+
+
+def _monitor(rng) -> DriftMonitor:
+    reference = pd.DataFrame({"ltv": rng.uniform(45, 105, 2000), "dti": rng.uniform(10, 60, 2000)})
+    profile = {
+        "features": {name: _distribution_profile(reference[name].to_numpy()) for name in reference},
+        "scores": {
+            "risk_score": _distribution_profile(rng.beta(2, 3, 2000)),
+            "retention_score": _distribution_profile(rng.beta(3, 2, 2000)),
+        },
+    }
+    return DriftMonitor(profile)
+
+
+def test_shifted_feature_is_flagged():
+    rng = np.random.default_rng(4)
+    monitor = _monitor(rng)
+    n = 500
+    monitor.observe_columns(
+        {"ltv": rng.uniform(95, 120, n), "dti": rng.uniform(10, 60, n)},
+        rng.beta(2, 3, n),
+        rng.beta(3, 2, n),
+    )
+    report = {metric["name"]: metric for metric in monitor.report()["features"]}
+    assert report["ltv"]["status"] == "significant_drift"
+    assert report["dti"]["status"] == "stable"
+    assert report["ltv"]["ks_statistic"] > 0.5
+
+
+def test_monitor_without_reference_is_inert():
+    monitor = DriftMonitor(None)
+    monitor.observe({"ltv": 80.0}, 0.4, 0.6)
+    report = monitor.report()
+    assert report["reference_available"] is False
+    assert report["observations"] == 0
@@ -0,0 +1,66 @@
+import asyncio
+
+from app.services.event_service import PortfolioEventBroker, ScoredLoanEvent
+
+
+def _event(prediction_id: int, risk: float, retention: float) -> ScoredLoanEvent:
+    return ScoredLoanEvent(
+        loan_id=prediction_id,
+        prediction_id=prediction_id,
+        risk_score=risk,
+        retention_score=retention,
+        recommendation="",
+        model_version="v1",
+    )
+
+
+def test_publishes_are_coalesced_per_subscriber():
+    async def scenario():
+        broker = PortfolioEventBroker(max_pending_loans=2)
+        subscription = broker.subscribe()
+        broker.publish([_event(1, 0.9, 0.3)])
+        broker.publish([_event(2, 0.2, 0.8), _event(3, 0.7, 0.5), _event(4, 0.8, 0.4)])
+
+        delta = await broker.next_delta(subscription, timeout=1)
+        assert delta["scored_count"] == 4
+        assert delta["high_risk_count"] == 3
+        assert delta["low_retention_count"] == 2
+        assert [loan["prediction_id"] for loan in delta["high_risk_loans"]] == [3, 4]
+        assert delta["dropped_high_risk_loans"] == 1
+
+        assert await broker.next_delta(subscription, timeout=0.01) is None
+        broker.unsubscribe(subscription)
+        assert broker.subscriber_count == 0
+
+    asyncio.run(scenario())
+
+
+def test_publish_from_worker_thread_wakes_subscriber():
+    async def scenario():
+        broker = PortfolioEventBroker()
+        subscription = broker.subscribe()
+        waiter = asyncio.create_task(broker.next_delta(subscription, timeout=2))
+        await asyncio.to_thread(broker.publish, [_event(7, 0.1, 0.9)])
+        delta = await waiter
+        assert delta["scored_count"] == 1
+        assert delta["high_risk_loans"] == []
+
+    asyncio.run(scenario())
+
+
+def test_held_subscription_drops_events_already_in_the_snapshot():
+    async def scenario():
+        broker = PortfolioEventBroker()
+        subscription = broker.subscribe(hold=True)
+        broker.publish([_event(5, 0.9, 0.3)])  # committed before the snapshot read
+        assert await broker.next_delta(subscription, timeout=0.01) is None
+        broker.publish([_event(6, 0.2, 0.8)])  # committed after it
+        broker.start_after(subscription, 5)
+
+        delta = await broker.next_delta(subscription, timeout=1)
+        assert delta["scored_count"] == 1
+        assert delta["high_risk_count"] == 0
+        broker.publish([_event(4, 0.9, 0.3), _event(7, 0.9, 0.3)])
+        assert (await broker.next_delta(subscription, timeout=1))["scored_count"] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,67 @@
+import json
+from datetime import datetime
+
+import pyarrow as pa
+import pytest
+from fastapi import HTTPException
+
+from app.api import formats
+from app.api.formats import ARROW, JSON, NDJSON, decode_records, encode_stream, negotiate
+
+SCHEMA = pa.schema([("id", pa.int64()), ("created_at", pa.timestamp("us")), ("label", pa.string())])
+CHUNKS = [
+    {"id": [1, 2], "created_at": [datetime(2026, 1, 1, 9), datetime(2026, 1, 1, 10)], "label": ["a", "b"]},
+    {"id": [3], "created_at": [datetime(2026, 1, 2)], "label": ["c"]},
+]
+
+
+def _encode(media_type, **kwargs):
+    return b"".join(encode_stream(media_type, SCHEMA, iter(CHUNKS), list_key="rows", **kwargs))
+
+
+def test_negotiate_honours_quality_and_aliases(monkeypatch):
+    assert negotiate(None) == JSON
+    assert negotiate("*/*") == JSON
+    assert negotiate("application/jsonl") == NDJSON
+    assert negotiate("application/json;q=0.5, application/vnd.apache.arrow.stream") == ARROW
+    assert negotiate("text/html, application/x-ndjson;q=0.1") == NDJSON
+    with pytest.raises(HTTPException) as excinfo:
+        negotiate("text/html")
+    assert excinfo.value.status_code == 406
+
+    monkeypatch.setattr(formats, "msgpack", None)
+    with pytest.raises(HTTPException):
+        negotiate("application/msgpack")
+    assert negotiate("application/msgpack, application/json;q=0.2") == JSON
+
+
+def test_json_stream_is_one_document_with_header_and_footer():
+    document = json.loads(_encode(JSON, header={"count": 3}, footer={"errors": []}))
+    assert list(document) == ["count", "rows", "errors"]
+    assert [row["id"] for row in document["rows"]] == [1, 2, 3]
+    assert document["rows"][0]["created_at"] == "2026-01-01T09:00:00"
+    assert json.loads(_encode(JSON)) == {"rows": document["rows"]}
+    assert json.loads(b"".join(encode_stream(JSON, SCHEMA, iter([]), list_key="rows"))) == {"rows": []}
+
+
+def test_ndjson_and_arrow_round_trip():
+    lines = _encode(NDJSON, header={"count": 3}).splitlines()
+    assert json.loads(lines[0]) == {"count": 3}
+    assert [json.loads(line)["label"] for line in lines[1:]] == ["a", "b", "c"]
+    assert decode_records(b"\n".join(lines[1:]), NDJSON)["id"].tolist() == [1, 2, 3]
+
+    payload = _encode(ARROW, header={"count": 3}, footer={"errors": [{"row": 4}]})
+    table = pa.ipc.open_stream(payload).read_all()
+    assert table.column("label").to_pylist() == ["a", "b", "c"]
+    assert json.loads(table.schema.metadata[b"errors"]) == [{"row": 4}]
+    assert decode_records(payload, ARROW)["created_at"].iloc[2] == datetime(2026, 1, 2)
+
+
+@pytest.mark.skipif(formats.msgpack is None, reason="msgpack not installed")
+def test_msgpack_round_trip():
+    payload = _encode(formats.MSGPACK, header={"count": 3})
+    unpacker = formats.msgpack.Unpacker(raw=False)
+    unpacker.feed(payload)
+    records = list(unpacker)
+    assert records[0] == {"count": 3}
+    assert records[1]["created_at"] == "2026-01-01T09:00:00"
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from app.core.metrics import MetricsRegistry, process_memory
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("demo_seconds", "Demo latency.", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "a")
+    histogram.observe(0.5, "a")
+    histogram.observe(5.0, "a")
+
+    text = registry.render()
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="a",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{stage="a",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{stage="a"} 3' in text
+
+
+def test_gauge_callback_and_counter():
+    registry = MetricsRegistry()
+    registry.gauge("pool", "Pool.", ("state",), callback=lambda: {("checked_out",): 2.0})
+    counter = registry.counter("lookups_total", "Lookups.", ("result",))
+    counter.inc("hit")
+    counter.inc("hit")
+
+    text = registry.render()
+    assert 'pool{state="checked_out"} 2.0' in text
+    assert 'lookups_total{result="hit"} 2.0' in text
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux smaps_rollup")
+def test_process_memory_reports_private_and_shared_bytes():
+    memory = process_memory()
+    assert set(memory) == {"rss", "pss", "uss", "shared"}
+    assert 0 < memory["uss"] <= memory["rss"]
+    assert memory["uss"] + memory["shared"] == memory["rss"]
+    assert process_memory(2**31 - 1) == {}
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.optimization import CapacitySimulationRequest
+from app.services.optimization_service import UnderwriterCapacityOptimizationService
+
+
+def _request(**overrides) -> CapacitySimulationRequest:
+    params = {
+        "daily_applications": 400,
+        "review_capacity_per_underwriter": 35,
+        "current_underwriters": 10,
+        "max_underwriters": 20,
+        "min_threshold": 0.5,
+        "max_threshold": 0.8,
+        "step": 0.05,
+        "simulations": 5000,
+        "seed": 11,
+    }
+    return CapacitySimulationRequest(**{**params, **overrides})
+
+
+def test_simulation_centres_on_point_estimate_and_is_reproducible():
+    scores = np.random.default_rng(2).beta(2, 3, size=5000).tolist()
+    service = UnderwriterCapacityOptimizationService()
+    request = _request()
+
+    simulated = service.simulate(request, scores)
+    assert simulated == service.simulate(request, scores)
+
+    point = {item["threshold"]: item for item in service.optimize(request, scores)["scenarios"]}
+    for scenario in simulated["scenarios"]:
+        expected = point[scenario["threshold"]]["expected_manual_reviews"]
+        assert scenario["mean_manual_reviews"] == pytest.approx(expected, rel=0.05, abs=1)
+        assert sum(scenario["required_underwriters_distribution"].values()) == pytest.approx(1, abs=1e-3)
+        assert scenario["required_underwriters_p50"] <= scenario["required_underwriters_p95"]
+        assert 0 <= scenario["shortfall_probability"] <= 1
+
+
+def test_shortfall_probability_rises_when_understaffed():
+    scores = np.random.default_rng(3).beta(2, 3, size=5000).tolist()
+    service = UnderwriterCapacityOptimizationService()
+    scenarios = service.simulate(_request(current_underwriters=1), scores)["scenarios"]
+    assert max(item["shortfall_probability"] for item in scenarios) > 0.9
+
+
+def test_simulation_grid_is_bounded():
+    with pytest.raises(ValidationError):
+        _request(simulations=1_000_000, step=0.001, min_threshold=0.4, max_threshold=0.95)
+
+
+def test_inverted_threshold_range_is_rejected():
+    with pytest.raises(ValidationError, match="min_threshold must be <= max_threshold"):
+        _request(min_threshold=0.8, max_threshold=0.5)
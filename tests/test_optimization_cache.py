@@ -0,0 +1,47 @@
+from app.core.metrics import CACHE_EVICTIONS, CACHE_REQUESTS
+from app.schemas.optimization import CapacityOptimizationRequest
+from app.services.optimization_cache import CACHE_NAME, OptimizationResultCache
+
+
+def _request(daily_applications: int = 400) -> CapacityOptimizationRequest:
+    return CapacityOptimizationRequest(
+        daily_applications=daily_applications,
+        review_capacity_per_underwriter=35,
+        current_underwriters=10,
+        max_underwriters=20,
+        min_threshold=0.5,
+        max_threshold=0.8,
+        step=0.1,
+    )
+
+
+def test_cache_hits_until_portfolio_version_changes():
+    cache = OptimizationResultCache(max_entries=4)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"call": len(calls)}
+
+    hits_before = CACHE_REQUESTS.value(CACHE_NAME, "hit")
+    assert cache.get_or_compute("sweep", _request(), 10, compute) == {"call": 1}
+    assert cache.get_or_compute("sweep", _request(), 10, compute) == {"call": 1}
+    assert CACHE_REQUESTS.value(CACHE_NAME, "hit") == hits_before + 1
+
+    assert cache.get_or_compute("sweep", _request(), 11, compute) == {"call": 2}
+    assert cache.get_or_compute("plan", _request(), 11, compute) == {"call": 3}
+    assert cache.get_or_compute("sweep", _request(401), 11, compute) == {"call": 4}
+
+
+def test_cache_evicts_least_recently_used():
+    cache = OptimizationResultCache(max_entries=2)
+    evictions_before = CACHE_EVICTIONS.value(CACHE_NAME)
+    cache.get_or_compute("sweep", _request(100), 1, lambda: {"n": 100})
+    cache.get_or_compute("sweep", _request(200), 1, lambda: {"n": 200})
+    cache.get_or_compute("sweep", _request(100), 1, lambda: {"n": -1})  # refreshes 100
+    cache.get_or_compute("sweep", _request(300), 1, lambda: {"n": 300})  # evicts 200
+
+    assert len(cache) == 2
+    assert CACHE_EVICTIONS.value(CACHE_NAME) == evictions_before + 1
+    assert cache.get_or_compute("sweep", _request(100), 1, lambda: {"n": -1}) == {"n": 100}
+    assert cache.get_or_compute("sweep", _request(200), 1, lambda: {"n": 201}) == {"n": 201}
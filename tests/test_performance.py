@@ -0,0 +1,79 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sklearn.metrics import roc_auc_score
+from sqlalchemy import select
+
+from app.models.loan import LoanScenario
+from app.models.performance import ModelPerformanceBin
+from app.models.prediction import PredictionResult
+from app.services.archive_service import PredictionArchiveService
+from app.services.performance_service import SCORE_BINS, ModelPerformanceTracker, auc_from_bins, score_bin
+
+
+def _bins(db) -> set[tuple]:
+    return {
+        (row.model_version, row.outcome, row.score_bin, row.positive_count, row.negative_count)
+        for row in db.scalars(select(ModelPerformanceBin))
+        if row.positive_count or row.negative_count
+    }
+
+
+def test_binned_auc_matches_sklearn_on_binned_scores():
+    rng = np.random.default_rng(5)
+    scores = rng.uniform(size=2000)
+    labels = rng.uniform(size=2000) < scores
+    bins = np.array([score_bin(score) for score in scores])
+    positives = np.bincount(bins[labels], minlength=SCORE_BINS)
+    negatives = np.bincount(bins[~labels], minlength=SCORE_BINS)
+    assert auc_from_bins(positives, negatives) == pytest.approx(roc_auc_score(labels, bins))
+    assert auc_from_bins(positives, np.zeros(SCORE_BINS)) is None
+
+
+def test_ingest_is_incremental_and_handles_corrections(db, tmp_path):
+    rng = np.random.default_rng(6)
+    loan_ids = []
+    for index in range(200):
+        loan = LoanScenario(
+            credit_score=700, ltv=80, dti=30, income=1e5, loan_amount=3e5, interest_rate=6, tenure_years=30
+        )
+        db.add(loan)
+        db.flush()
+        db.add(
+            PredictionResult(
+                loan_id=loan.id,
+                risk_score=float(rng.uniform()),
+                retention_score=float(rng.uniform()),
+                recommendation="",
+                model_version="v1" if index % 2 else "v2",
+                created_at=datetime(2026, 5, 1 + index % 3, 12),
+            )
+        )
+        loan_ids.append(loan.id)
+    db.commit()
+
+    tracker = ModelPerformanceTracker(batch_size=64, archive_service=PredictionArchiveService(tmp_path))
+    summary = tracker.ingest(
+        db,
+        [{"loan_id": loan_id, "defaulted": bool(rng.uniform() < 0.3), "retained": None} for loan_id in loan_ids]
+        + [{"loan_id": 99999, "defaulted": True}],
+    )
+    assert summary["updated"] == 200
+    assert summary["unknown_loan_ids"] == [99999]
+
+    # Flip some default labels and add retention labels; counters must match a full rebuild.
+    tracker.ingest(db, [{"loan_id": loan_id, "defaulted": True, "retained": True} for loan_id in loan_ids[:50]])
+    tracker.ingest(db, [{"loan_id": loan_id, "defaulted": True} for loan_id in loan_ids[:10]])
+    incremental = _bins(db)
+    tracker.rebuild(db)
+    assert incremental == _bins(db)
+
+    live = {entry["model_version"]: entry for entry in tracker.live_performance(db)}
+    assert set(live) == {"v1", "v2"}
+    assert sum(entry["labelled_default_count"] for entry in live.values()) == 200
+    assert sum(entry["labelled_retention_count"] for entry in live.values()) == 50
+    assert live["v1"]["retention_roc_auc"] is None
+
+    windowed = tracker.live_performance(db, start=datetime(2026, 5, 3), end=datetime(2026, 5, 3, 23))
+    assert sum(entry["labelled_default_count"] for entry in windowed) == 66
@@ -0,0 +1,81 @@
+from dataclasses import replace
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import admin
+from app.core import profiling
+from app.core.profiling import (
+    ProfiledRoute,
+    ProfileSampler,
+    ProfileStore,
+    ProfilingMiddleware,
+    render_collapsed_stacks,
+    render_stats_text,
+)
+
+
+def _build_app(store: ProfileStore, sampler: ProfileSampler, slow_ms: float = 500) -> FastAPI:
+    router = APIRouter(prefix="/api", route_class=ProfiledRoute)
+
+    @router.get("/work/{size}")
+    def work(size: int):
+        return {"total": sum(i * i for i in range(size))}
+
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, store=store, profile_sampler=sampler, slow_ms=slow_ms)
+    app.include_router(router)
+    return app
+
+
+def test_sampled_requests_are_stored_per_route_and_rotated(tmp_path):
+    store = ProfileStore(tmp_path, max_files=2)
+    client = TestClient(_build_app(store, ProfileSampler(sample_rate=1.0, slow_captures=0)))
+
+    for _ in range(3):
+        assert client.get("/api/work/2000").json()["total"] > 0
+
+    assert store.routes() == {"api_work_size": 2}
+    stats = store.aggregate("/api/work/{size}")
+    assert "work" in render_stats_text(stats)
+    collapsed = render_collapsed_stacks(stats)
+    assert collapsed
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.splitlines())
+
+
+def test_slow_request_arms_route_for_next_capture(tmp_path):
+    store = ProfileStore(tmp_path, max_files=5)
+    client = TestClient(_build_app(store, ProfileSampler(sample_rate=0.0, slow_captures=1), slow_ms=0))
+
+    client.get("/api/work/10")
+    assert store.routes() == {}
+
+    client.get("/api/work/10")
+    assert store.routes() == {"api_work_size": 1}
+
+
+def test_overlapping_sampled_request_runs_unprofiled(tmp_path):
+    store = ProfileStore(tmp_path, max_files=5)
+    client = TestClient(_build_app(store, ProfileSampler(sample_rate=1.0, slow_captures=0)))
+
+    # Another request holding the profiler: this one must still succeed, just without a capture.
+    with profiling._profiler_lock:
+        assert client.get("/api/work/10").status_code == 200
+    assert store.routes() == {}
+
+    assert client.get("/api/work/10").status_code == 200
+    assert store.routes() == {"api_work_size": 1}
+
+
+def test_admin_endpoints_fail_closed_without_token(monkeypatch):
+    app = FastAPI()
+    app.include_router(admin.router)
+    client = TestClient(app)
+
+    monkeypatch.setattr(admin, "settings", replace(admin.settings, admin_token=""))
+    assert client.get("/admin/profiles").status_code == 403
+    assert client.get("/admin/profiles", headers={"X-Admin-Token": ""}).status_code == 403
+
+    monkeypatch.setattr(admin, "settings", replace(admin.settings, admin_token="secret"))
+    assert client.get("/admin/profiles", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.get("/admin/profiles", headers={"X-Admin-Token": "secret"}).status_code == 200
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.replica import ReadReplicaRouter
+from app.models.loan import LoanScenario
+from app.models.prediction import PredictionResult
+
+
+def _database(path, create_tables=True):
+    engine = create_engine(f"sqlite:///{path}")
+    if create_tables:
+        Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def _add_prediction(factory, created_at, prediction_id):
+    with factory() as db:
+        db.add(
+            LoanScenario(
+                id=prediction_id,
+                credit_score=700,
+                ltv=80,
+                dti=30,
+                income=1e5,
+                loan_amount=3e5,
+                interest_rate=6,
+                tenure_years=30,
+            )
+        )
+        db.add(
+            PredictionResult(
+                id=prediction_id,
+                loan_id=prediction_id,
+                risk_score=0.5,
+                retention_score=0.5,
+                recommendation="",
+                created_at=created_at,
+            )
+        )
+        db.commit()
+
+
+@pytest.fixture()
+def databases(tmp_path):
+    return _database(tmp_path / "primary.db"), _database(tmp_path / "replica.db")
+
+
+def _target(session) -> str:
+    return session.get_bind().url.database.rsplit("/", 1)[-1]
+
+
+def test_without_replica_reads_use_primary(databases):
+    primary, _ = databases
+    router = ReadReplicaRouter(primary, None, max_lag_seconds=30)
+    assert not router.enabled
+    with router.session() as db:
+        assert _target(db) == "primary.db"
+
+
+def test_reads_follow_replica_lag(databases):
+    primary, replica = databases
+    now = datetime.utcnow()
+    for factory in (primary, replica):
+        _add_prediction(factory, now - timedelta(hours=1), 1)
+    router = ReadReplicaRouter(primary, replica, max_lag_seconds=30, check_interval_seconds=0)
+    assert router.lag_seconds() == 0.0
+    with router.session() as db:
+        assert _target(db) == "replica.db"
+
+    # Replica is missing a commit from 5 seconds ago: within tolerance.
+    _add_prediction(primary, now - timedelta(seconds=5), 2)
+    assert 5 <= router.lag_seconds() < 30
+    with router.session() as db:
+        assert _target(db) == "replica.db"
+
+    # The oldest unreplicated commit sets the lag, not the newest.
+    _add_prediction(primary, now - timedelta(seconds=1), 3)
+    router.max_lag_seconds = 3
+    with router.session() as db:
+        assert _target(db) == "primary.db"
+    assert router._target == "primary_stale"
+
+
+def test_verdict_is_cached_and_unreachable_replica_falls_back(tmp_path):
+    primary = _database(tmp_path / "primary.db")
+    broken = _database(tmp_path / "replica.db", create_tables=False)
+    router = ReadReplicaRouter(primary, broken, max_lag_seconds=30, check_interval_seconds=3600)
+    with router.session() as db:
+        assert _target(db) == "primary.db"
+    assert router._target == "primary_unavailable"
+
+    Base.metadata.create_all(bind=broken.kw["bind"])
+    with router.session() as db:
+        assert _target(db) == "primary.db"
+    router.check_interval_seconds = 0
+    with router.session() as db:
+        assert _target(db) == "replica.db"
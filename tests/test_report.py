@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.models.loan import LoanScenario
+from app.models.prediction import PredictionResult
+from app.services.archive_service import PredictionArchiveService
+from app.services.report_service import ReportService
+from app.services.rollup_service import PortfolioRollupService
+
+
+def _seed(db, rollups, created_at, count, version):
+    pairs = []
+    for index in range(count):
+        loan = LoanScenario(
+            credit_score=620 + index,
+            ltv=70,
+            dti=30,
+            income=100000,
+            loan_amount=300000,
+            interest_rate=6,
+            tenure_years=30,
+        )
+        db.add(loan)
+        db.flush()
+        pred = PredictionResult(
+            loan_id=loan.id,
+            risk_score=round(0.05 * index % 1, 4),
+            retention_score=round(1 - 0.05 * index % 1, 4),
+            recommendation="",
+            model_version=version,
+            created_at=created_at + timedelta(hours=index),
+        )
+        db.add(pred)
+        pairs.append((loan, pred))
+    db.flush()
+    rollups.record_predictions(db, pairs)
+    db.commit()
+
+
+def test_report_sections_come_from_aggregates_and_match_the_summary(db, tmp_path):
+    archive = PredictionArchiveService(tmp_path / "archive", archive_after_days=30)
+    rollups = PortfolioRollupService(archive_service=archive)
+    _seed(db, rollups, datetime.utcnow() - timedelta(days=60), 12, "v1")
+    _seed(db, rollups, datetime.utcnow() - timedelta(days=2), 8, "v2")
+    archive.archive(db)
+    service = ReportService(rollups, chart_workers=3)
+    service.report_dir = tmp_path
+
+    statements = []
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    data = service.collect(db)
+
+    # Build time must not grow with the prediction table, so no section may scan it.
+    assert statements and not any("prediction_results" in statement for statement in statements)
+    assert data.summary == pytest.approx(archive.portfolio_summary(db))
+    assert {version: int(matrix.sum()) for version, matrix in data.distributions.items()} == {"v1": 12, "v2": 8}
+    assert {point["segment_value"] for point in data.trend} == {"v1", "v2"}
+
+    pdf_path = service.generate_executive_summary(db)
+    assert pdf_path.read_bytes().startswith(b"%PDF")
+    assert len(list(tmp_path.glob("*.png"))) == 5
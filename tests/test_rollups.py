@@ -0,0 +1,173 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert
+
+from app.models.loan import LoanScenario
+from app.models.prediction import PredictionResult
+from app.models.rollup import PortfolioRollup
+from app.services.rollup_service import (
+    PortfolioRollupService,
+    band_label,
+    bucket_end,
+    bucket_start,
+    distribution_bin,
+)
+
+
+def _add_scored(db, service, created_at, credit_score, ltv, risk, retention, version="v1"):
+    loan = LoanScenario(
+        credit_score=credit_score,
+        ltv=ltv,
+        dti=30,
+        income=100000,
+        loan_amount=300000,
+        interest_rate=6,
+        tenure_years=30,
+    )
+    db.add(loan)
+    db.flush()
+    pred = PredictionResult(
+        loan_id=loan.id,
+        risk_score=risk,
+        retention_score=retention,
+        recommendation="",
+        model_version=version,
+        created_at=created_at,
+    )
+    db.add(pred)
+    db.flush()
+    service.record_predictions(db, [(loan, pred)])
+
+
+def test_bucket_and_band_helpers():
+    ts = datetime(2026, 3, 12, 15, 42)  # Thursday
+    assert bucket_start(ts, "hour") == datetime(2026, 3, 12, 15)
+    assert bucket_start(ts, "day") == datetime(2026, 3, 12)
+    assert bucket_start(ts, "week") == datetime(2026, 3, 9)
+    assert bucket_end(ts, "day") == datetime(2026, 3, 13)
+    assert bucket_end(ts, "week") == datetime(2026, 3, 16)
+    assert band_label("credit_score", 619) == "<620"
+    assert band_label("credit_score", 620) == "620-679"
+    assert band_label("ltv", 95) == ">=95"
+    assert distribution_bin(0.65) == 13
+    assert distribution_bin(0.6499) == 12
+    assert distribution_bin(1.0) == 19
+
+
+def test_rollups_match_raw_scan(db):
+    service = PortfolioRollupService(high_risk_threshold=0.65, low_retention_threshold=0.45)
+    base = datetime(2026, 3, 2, 9)
+    samples = [
+        (base, 600, 92, 0.8, 0.3, "v1"),
+        (base + timedelta(hours=1), 700, 70, 0.4, 0.6, "v1"),
+        (base + timedelta(days=1), 760, 50, 0.2, 0.9, "v2"),
+        (base + timedelta(days=8), 650, 97, 0.7, 0.4, "v2"),
+    ]
+    for sample in samples:
+        _add_scored(db, service, *sample)
+    db.commit()
+
+    for granularity in ("hour", "day", "week"):
+        for segment in ("all", "model_version", "credit_score", "ltv"):
+            rolled = service.timeseries(db, granularity=granularity, segment=segment)
+            raw = service._raw_scan(db, granularity, segment, None, None, None, 0.65, 0.45)
+            assert rolled["source"] == "rollup"
+            assert [(p["bucket_start"], p["segment_value"], p["total_scored"]) for p in rolled["points"]] == [
+                (row.bucket_start, row.segment_value, row.scored_count) for row in raw.itertuples()
+            ]
+
+    weekly = service.timeseries(db, granularity="week")
+    assert [point["total_scored"] for point in weekly["points"]] == [3, 1]
+    assert weekly["points"][0]["high_risk_count"] == 1
+
+
+def test_ad_hoc_thresholds_use_raw_scan_and_rebuild_restores_rollups(db):
+    service = PortfolioRollupService(high_risk_threshold=0.65, low_retention_threshold=0.45)
+    created_at = datetime(2026, 5, 4, 10)
+    _add_scored(db, service, created_at, 700, 70, 0.55, 0.5)
+    _add_scored(db, service, created_at, 700, 70, 0.75, 0.5)
+    db.commit()
+
+    adhoc = service.timeseries(db, granularity="day", high_risk_threshold=0.5)
+    assert adhoc["source"] == "raw"
+    assert adhoc["points"][0]["high_risk_count"] == 2
+
+    # A mid-bucket end keeps the whole bucket on both paths.
+    end = created_at - timedelta(hours=1)
+    rolled = service.timeseries(db, granularity="day", end=end)["points"]
+    raw = service.timeseries(db, granularity="day", end=end, high_risk_threshold=0.5)["points"]
+    assert [point["total_scored"] for point in rolled] == [point["total_scored"] for point in raw] == [2]
+
+    before = service.timeseries(db, granularity="hour", segment="ltv")["points"]
+    assert service.rebuild(db) == 2
+    assert service.timeseries(db, granularity="hour", segment="ltv")["points"] == before
+
+
+def test_score_distribution_bins_follow_writes_and_rebuilds(db):
+    service = PortfolioRollupService()
+    base = datetime(2026, 3, 2, 9)
+    _add_scored(db, service, base, 700, 70, risk=0.12, retention=0.81)
+    _add_scored(db, service, base + timedelta(days=1), 700, 70, risk=0.14, retention=0.84)
+    _add_scored(db, service, base + timedelta(days=1), 650, 90, risk=0.7, retention=0.3, version="v2")
+    db.commit()
+
+    distribution = service.distribution(db)
+    assert sorted(distribution) == ["v1", "v2"]
+    assert distribution["v1"][2, 16] == 2
+    assert distribution["v2"][14, 6] == 1
+    assert service.distribution(db, start=base + timedelta(days=1))["v1"].sum() == 1
+    assert service.version_totals(db)["v1"]["scored_count"] == 2
+
+    service.rebuild(db)
+    rebuilt = service.distribution(db)
+    assert (rebuilt["v1"] == distribution["v1"]).all()
+    assert (rebuilt["v2"] == distribution["v2"]).all()
+
+
+def test_rebuild_splits_upserts_below_the_bind_parameter_limit(db):
+    # ~4,000 hourly predictions make ~12,000 rollup keys per chunk, several times SQLite's
+    # 32,766 bound-parameter cap if they went out in one statement.
+    count = 4000
+    base = datetime(2025, 1, 1)
+    connection = db.connection().connection.driver_connection
+    if hasattr(connection, "setlimit"):  # Python 3.11+; some distributions raise the default cap.
+        connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 32_766)
+    db.execute(
+        insert(LoanScenario),
+        [
+            {
+                "id": index + 1,
+                "credit_score": 600 + index % 200,
+                "ltv": 50 + index % 50,
+                "dti": 30,
+                "income": 1e5,
+                "loan_amount": 3e5,
+                "interest_rate": 6,
+                "tenure_years": 30,
+            }
+            for index in range(count)
+        ],
+    )
+    db.execute(
+        insert(PredictionResult),
+        [
+            {
+                "loan_id": index + 1,
+                "risk_score": 0.5,
+                "retention_score": 0.5,
+                "recommendation": "",
+                "model_version": "v1",
+                "created_at": base + timedelta(hours=index),
+            }
+            for index in range(count)
+        ],
+    )
+    db.commit()
+
+    assert PortfolioRollupService().rebuild(db) == count
+    hourly = db.query(func.sum(PortfolioRollup.scored_count)).filter(
+        PortfolioRollup.granularity == "hour", PortfolioRollup.segment == "all"
+    )
+    assert hourly.scalar() == count
+    assert db.query(func.count(PortfolioRollup.id)).scalar() > 32_766 // 10
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.optimization import CapacityPlanRequest
+from app.services.scheduling_service import UnderwriterSchedulingService
+
+
+def _request(**overrides) -> CapacityPlanRequest:
+    params = {
+        "daily_applications": [400, 450, 500, 380, 300, 120, 90],
+        "review_capacity_per_underwriter": 35,
+        "max_underwriters": 20,
+        "min_threshold": 0.5,
+        "max_threshold": 0.8,
+        "step": 0.05,
+    }
+    return CapacityPlanRequest(**{**params, **overrides})
+
+
+def _scores() -> list[float]:
+    return np.random.default_rng(8).beta(2, 3, size=5000).tolist()
+
+
+def test_plan_balances_flow_and_clears_initial_backlog():
+    plan = UnderwriterSchedulingService().plan(_request(initial_backlog=300), _scores(), risk_shift_per_day=0.002)
+    assert plan["horizon_days"] == 7
+    previous_ending = 300.0
+    for day in plan["days"]:
+        assert day["starting_backlog"] == pytest.approx(previous_ending, abs=0.01)
+        assert day["processed_reviews"] <= day["underwriters"] * 35 + 0.01
+        assert day["ending_backlog"] == pytest.approx(
+            day["starting_backlog"] + day["expected_manual_reviews"] - day["processed_reviews"], abs=0.02
+        )
+        previous_ending = day["ending_backlog"]
+    assert plan["days"][-1]["ending_backlog"] < 35
+
+
+def test_capped_staff_carries_backlog_forward():
+    plan = UnderwriterSchedulingService().plan(
+        _request(max_underwriters=1, backlog_weight=0.0), _scores(), risk_shift_per_day=0.0
+    )
+    assert plan["days"][0]["ending_backlog"] > 0
+    assert plan["days"][1]["starting_backlog"] == plan["days"][0]["ending_backlog"]
+    assert plan["days"][1]["expected_wait_days"] >= 1
+
+
+def test_plan_rejects_oversized_action_grid():
+    with pytest.raises(ValidationError):
+        _request(step=0.001, min_threshold=0.4, max_threshold=0.95, max_underwriters=1000)
+
+
+def test_plan_rejects_inverted_thresholds_and_bad_volumes():
+    with pytest.raises(ValidationError, match="min_threshold must be <= max_threshold"):
+        _request(min_threshold=0.8, max_threshold=0.5)
+    with pytest.raises(ValidationError) as error:
+        _request(daily_applications=[400, 0, 25000])
+    assert [item["loc"] for item in error.value.errors()] == [("daily_applications", 1), ("daily_applications", 2)]
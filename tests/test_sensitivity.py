@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.loan import LoanRequest, SensitivityRequest
+from app.services.model_service import ModelService
+from app.services.sensitivity_service import SensitivityService
+
+BASE_LOAN = {
+    "credit_score": 700,
+    "ltv": 80.0,
+    "dti": 35.0,
+    "days_in_processing": 10,
+    "documentation_completeness_flag": 1,
+    "income": 120000,
+    "loan_amount": 300000,
+    "interest_rate": 6.5,
+    "tenure_years": 30,
+}
+
+
+@pytest.fixture(scope="module")
+def service() -> SensitivityService:
+    return SensitivityService(ModelService())
+
+
+def test_two_axis_grid_matches_single_loan_scoring(service):
+    request = SensitivityRequest(
+        loan=BASE_LOAN,
+        axes=[
+            {"feature": "ltv", "start": 60, "stop": 100, "points": 5},
+            {"feature": "credit_score", "start": 620, "stop": 780, "points": 4},
+        ],
+    )
+    result = service.sweep(request)
+
+    assert np.asarray(result["risk_scores"]).shape == (5, 4)
+    assert result["axes"][1]["values"] == [620.0, 673.0, 727.0, 780.0]
+    ltv, credit_score = result["axes"][0]["values"][2], result["axes"][1]["values"][3]
+    single = service.model_service.score(LoanRequest(**{**BASE_LOAN, "ltv": ltv, "credit_score": int(credit_score)}))
+    assert result["risk_scores"][2][3] == pytest.approx(single.risk_score, abs=1e-4)
+    assert result["base_risk_score"] == service.model_service.score(LoanRequest(**BASE_LOAN)).risk_score
+
+
+def test_single_axis_returns_curve(service):
+    result = service.sweep(
+        SensitivityRequest(loan=BASE_LOAN, axes=[{"feature": "dti", "start": 10, "stop": 60, "points": 11}])
+    )
+    assert len(result["risk_scores"]) == 11
+    assert isinstance(result["risk_scores"][0], float)
+
+
+def test_axes_are_validated_against_loan_bounds():
+    with pytest.raises(ValidationError):
+        SensitivityRequest(loan=BASE_LOAN, axes=[{"feature": "ltv", "start": 50, "stop": 200}])
+    with pytest.raises(ValidationError):
+        SensitivityRequest(
+            loan=BASE_LOAN,
+            axes=[{"feature": "dti", "start": 10, "stop": 50}, {"feature": "dti", "start": 20, "stop": 40}],
+        )
@@ -0,0 +1,59 @@
+import numpy as np
+import pyarrow as pa
+from pydantic import ValidationError
+
+from app.schemas.loan import LoanRequest
+from app.services.validation_service import ColumnarLoanValidator, constraints_from_model
+
+VALID_LOAN = {
+    "credit_score": 710,
+    "ltv": 78.5,
+    "dti": 31.2,
+    "days_in_processing": 11,
+    "documentation_completeness_flag": 1,
+    "income": 125000,
+    "loan_amount": 320000,
+    "interest_rate": 6.1,
+    "tenure_years": 30,
+}
+
+
+def test_constraints_are_derived_from_loan_request():
+    constraints = {item.name: item for item in constraints_from_model(LoanRequest)}
+    assert set(constraints) == set(LoanRequest.model_fields)
+    assert constraints["credit_score"].ge == 300
+    assert constraints["credit_score"].le == 850
+    assert constraints["credit_score"].integer
+    assert constraints["income"].gt == 0
+    assert not constraints["ltv"].integer
+
+
+def test_columnar_validation_matches_pydantic_per_row():
+    records = [
+        VALID_LOAN,
+        {**VALID_LOAN, "credit_score": 900},
+        {**VALID_LOAN, "ltv": -1, "dti": 120},
+        {**VALID_LOAN, "tenure_years": 12.5},
+        {**VALID_LOAN, "income": "n/a"},
+    ]
+    result = ColumnarLoanValidator().validate_records(records)
+
+    for row, record in enumerate(records):
+        try:
+            LoanRequest(**record)
+            pydantic_ok = True
+        except ValidationError:
+            pydantic_ok = False
+        assert bool(result.valid_mask[row]) == pydantic_ok
+
+    reports = {report["row"]: report["errors"] for report in result.errors}
+    assert {error["field"] for error in reports[2]} == {"ltv", "dti"}
+    assert reports[1][0]["message"] == "Input should be less than or equal to 850"
+
+
+def test_columnar_validation_accepts_numpy_and_arrow_columns():
+    columns = {name: np.full(3, value) for name, value in VALID_LOAN.items()}
+    columns["credit_score"] = pa.array([700, None, 200])
+    result = ColumnarLoanValidator().validate(columns)
+    assert result.valid_rows.tolist() == [0]
+    assert [report["row"] for report in result.errors] == [1, 2]
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from app.models.loan import LoanScenario
+from app.models.prediction import PredictionResult
+from app.services.valuation_service import PortfolioValuationService
+
+
+def test_valuation_matches_direct_computation_across_chunks(db):
+    rng = np.random.default_rng(9)
+    n = 257
+    loans = {
+        "credit_score": rng.integers(560, 820, n),
+        "ltv": rng.uniform(40, 110, n),
+        "loan_amount": rng.uniform(1e5, 9e5, n),
+        "interest_rate": rng.uniform(3, 9, n),
+        "tenure_years": rng.integers(3, 31, n),
+    }
+    risk = rng.uniform(size=n)
+    retention = rng.uniform(size=n)
+    for i in range(n):
+        loan = LoanScenario(
+            dti=30,
+            income=1e5,
+            **{name: values[i].item() for name, values in loans.items()},
+        )
+        db.add(loan)
+        db.flush()
+        db.add(
+            PredictionResult(
+                loan_id=loan.id,
+                risk_score=float(risk[i]),
+                retention_score=float(retention[i]),
+                recommendation="",
+                model_version="v1" if i % 3 else "v2",
+            )
+        )
+    db.commit()
+
+    result = PortfolioValuationService(loss_given_default=0.4, chunk_size=50).value_portfolio(db, horizon_years=7)
+
+    expected_loss = (risk * loans["loan_amount"] * 0.4).sum()
+    income_at_risk = (
+        (1 - retention) * loans["loan_amount"] * loans["interest_rate"] / 100 * np.minimum(loans["tenure_years"], 7)
+    ).sum()
+    assert result["loan_count"] == n
+    assert result["total_exposure"] == pytest.approx(loans["loan_amount"].sum(), rel=1e-9)
+    assert result["expected_loss"] == pytest.approx(expected_loss, rel=1e-9)
+    assert result["interest_income_at_risk"] == pytest.approx(income_at_risk, rel=1e-9)
+
+    for segment in result["segments"]:
+        assert sum(band["loan_count"] for band in segment["bands"]) == n
+        assert sum(band["exposure_share"] for band in segment["bands"]) == pytest.approx(1, abs=1e-3)
+        assert 0 < segment["herfindahl_index"] <= 1
+    versions = next(segment for segment in result["segments"] if segment["segment"] == "model_version")
+    assert [band["band"] for band in versions["bands"]] == ["v1", "v2"]
+    assert versions["bands"][1]["loan_count"] == len(range(0, n, 3))
+
+
+def test_valuation_of_empty_book(db):
+    result = PortfolioValuationService().value_portfolio(db)
+    assert result["loan_count"] == 0
+    assert result["expected_loss_rate"] == 0.0
+
+
+def test_version_first_written_during_valuation_is_skipped(db, monkeypatch):
+    def add(version):
+        loan = LoanScenario(credit_score=700, ltv=80, dti=30, income=1e5, loan_amount=3e5, interest_rate=6, tenure_years=30)
+        db.add(loan)
+        db.flush()
+        db.add(PredictionResult(loan_id=loan.id, risk_score=0.5, retention_score=0.5, recommendation="", model_version=version))
+        db.flush()
+
+    add("v1")
+    execute = db.execute
+
+    def execute_then_write(statement, *args, **kwargs):
+        # Buffer the DISTINCT result so the concurrent write lands between it and the scan.
+        result = execute(statement, *args, **kwargs).freeze()
+        monkeypatch.setattr(db, "execute", execute)
+        add("v2")
+        return result()
+
+    monkeypatch.setattr(db, "execute", execute_then_write)
+    result = PortfolioValuationService().value_portfolio(db)
+
+    assert result["loan_count"] == 1
+    versions = next(segment for segment in result["segments"] if segment["segment"] == "model_version")
+    assert [band["band"] for band in versions["bands"]] == ["v1"]